@@ -0,0 +1,163 @@
+#!/Users/briangreene/anaconda3/bin/python
+# --------------------------------
+# Name: NWClive.py
+# Author: Brian R. Greene
+# University of Oklahoma
+# Updated: 18 October 2026
+# Purpose: Live meteogram of the current UTC day from the NWC Mesonet tower.
+# Keeps the parsed Dataset and figure in memory; each poll requests only the
+# bytes past what has already been read (HTTP range request, falling back
+# to a tail diff if the server sends the whole file), parses just the new
+# rows, and updates the existing line artists and axis limits in place
+# through a MeteogramRenderer.
+# --------------------------------
+import os
+import time
+import requests
+import xarray as xr
+import matplotlib.pyplot as plt
+from datetime import datetime
+from argparse import ArgumentParser
+from NWCmesonet import parse_mts, add_colors, MeteogramRenderer
+from derived import add_derived
+from mts_cache import mts_url
+# --------------------------------
+class LiveNWC:
+    """
+    In-memory live meteogram for the current UTC day
+    """
+    def __init__(self, session=None, timeout=30):
+        """
+        input session: requests.Session to poll with, default=new session
+        input timeout: float seconds to wait on server
+        """
+        self.session = requests.Session() if session is None else session
+        self.timeout = timeout
+        self.renderer = MeteogramRenderer()
+        self.fig = None
+        self._reset(datetime.utcnow())
+
+    def _reset(self, date):
+        """
+        Start over for a new day
+        """
+        self.date = datetime(date.year, date.month, date.day)
+        self.raw = b""      # bytes of mts file received so far
+        self.header = None  # first 3 lines, needed to parse new rows
+        self.nparsed = 0    # bytes of raw already parsed
+        self.df = None
+        self.renderer.close()
+        self.fig = None
+
+    def _fetch_new(self):
+        """
+        Request bytes of today's file past len(self.raw)
+        Return bytes of new content
+        """
+        url = mts_url("nwcm", self.date)
+        headers = {"Range": f"bytes={len(self.raw)}-"} if self.raw else {}
+        r = self.session.get(url, headers=headers, timeout=self.timeout)
+        # nothing past our offset yet
+        if r.status_code == 416:
+            return b""
+        r.raise_for_status()
+        if r.status_code == 206:
+            return r.content
+        # server ignored range: diff against what we already have
+        if r.content.startswith(self.raw):
+            return r.content[len(self.raw):]
+        # file was rewritten, parse from scratch
+        self._reset(self.date)
+        return r.content
+
+    def poll(self):
+        """
+        Fetch and parse any new rows and update figure
+        Return int number of new rows
+        """
+        now = datetime.utcnow()
+        if now.date() != self.date.date():
+            self._reset(now)
+        # fetch first: a rewritten file resets self.raw
+        new = self._fetch_new()
+        self.raw += new
+        # only parse complete lines
+        iend = self.raw.rfind(b"\n") + 1
+        if self.header is None:
+            # header is the first 3 lines
+            i3 = 0
+            for _ in range(3):
+                i3 = self.raw.find(b"\n", i3) + 1
+                if i3 == 0:
+                    return 0
+            self.header = self.raw[:i3]
+            self.nparsed = i3
+        if iend <= self.nparsed:
+            return 0
+        new = add_derived(parse_mts(self.header + self.raw[self.nparsed:iend]))
+        self.nparsed = iend
+        if self.df is None:
+            self.df = add_colors(new)
+        else:
+            self.df = add_colors(xr.concat([self.df, new], dim="time"))
+        self.update()
+        return new.sizes["time"]
+
+    def update(self):
+        """
+        Update line data and axis limits of existing figure in place
+        """
+        self.fig = self.renderer.update(self.df)
+        # artists are now stale; redrawn on next savefig or plt.pause
+
+    def run(self, interval=60., savepath=None, max_polls=None):
+        """
+        Poll until interrupted
+        input interval: float seconds between polls
+        input savepath: str path to save figure to after each update
+        input max_polls: int stop after this many polls, default=forever
+        """
+        npoll = 0
+        while max_polls is None or npoll < max_polls:
+            npoll += 1
+            t0 = time.time()
+            try:
+                n = self.poll()
+            except requests.RequestException as e:
+                print(f"Poll failed: {e}")
+                n = 0
+            except (ValueError, IndexError, KeyError) as e:
+                # unparseable content: start the day over on the next poll
+                print(f"Parse failed, refetching day: {e}")
+                self._reset(self.date)
+                n = 0
+            if n > 0:
+                print(f"{datetime.utcnow():%H:%M:%S} added {n} rows in "
+                      f"{1000*(time.time()-t0):.0f} ms")
+                if savepath is not None:
+                    self.fig.savefig(savepath)
+            if max_polls is not None and npoll >= max_polls:
+                break
+            if plt.get_fignums() and savepath is None:
+                plt.pause(max(0., interval - (time.time() - t0)))
+            else:
+                time.sleep(max(0., interval - (time.time() - t0)))
+# --------------------------------
+def main():
+    parser = ArgumentParser()
+    parser.add_argument("-i", action="store", dest="interval", type=float,
+                        default=60., help="Seconds between polls")
+    parser.add_argument("-s", action="store", dest="savepath", type=str,
+                        help="Save figure to this path on each update "
+                             "instead of showing it")
+    args = parser.parse_args()
+    if args.savepath is not None:
+        plt.switch_backend("Agg")
+        os.makedirs(os.path.dirname(os.path.abspath(args.savepath)),
+                    exist_ok=True)
+    LiveNWC().run(args.interval, args.savepath)
+# --------------------------------
+# Run script if desired
+# --------------------------------
+if __name__ == "__main__":
+    main()
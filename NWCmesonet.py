@@ -8,20 +8,32 @@
 # Displays most recent observations as well as a time series of current day's
 # T, Td, wind speed, and wind direction.
 # --------------------------------
-import yaml
-import requests
+import io
 import os
+import time
+import multiprocessing
 import numpy as np
-import pandas as pd
-import xarray as xr
-import matplotlib.pyplot as plt
-from matplotlib.ticker import MultipleLocator
-from matplotlib.dates import HourLocator, DateFormatter
-from matplotlib import rc
 from datetime import datetime, timedelta
+from argparse import ArgumentParser
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from derived import add_derived
+# xarray, pandas, matplotlib, and the download modules are imported in the
+# functions that use them, so importing this module (e.g. for fig_path in the
+# daily cron job) does not pay for them
 # --------------------------------
-rc('font',weight='normal',size=20,family='serif',serif='Times New Roman')
-rc('text',usetex='True')
+_style_set = False
+def set_style():
+    """
+    Set matplotlib fonts and LaTeX text used by the meteogram, once per
+    process so rc changes made afterwards are kept
+    """
+    global _style_set
+    if _style_set:
+        return
+    from matplotlib import rc
+    rc('font',weight='normal',size=20,family='serif',serif='Times New Roman')
+    rc('text',usetex='True')
+    _style_set = True
 # --------------------------------
 def get_bounds(value_lo, value_hi, multiple):
     """
@@ -33,140 +45,111 @@ def get_bounds(value_lo, value_hi, multiple):
     bound_hi = multiple * np.ceil(value_hi/multiple)
     return [bound_lo, bound_hi]
 # --------------------------------
-def plot_NWC(date, savedir=None):
+# metadata for variables in mts files: (units, name_long)
+MTS_ATTRS = {
+    "RELH": ("$\\%$", "Relative Humidity"),
+    "TAIR": ("$^\\circ$C", "1.5m Air Temperature"),
+    "WSPD": ("m s$^{-1}$", "Wind Speed"),
+    "WDIR": ("degrees", "Wind Direction"),
+    "WMAX": ("m s$^{-1}$", "Wind Gust"),
+    "RAIN": ("", "Rainfall"), # TODO: update units
+    "PRES": ("hPa", "Pressure"),
+    "SRAD": ("W m$^{-2}$", "Solar Radiation"),
+    "TA9M": ("$^\\circ$C", "9m Air Temperature"),
+    "WS2M": ("m s$^{-1}$", "2m Wind Speed"),
+    "SKIN": ("$^\\circ$C", "")
+}
+# --------------------------------
+def parse_mts(text):
     """
-    Grab data from NWC mesonet tower and plot
-    input date: datetime object for desired date to plot (UTC)
-    input savedir: str directory path for where to save figure, default=None
+    Parse the contents of a Mesonet 1-minute mts file in one pass
+    input text: str or bytes contents of mts file
+    Return xarray Dataset indexed by time, values < -100 set to nan
     """
-    # Base URL
-    base_URL = "http://www.mesonet.org/data/public/nwc/mts-1m/"
-    # grab year, month, day from datetime object
-    yr = date.year
-    mo = date.month
-    da = date.day
-    # Construct url for mts file
-    mts_URL = f"{base_URL}{yr:04d}/{mo:02d}/{da:02d}/{yr:04d}{mo:02d}{da:02d}nwcm.mts"
-    print(f"Fetching file from {mts_URL}")
-    # Fetch data
-    r = requests.get(mts_URL)
-    # parse data
-    dat = r.text.split("\n")
-    # headers
-    headers = dat[2].split()[2:]
-    # define dictionary to store data
-    nwc = {}
-    for h in headers:
-        nwc[h] = []
-    # grab data and store: loop over lines 3:-1
-    for line in dat[3:-1]:
-        [nwc[h].append(float(ll)) for ll, h in zip(line.split()[2:], nwc.keys())]
-    # convert to numpy arrays
-    for key in nwc.keys():
-        nwc[key] = np.array(nwc[key])
+    import xarray as xr
+    if isinstance(text, bytes):
+        text = text.decode("ascii", errors="replace")
+    # line 1: copyright, line 2: column count and start date, line 3: headers
+    lines = text.split("\n", 3)
+    t0 = datetime(*[int(d) for d in lines[1].split()[1:4]])
+    headers = lines[2].split()[2:]
+    # bulk parse all numeric columns (skip STID, STNM) into 2-D float array
+    data = np.loadtxt(io.StringIO(lines[3]), dtype=np.float64, ndmin=2,
+                      usecols=range(2, 2+len(headers)))
     # remove bad data
-    for val in nwc.values():
-        val[val < -100.] = np.nan
-    # convert dictionary to xarray Dataset
-    # define time coordinate
-    times = pd.date_range(start=f"{yr:04d}{mo:02d}{da:02d} 12:00AM", 
-                          end=f"{yr:04d}{mo:02d}{da:02d} 11:59PM", freq="min")
-    # define dataset
-    df = xr.Dataset(data_vars=None, coords=dict(time=times))
-    # loop and assign data
-    for key, val in nwc.items():
-        df[key] = xr.DataArray(data=val, dims="time", coords=dict(time=times))
+    data[data < -100.] = np.nan
+    # define time coordinate from TIME column (minutes since start of day)
+    itime = headers.index("TIME")
+    times = np.datetime64(t0, "m") + data[:, itime].astype("timedelta64[m]")
+    # convert to xarray Dataset
+    df = xr.Dataset(data_vars={h: ("time", data[:, i])
+                               for i, h in enumerate(headers) if i != itime},
+                    coords=dict(time=times))
     # assign metadata
-    # units
-    df["RELH"].attrs["units"] = "$\\%$"
-    df["TAIR"].attrs["units"] = "$^\\circ$C"
-    df["WSPD"].attrs["units"] = "m s$^{-1}$"
-    df["WDIR"].attrs["units"] = "degrees"
-    df["WMAX"].attrs["units"] = "m s$^{-1}$"
-    df["RAIN"].attrs["units"] = "" # TODO: update
-    df["PRES"].attrs["units"] = "hPa"
-    df["SRAD"].attrs["units"] = "W m$^{-2}$"
-    df["TA9M"].attrs["units"] = "$^\\circ$C"
-    df["WS2M"].attrs["units"] = "m s$^{-1}$"
-    df["SKIN"].attrs["units"] = "$^\\circ$C"
-    # full name
-    df["RELH"].attrs["name_long"] = "Relative Humidity"
-    df["TAIR"].attrs["name_long"] = "1.5m Air Temperature"
-    df["WSPD"].attrs["name_long"] = "Wind Speed"
-    df["WDIR"].attrs["name_long"] = "Wind Direction"
-    df["WMAX"].attrs["name_long"] = "Wind Gust"
-    df["RAIN"].attrs["name_long"] = "Rainfall"
-    df["PRES"].attrs["name_long"] = "Pressure"
-    df["SRAD"].attrs["name_long"] = "Solar Radiation"
-    df["TA9M"].attrs["name_long"] = "9m Air Temperature"
-    df["WS2M"].attrs["name_long"] = "2m Wind Speed"
-    df["SKIN"].attrs["name_long"] = ""
-    # calculate dewpoint temperature
-    es = 6.112 * np.exp(17.67 * df.TAIR / (df.TAIR + 243.5))
-    e = df.RELH * es / 100.
-    Td = (243.5*np.log(e/6.112)) / (17.67 - np.log(e/6.112))
-    df["TDEW"] = xr.DataArray(data=Td, dims="time", coords=dict(time=times),
-                              attrs={"units": "$^\\circ$C",
-                                     "name_long": "1.5m Dewpoint Temperature"})
-    # convert TAIR, TA9M, and TDEW to degF
-    df["TAIR_F"] = 1.8 * df.TAIR + 32.
-    df["TA9M_F"] = 1.8 * df.TA9M + 32.
-    df["TDEW_F"] = 1.8 * df.TDEW + 32.
-    # convert WSPD, WMAX, WS2M to mph
-    df["WSPD_mph"] = 2.24 * df.WSPD
-    df["WMAX_mph"] = 2.24 * df.WMAX
-    df["WS2M_mph"] = 2.24 * df.WS2M
-    # # calculate wind chill (1.5m temp, 10m wspd)
-    # df["CHIL_F"] = 35.74 + (0.6215*df.TAIR_F) - (35.75*(df.WSPD_mph**0.16)) +\
-    #                (0.4275*df.TAIR_F*(df.WSPD_mph**0.16))
-    # # calculate heat index (1.5m temp and RH)
-    # T = df.TAIR_F
-    # RH = df.RELH/100.
-    # HI = -42.379 + 2.04901523*T + 10.14333127*RH - .22475541*T*RH -\
-    #      .00683783*T*T - .05481717*RH*RH + .00122874*T*T*RH +\
-    #      .00085282*T*RH*RH - .00000199*T*T*RH*RH
-    # # HI adjustments
-    # if ((RH.values < 0.13) & (T.values > 80.) & (T.values < 112.)):
-    #     HI -=  ((13.-RH)/4.)*np.sqrt((17.-abs(T-95.))/17.)
-    # elif ((RH.values > 0.85) & (T.values > 80.) & (T.values < 87.)):
-    #     HI += ((RH-85.)/10.) * ((87.-T)/5.)
-    # assign to df
-    # df["HEAT_F"] = HI
-    # update metadata
-    df["TAIR_F"].attrs["units"] = "$^\\circ$F"
-    df["TA9M_F"].attrs["units"] = "$^\\circ$F"
-    df["TDEW_F"].attrs["units"] = "$^\\circ$F"
-    # df["CHIL_F"].attrs["units"] = "$^\\circ$F"
-    # df["HEAT_F"].attrs["units"] = "$^\\circ$F"
-    df["WSPD_mph"].attrs["units"] = "mph"
-    df["WMAX_mph"].attrs["units"] = "mph"
-    df["WS2M_mph"].attrs["units"] = "mph"
-    # define colors for selected parameters
+    for key, (units, name_long) in MTS_ATTRS.items():
+        if key in df:
+            df[key].attrs["units"] = units
+            df[key].attrs["name_long"] = name_long
+    return df
+# --------------------------------
+def fig_path(date, savedir):
+    """
+    Return str path of meteogram pdf for date in savedir
+    """
+    return f"{savedir}NWC_Meteogram_{date.strftime('%Y%m%d')}.pdf"
+# --------------------------------
+def add_colors(df):
+    """
+    Define plotting colors for selected parameters in Dataset attrs
+    """
     df["TAIR"].attrs["color"] = (204./255, 102./255, 102./255)
     df["TA9M"].attrs["color"] = (133./255, 22./255, 23./255)
     df["TDEW"].attrs["color"] = (84./255, 83./255, 179./255)
-    # df["CHIL"].attrs["color"] = (0, 0, 0)
-    # df["HEAT"].attrs["color"] = (0, 0, 0)
     df["PRES"].attrs["color"] = (0, 0, 0)
     df["WSPD"].attrs["color"] = (42./255, 37./255, 113./255)
     df["WDIR"].attrs["color"] = (195./255, 194./255, 122./255)  #(213./255, 94./255, 0)
     df["SRAD"].attrs["color"] = (255./255, 154./255, 52./255)
     df["SRAD"].attrs["color2"] = (245./255, 170./255, 95./255)
+    return df
+# --------------------------------
+def load_NWC(date, cache=None, save=None):
+    """
+    Grab data from NWC mesonet tower and calculate derived quantities
+    input date: datetime object for desired date to load (UTC)
+    input cache: mts_cache.MTSCache to fetch through, default=shared cache
+    input save: str path to also write dataset to, netCDF unless path ends
+                in .zarr, default=None
+    Return xarray Dataset ready for render_NWC
+    """
+    from mts_cache import get_cache
+    from mts_fetch import fetch_day
+    # Fetch data through local cache, retrying on server errors
+    if cache is None:
+        cache = get_cache()
+    content = fetch_day("nwcm", date, cache)
+    # parse data
+    df = parse_mts(content)
+    # calculate dewpoint, wind chill, heat index, and unit conversions
+    add_derived(df)
+    add_colors(df)
 
-    # begin plotting
-    print("Begin plotting...")
-    fig, ax = plt.subplots(nrows=4, ncols=1, sharex=True, figsize=(14.8, 12),
-                           constrained_layout=True)
-    # title figure
-    figtitle = f"NWC Mesonet {date.strftime('%d %B %Y')}"
-    fig.suptitle(figtitle)
-    # T, Td
-    ax[0].plot(df.time, df.TAIR_F, c=df.TAIR.color, lw=2, label=df.TAIR.name_long)
-    ax[0].plot(df.time, df.TDEW_F, c=df.TDEW.color, lw=2, label=df.TDEW.name_long)
-    ax[0].plot(df.time, df.TA9M_F, c=df.TA9M.color, lw=2, label=df.TA9M.name_long)
-    ax[0].tick_params(labeltop=False, right=True, labelright=True)
-    ax[0].set_ylabel(f"Temperature [{df.TAIR_F.units}]")
-    # y-axis limits
+    # save intermediate dataset if requested
+    if save is not None:
+        if save.rstrip(os.sep).endswith(".zarr"):
+            df.to_zarr(save, mode="w")
+        else:
+            df.to_netcdf(save)
+        print(f"Finished saving {save}")
+    return df
+# --------------------------------
+def set_limits(ax, df):
+    """
+    Set y-axis limits and tick spacing of meteogram axes from data
+    input ax: array of 4 meteogram axes from draw_NWC
+    input df: xarray Dataset being plotted
+    """
+    from matplotlib.ticker import MultipleLocator
+    # temperature
     # lowest value
     Tlo = np.min([np.nanmin(df.TAIR_F), np.nanmin(df.TDEW_F), 
                   np.nanmin(df.TA9M_F)])
@@ -180,6 +163,56 @@ def plot_NWC(date, savedir=None):
     else:
         Tmul = 5.
     ax[0].yaxis.set_major_locator(MultipleLocator(Tmul))
+    # pressure
+    plim = get_bounds(np.nanmin(df.PRES), np.nanmax(df.PRES), 2)
+    ax[1].set_ylim(plim)
+    # check how wide plim is
+    if np.diff(plim) > 10:
+        pmul = 4
+    else:
+        pmul = 2
+    ax[1].yaxis.set_major_locator(MultipleLocator(pmul))
+    # wind speed
+    wslim = get_bounds(0, np.nanmax(df.WSPD_mph), 5)
+    ax[2].set_ylim(wslim)
+    # check how wide wslim is
+    if np.diff(wslim) > 35:
+        wsmul = 10
+    else:
+        wsmul = 5
+    ax[2].yaxis.set_major_locator(MultipleLocator(wsmul))
+    # solar radiation
+    slim = get_bounds(0, np.nanmax(df.SRAD), 100)
+    ax[3].set_ylim(slim)
+    # check how wide slim is
+    if np.diff(slim) > 1200:
+        smul = 400
+    else:
+        smul = 200
+    ax[3].yaxis.set_major_locator(MultipleLocator(smul))
+# --------------------------------
+def draw_NWC(df):
+    """
+    Draw meteogram figure from Dataset returned by load_NWC
+    input df: xarray Dataset of one day of NWC data
+    Return fig, array of 4 axes, twin wind direction axis
+    """
+    import pandas as pd
+    import matplotlib.pyplot as plt
+    from matplotlib.dates import HourLocator, DateFormatter
+    set_style()
+    date = pd.Timestamp(df.time.values[0]).to_pydatetime()
+    fig, ax = plt.subplots(nrows=4, ncols=1, sharex=True, figsize=(14.8, 12),
+                           constrained_layout=True)
+    # title figure
+    figtitle = f"NWC Mesonet {date.strftime('%d %B %Y')}"
+    fig.suptitle(figtitle)
+    # T, Td
+    ax[0].plot(df.time, df.TAIR_F, c=df.TAIR.color, lw=2, label=df.TAIR.name_long)
+    ax[0].plot(df.time, df.TDEW_F, c=df.TDEW.color, lw=2, label=df.TDEW.name_long)
+    ax[0].plot(df.time, df.TA9M_F, c=df.TA9M.color, lw=2, label=df.TA9M.name_long)
+    ax[0].tick_params(labeltop=False, right=True, labelright=True)
+    ax[0].set_ylabel(f"Temperature [{df.TAIR_F.units}]")
     ax[0].grid(axis="y")
     ax[0].legend(frameon=False, labelspacing=0.10, ncol=3, columnspacing=1,
                  handletextpad=0.4, handlelength=1, fontsize=14,
@@ -190,15 +223,6 @@ def plot_NWC(date, savedir=None):
     ax[1].tick_params(labeltop=False, right=True, labelright=True)
     ax[1].set_ylabel("Pressure [hPa]")
     ax[1].grid(axis="y")
-    # y-axis limits
-    plim = get_bounds(np.nanmin(df.PRES), np.nanmax(df.PRES), 2)
-    ax[1].set_ylim(plim)
-    # check how wide plim is
-    if np.diff(plim) > 10:
-        pmul = 4
-    else:
-        pmul = 2
-    ax[1].yaxis.set_major_locator(MultipleLocator(pmul))
 
     # wind speed and direction
     ax[2].plot(df.time, df.WSPD_mph, c=df.WSPD.color, lw=2)
@@ -211,15 +235,6 @@ def plot_NWC(date, savedir=None):
     ax2_2.set_ylim(0, 360)
     ax2_2.set_yticklabels(["N", "NE", "E", "SE", "S", "SW", "W", "NW", "N"])
     ax[2].grid(axis="y")
-    # y-axis limits
-    wslim = get_bounds(0, np.nanmax(df.WSPD_mph), 5)
-    ax[2].set_ylim(wslim)
-    # check how wide wslim is
-    if np.diff(wslim) > 35:
-        wsmul = 10
-    else:
-        wsmul = 5
-    ax[2].yaxis.set_major_locator(MultipleLocator(wsmul))
 
     # solar radiation
     ax[3].plot(df.time, df.SRAD, c=df.SRAD.color, lw=2, zorder=1001)
@@ -227,15 +242,6 @@ def plot_NWC(date, savedir=None):
     ax[3].set_ylabel(f"{df.SRAD.name_long} [{df.SRAD.units}]")
     ax[3].tick_params(labeltop=False, right=True, labelright=True)
     ax[3].grid(axis="y")
-    # y-axis limits
-    slim = get_bounds(0, np.nanmax(df.SRAD), 100)
-    ax[3].set_ylim(slim)
-    # check how wide slim is
-    if np.diff(slim) > 1200:
-        smul = 400
-    else:
-        smul = 200
-    ax[3].yaxis.set_major_locator(MultipleLocator(smul))
 
     # x-axis format
     ax[3].set_xlim([df.time[0].values, df.time[0].values+np.timedelta64(1, "D")])
@@ -247,26 +253,213 @@ def plot_NWC(date, savedir=None):
     cw = "Copyright 1994-2022 Board of Regents of the University of Oklahoma. All Rights Reserved."
     ax[3].text(0.5, -0.35, cw, ha="center", va="center", fontsize=14,
                transform=ax[3].transAxes)
+    # y-axis limits
+    set_limits(ax, df)
+    return fig, ax, ax2_2
+# --------------------------------
+class MeteogramRenderer:
+    """
+    Reusable meteogram: builds the 4-panel figure once, then for each day
+    only swaps line/fill data, y-limits, and title. Axes, locators, labels,
+    legend, and copyright text (and their LaTeX rendering) are reused.
+    """
+    def __init__(self, freeze_layout=False):
+        """
+        input freeze_layout: bool keep the constrained layout computed on
+                             the first day instead of redoing it every draw;
+                             faster, but margins will not grow for wider
+                             tick labels on later days, default=False
+        """
+        self.freeze_layout = freeze_layout
+        self.fig = None
+
+    def update(self, df):
+        """
+        Draw Dataset df on the figure, building it on first use
+        input df: xarray Dataset of one day of NWC data
+        Return fig
+        """
+        if self.fig is None:
+            self.fig, self.ax, self.ax2_2 = draw_NWC(df)
+            if self.freeze_layout:
+                self.fig.canvas.draw()
+                self.fig.set_layout_engine("none")
+            return self.fig
+        import pandas as pd
+        date = pd.Timestamp(df.time.values[0]).to_pydatetime()
+        t = df.time.values
+        ax = self.ax
+        # suptitle updates the existing title text
+        self.fig.suptitle(f"NWC Mesonet {date.strftime('%d %B %Y')}")
+        for line, v in zip(ax[0].lines, ("TAIR_F", "TDEW_F", "TA9M_F")):
+            line.set_data(t, df[v].values)
+        ax[1].lines[0].set_data(t, df.PRES.values)
+        ax[2].lines[0].set_data(t, df.WSPD_mph.values)
+        self.ax2_2.lines[0].set_data(t, df.WDIR.values)
+        ax[3].lines[0].set_data(t, df.SRAD.values)
+        # fill_between has no set_data: swap the polygon
+        for c in ax[3].collections:
+            c.remove()
+        ax[3].fill_between(t, df.SRAD, color=df.SRAD.color2, zorder=1000)
+        ax[3].set_xlim([t[0], t[0]+np.timedelta64(1, "D")])
+        set_limits(ax, df)
+        return self.fig
+
+    def render(self, df, savedir=None):
+        """
+        Update figure with df and save pdf, as render_NWC
+        input df: xarray Dataset of one day of NWC data
+        input savedir: str directory path for where to save figure
+        """
+        self.update(df)
+        if savedir is not None:
+            import pandas as pd
+            date = pd.Timestamp(df.time.values[0]).to_pydatetime()
+            os.makedirs(savedir, exist_ok=True)
+            fig_name = fig_path(date, savedir)
+            self.fig.savefig(fig_name, format="pdf")
+            print(f"Finished saving {fig_name}")
+
+    def close(self):
+        if self.fig is not None:
+            import matplotlib.pyplot as plt
+            plt.close(self.fig)
+            self.fig = None
+# --------------------------------
+def render_NWC(df, savedir=None):
+    """
+    Plot meteogram from Dataset returned by load_NWC; also works on one
+    reopened from disk with xr.open_dataset/xr.open_zarr
+    input df: xarray Dataset of one day of NWC data
+    input savedir: str directory path for where to save figure, default=None
+    """
+    import pandas as pd
+    import matplotlib.pyplot as plt
+    date = pd.Timestamp(df.time.values[0]).to_pydatetime()
+    # begin plotting
+    print("Begin plotting...")
+    fig = draw_NWC(df)[0]
 
     # Save plot if saveFig = True, else just show
     if savedir is not None:
-        # make sure path exists
-        if not os.path.exists(savedir):
-            os.mkdir(savedir)
-        fig_name = f"{savedir}NWC_Meteogram_{date.strftime('%Y%m%d')}.pdf"
+        # make sure path exists (may be created by another worker)
+        os.makedirs(savedir, exist_ok=True)
+        fig_name = fig_path(date, savedir)
         fig.savefig(fig_name, format="pdf")
         print(f"Finished saving {fig_name}")
 
     plt.close("all")
+# --------------------------------
+def plot_NWC(date, savedir=None, cache=None):
+    """
+    Grab data from NWC mesonet tower and plot
+    input date: datetime object for desired date to plot (UTC)
+    input savedir: str directory path for where to save figure, default=None
+    input cache: mts_cache.MTSCache to fetch through, default=shared cache
+    """
+    render_NWC(load_NWC(date, cache), savedir)
 
 # --------------------------------
+# renderer reused by batch worker processes, set in _init_worker
+_renderer = None
+def _init_worker():
+    """
+    Set up fresh matplotlib state in each batch worker process
+    """
+    global _renderer
+    import matplotlib
+    matplotlib.use("Agg")
+    set_style()
+    # each worker builds its figure once and reuses it for all its days
+    _renderer = MeteogramRenderer()
+# --------------------------------
+def _plot_day(date, savedir):
+    """
+    Plot one day inside a batch worker; failures are returned, not raised,
+    so one bad day does not stop the batch
+    Return (date, error message or None, elapsed seconds)
+    """
+    t0 = time.time()
+    try:
+        _renderer.render(load_NWC(date), savedir)
+        err = None
+    except Exception as e:
+        # start from a fresh figure after a failure
+        _renderer.close()
+        err = f"{type(e).__name__}: {e}"
+    return date, err, time.time() - t0
+# --------------------------------
+def plot_NWC_batch(days, savedir, nproc=None, skip_existing=True):
+    """
+    Plot many days in parallel across a pool of worker processes
+    input days: iterable of datetime objects to plot (UTC)
+    input savedir: str directory path for where to save figures
+    input nproc: int number of worker processes, default=os.cpu_count()
+    input skip_existing: bool skip days whose pdf already exists, so an
+                         interrupted run can be resumed, default=True
+    Return dict of failed days {date: error message}
+    """
+    days = list(days)
+    if skip_existing:
+        todo = [d for d in days if not os.path.exists(fig_path(d, savedir))]
+        print(f"Skipping {len(days)-len(todo)} days already plotted")
+    else:
+        todo = days
+    failed = {}
+    if len(todo) == 0:
+        return failed
+    # spawn so workers do not inherit this process's matplotlib/LaTeX state
+    ctx = multiprocessing.get_context("spawn")
+    t0 = time.time()
+    with ProcessPoolExecutor(max_workers=nproc, mp_context=ctx,
+                             initializer=_init_worker) as pool:
+        futures = [pool.submit(_plot_day, d, savedir) for d in todo]
+        for i, fut in enumerate(as_completed(futures), start=1):
+            date, err, dt = fut.result()
+            if err is None:
+                status = f"done in {dt:.1f} s"
+            else:
+                status = f"FAILED ({err})"
+                failed[date] = err
+            print(f"[{i}/{len(todo)}] {date.strftime('%Y%m%d')} {status}")
+    print(f"Finished {len(todo)-len(failed)} of {len(todo)} days in "
+          f"{time.time()-t0:.1f} s")
+    for date, err in sorted(failed.items()):
+        print(f"Failed {date.strftime('%Y%m%d')}: {err}")
+    return failed
+# --------------------------------
+def main():
+    """
+    Plot a range of days from the command line
+    Return int exit status, 1 if any day failed
+    """
+    import yaml
+    import pandas as pd
+    # command line arguments
+    parser = ArgumentParser()
+    parser.add_argument("-ds", required=True, action="store", dest="d_s",
+                        type=str, help="Start date YYYYMMDD")
+    parser.add_argument("-de", required=True, action="store", dest="d_e",
+                        type=str, help="End date YYYYMMDD")
+    parser.add_argument("-s", action="store", dest="savedir", type=str,
+                        help="Figure save directory, default=sdir_local in "
+                             "NWCmesonet.yaml")
+    parser.add_argument("-n", action="store", dest="nproc", type=int,
+                        help="Number of worker processes, default=all cores")
+    parser.add_argument("--overwrite", action="store_true", dest="overwrite",
+                        help="Replot days whose figure already exists")
+    args = parser.parse_args()
+    if args.savedir is None:
+        # load yaml file
+        with open("NWCmesonet.yaml") as f:
+            config = yaml.safe_load(f)
+        args.savedir = config["sdir_local"]
+    days = pd.date_range(start=args.d_s, end=args.d_e, freq="D")
+    failed = plot_NWC_batch(days, args.savedir, args.nproc,
+                            skip_existing=not args.overwrite)
+    return 1 if failed else 0
+# --------------------------------
 # Run script if desired
 # --------------------------------
 if __name__ == "__main__":
-    # load yaml file
-    with open("NWCmesonet.yaml") as f:
-        config = yaml.safe_load(f)
-    # day = datetime(2022, 12, 22)
-    days = pd.date_range(start="20210101", end="20211231", freq="D")
-    for day in days:
-        plot_NWC(day, config["sdir_local"])
\ No newline at end of file
+    raise SystemExit(main())
@@ -8,6 +8,7 @@ Copyright - University of Oklahoma Center for Autonomous Sensing and Sampling,
 '''
 # Python Packages
 import os
+import time
 from datetime import datetime, timedelta
 
 # Installed packages
@@ -16,15 +17,13 @@ import numpy.ma as ma
 import cmocean
 import matplotlib.patheffects as PathEffects
 
-from mpl_toolkits.basemap import Basemap
 from matplotlib import dates as mpdates
 from matplotlib import pyplot as plt
-from matplotlib.patches import Polygon
-from matplotlib.collections import PatchCollection
-from matplotlib.path import Path
-from scipy import interpolate
 from glob import glob
 
+from ok_grid import get_map_context
+from ok_gridding import StationIndex, get_interpolator
+
 # close all figures
 plt.close("all")
 
@@ -37,31 +36,23 @@ urcrnrlon = -94.0
 # files
 flist = glob("/Users/briangreene/Nextcloud/Projects/WindClimo/*.csv")
 
+# Projection, Oklahoma border, grid, and mask: built once for all files and
+# read from cache on later runs
+shapefile = "/Users/briangreene/Desktop/states_21basic/states"
+ctx = get_map_context(shapefile, 0.05, resolution="h",
+                      extent=(llcrnrlon, llcrnrlat, urcrnrlon, urcrnrlat))
+
 for f in flist:
     # Initialize map
     print("Initializing map")
     fig_map, ax_map = plt.subplots(1, figsize=(12, 6.75))
-    m = Basemap(projection="merc", llcrnrlat=llcrnrlat, urcrnrlat=urcrnrlat,
-                llcrnrlon=llcrnrlon, urcrnrlon=urcrnrlon, resolution="h", ax=ax_map)
-
-    # Draw patches over not Oklahoma
-    print("Reading shapefile")
-    m.readshapefile("/Users/briangreene/Desktop/states_21basic/states",
-                    "states", drawbounds=False)
-    patch = []
-    patch_ok = []
-    for info, shape in zip(m.states_info, m.states):
-        if info["STATE_NAME"] != "Oklahoma":
-            patch.append(Polygon(np.array(shape), True))
-        else:
-            patch_ok.append(Polygon(np.array(shape), True))
-
-    xy = patch_ok[0].get_xy()
-
-    # print "Creating meshgrid for map"
-    xnew = np.arange(llcrnrlon, urcrnrlon, 0.05)
-    ynew = np.arange(llcrnrlat, urcrnrlat, 0.05)
-    xx, yy = np.meshgrid(xnew, ynew)
+    m = ctx.basemap(ax_map)
+    grid = ctx.grid
+    tstart = time.time()
+    xy = grid.border
+    xplot, yplot = grid.xplot, grid.yplot
+    mask = grid.mask
+    print(f"Mask time: {time.time() - tstart:.3f} seconds ({grid.report()})")
 
     # Load CSV data
     fname = f.split("/")[-1]
@@ -78,38 +69,13 @@ for f in flist:
 
     # transpose to basemap coordinates
     print("transposing to basemap coords")
-    lon, lat, xplot, yplot = m.makegrid(len(xnew), len(ynew), returnxy=True)
-    x1, y1 = m(lons, lats)
+    x1, y1 = ctx.project(lons, lats)
 
     # connect Oklahoma border points with nearest station to interpolate
-    def nearest(Lon, Lat):
-        # returns index of closest mesonet site
-        dist = np.sqrt((Lon - np.array(x1))**2. + (Lat - np.array(y1))**2.)
-        return np.argmin(dist)
-
-    frac_perim, latperim, lonperim = ([] for i in range(3))
-    for i in range(len(xy)):
-        iclose = nearest(xy[i, 0], xy[i, 1])
-        frac_perim.append(frac[iclose])
-        latperim.append(xy[i, 1])
-        lonperim.append(xy[i, 0])
-
-    x2 = np.concatenate((x1, np.array(lonperim)))
-    y2 = np.concatenate((y1, np.array(latperim)))
-    frac2 = np.concatenate((frac, np.array(frac_perim)))
-
-    points = np.array(list(zip(x2, y2)))
-
-    # Interpolate 2d data
-    frac_new = interpolate.griddata(
-        points, frac2, (xplot, yplot), method="cubic")
-    # Create mask
-    mpath = Path(xy)
-    xxyyplot = np.dstack((xplot, yplot))
-    xxyyplot_flat = xxyyplot.reshape(-1, 2)
-    mask_flat = np.invert(mpath.contains_points(xxyyplot_flat))
-    mask = mask_flat.reshape(xplot.shape)
+    points, frac2 = StationIndex(x1, y1).extend_to_border(frac, xy)
 
+    # Interpolate 2d data, triangulation reused while stations are the same
+    frac_new = get_interpolator(points, xplot, yplot)(frac2, method="cubic")
     frac_plot = ma.masked_where(mask, frac_new)
 
     cfax = m.pcolormesh(xplot, yplot, frac_plot,
@@ -0,0 +1,37 @@
+# --------------------------------
+# Name: atomic_io.py
+# Author: Brian R. Greene
+# University of Oklahoma
+# Updated: 18 October 2026
+# Purpose: Atomic file writes shared by the caches and archives. Contents are
+# written to a unique temporary file in the destination directory and renamed
+# into place, so readers never see a partial file and processes writing the
+# same file at once do not collide.
+# --------------------------------
+import os
+import tempfile
+# --------------------------------
+def atomic_save(path, write, mode="wb"):
+    """
+    Write a file through a unique temporary file and rename
+    input path: str destination path
+    input write: function(f) writing the contents to open file f
+    input mode: str mode to open the temporary file with, "wb" or "w"
+    """
+    dirname = os.path.dirname(path)
+    os.makedirs(dirname, exist_ok=True)
+    fd, tmp = tempfile.mkstemp(dir=dirname, suffix=".tmp")
+    try:
+        with os.fdopen(fd, mode) as f:
+            write(f)
+        os.replace(tmp, path)
+    except BaseException:
+        os.remove(tmp)
+        raise
+# --------------------------------
+def atomic_write(path, content):
+    """
+    Write bytes or str content to path via temporary file and rename
+    """
+    mode = "wb" if isinstance(content, bytes) else "w"
+    atomic_save(path, lambda f: f.write(content), mode)
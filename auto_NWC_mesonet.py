@@ -6,31 +6,81 @@ for the previous day
 Author: Brian R. Greene
 Created: 11 June 2019
 Modified: 28 December 2022 - adapt for updates to NWCmesonet.py
+Modified: 18 October 2026 - append each day to yearly 1-minute archive
+Modified: 18 October 2026 - skip a figure or archive day already done; the
+    plotting and archive modules are only imported when there is work, so a
+    run with nothing to do starts in a fraction of a second. Also run as
+    python wx.py nwc
 """
 import os
 import yaml
 from datetime import datetime, timedelta
-from NWCmesonet import plot_NWC
-
-# load yaml file
-with open("NWCmesonet.yaml") as f:
-    config = yaml.safe_load(f)
-
-# Get today's date
-dt_now = datetime.utcnow()
-dt_yesterday = dt_now - timedelta(days=1)
-
-# Save file and figure directory
-sdir = f"{config['sdir_local']}{dt_yesterday.year:04d}/"
-
-# Run NWCmesonet()
-plot_NWC(dt_yesterday, sdir)
-
-# rsync to upload figures
-# build strings for save paths from yaml file
-alias = config["alias"]
-sdir_remote = config["sdir_remote"]
-sdir_r_full = f"{alias}:{sdir_remote}{dt_yesterday.year:04d}/"
-rs = f"rsync -avh --ignore-existing -e ssh {sdir}* {sdir_r_full}"
-# execute
-os.system(rs)
\ No newline at end of file
+from argparse import ArgumentParser
+from NWCmesonet import fig_path
+
+
+def run_daily(date, config, overwrite=False, upload=True):
+    """
+    Plot, archive, and upload one day, skipping steps already done
+    input date: datetime object of day to process (UTC)
+    input config: dict loaded from NWCmesonet.yaml
+    input overwrite: bool replot even if the figure exists, default=False
+    input upload: bool rsync figures to the remote directory, default=True
+    """
+    # Save file and figure directory
+    sdir = f"{config['sdir_local']}{date.year:04d}/"
+
+    # Run NWCmesonet() unless the figure already exists
+    fig_name = fig_path(date, sdir)
+    if overwrite or not os.path.exists(fig_name):
+        from NWCmesonet import plot_NWC
+        plot_NWC(date, sdir)
+    else:
+        print(f"{fig_name} exists, skipping plot")
+
+    # append to yearly archive of 1-minute data if configured
+    if "archive_dir" in config:
+        from mts_archive import MTSArchive
+        archive = MTSArchive(config["archive_dir"])
+        if not archive.has_day(date):
+            archive.append_day(date)
+
+    if not upload:
+        return
+    # rsync to upload figures
+    # build strings for save paths from yaml file
+    alias = config["alias"]
+    sdir_remote = config["sdir_remote"]
+    sdir_r_full = f"{alias}:{sdir_remote}{date.year:04d}/"
+    rs = f"rsync -avh --ignore-existing -e ssh {sdir}* {sdir_r_full}"
+    # execute
+    os.system(rs)
+
+
+def main():
+    # command line arguments
+    parser = ArgumentParser()
+    parser.add_argument("-d", action="store", dest="date", type=str,
+                        help="Date YYYYMMDD, default=yesterday (UTC)")
+    parser.add_argument("-c", action="store", dest="config", type=str,
+                        default="NWCmesonet.yaml", help="Config yaml file")
+    parser.add_argument("--overwrite", action="store_true", dest="overwrite",
+                        help="Replot even if the figure already exists")
+    parser.add_argument("--no-upload", action="store_false", dest="upload",
+                        help="Do not rsync figures")
+    args = parser.parse_args()
+
+    # load yaml file
+    with open(args.config) as f:
+        config = yaml.safe_load(f)
+
+    if args.date is None:
+        # Get yesterday's date
+        date = datetime.utcnow() - timedelta(days=1)
+    else:
+        date = datetime.strptime(args.date, "%Y%m%d")
+    run_daily(date, config, args.overwrite, args.upload)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,105 @@
+'''
+Benchmark reading a Mesonet current.csv snapshot: the split/float double loop
+from plot3Dmeso_test.py against mesonet_current.read_current (one typed
+np.loadtxt parse of every column). Input is a synthetic file with the
+current.csv columns, including blank fields, unless a real file is given.
+
+Usage: python benchmarks/bench_current.py [-f current.csv] [-n nstation]
+       [-r repeats]
+'''
+import os
+import sys
+import time
+import numpy as np
+from argparse import ArgumentParser
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), os.pardir))
+from mesonet_current import SCHEMA, COMPASS, read_current, valid
+
+
+def current_loop(text):
+    '''
+    Read as written in plot3Dmeso_test.py
+    '''
+    data = text.split('\n')
+    lat_, lon_, yr_, mo_, da_, hr_, mi_, T_, Td_, Temps, Dewpoint, lats, \
+        lons = ([] for i in range(13))
+    for i in np.arange(1, len(data)-1):
+        data_short = data[i].split(',')
+        lat_.append(float(data_short[3]))
+        lon_.append(float(data_short[4]))
+        yr_.append(float(data_short[5]))
+        mo_.append(float(data_short[6]))
+        da_.append(float(data_short[7]))
+        hr_.append(float(data_short[8]))
+        mi_.append(float(data_short[9]))
+        T_.append(data_short[10])
+        Td_.append(data_short[11])
+
+    for i in np.arange(len(T_)):
+        if T_[i] != ' ':
+            Temps.append(float(T_[i]))
+            Dewpoint.append(float(Td_[i]))
+            lats.append(lat_[i])
+            lons.append(lon_[i])
+    return np.array(Temps), np.array(Dewpoint), np.array(lats), \
+        np.array(lons)
+
+
+def current_typed(text):
+    '''
+    Read with mesonet_current.read_current
+    '''
+    df = valid(read_current(text.encode()), 'TAIR')
+    return df.TAIR, df.TDEW, df.LAT, df.LON
+
+
+def synthetic(n, rng, blank=0.05):
+    '''
+    Return text of a current.csv with n stations, blank fraction of them
+    not reporting temperature
+    '''
+    lines = [','.join(SCHEMA)]
+    dirs = list(COMPASS)
+    for i in range(n):
+        tair = ' ' if rng.random() < blank else f'{rng.normal(60., 10.):.0f}'
+        tdew = ' ' if tair == ' ' else f'{rng.normal(45., 8.):.0f}'
+        lines.append(
+            f'S{i:03d},Station {i},OK,{rng.uniform(33.9, 36.9):.5f},'
+            f'{rng.uniform(-103., -94.5):.5f},2026,10,18,14,35,'
+            f'{tair},{tdew},{rng.uniform(20., 90.):.0f},{tair},{tair},'
+            f'{dirs[rng.integers(16)]},{rng.uniform(0., 25.):.0f},'
+            f'{rng.uniform(0., 35.):.0f},{rng.normal(28.9, .3):.2f},'
+            f'{rng.normal(70., 8.):.0f},{rng.normal(45., 8.):.0f},'
+            f'{rng.uniform(0., 1.):.2f}')
+    return '\n'.join(lines) + '\n'
+
+
+if __name__ == '__main__':
+    parser = ArgumentParser()
+    parser.add_argument('-f', action='store', dest='file', type=str,
+                        help='current.csv file')
+    parser.add_argument('-n', action='store', dest='nstation', type=int,
+                        default=120, help='Synthetic stations')
+    parser.add_argument('-r', action='store', dest='repeats', type=int,
+                        default=20, help='Repeats per method')
+    args = parser.parse_args()
+    if args.file is not None:
+        with open(args.file) as f:
+            text = f.read()
+    else:
+        text = synthetic(args.nstation, np.random.default_rng(0))
+    print(f'{text.count(chr(10)) - 1} stations')
+
+    t_loop, t_typed = [], []
+    for _ in range(args.repeats):
+        t0 = time.perf_counter()
+        a = current_loop(text)
+        t_loop.append(time.perf_counter() - t0)
+        t0 = time.perf_counter()
+        b = current_typed(text)
+        t_typed.append(time.perf_counter() - t0)
+    print(f'double loop:  {1000*min(t_loop):.2f} ms')
+    print(f'read_current: {1000*min(t_typed):.2f} ms '
+          f'({min(t_loop)/min(t_typed):.1f}x)')
+    same = all(np.array_equal(x, y) for x, y in zip(a, b))
+    print(f'Identical output: {same}')
@@ -0,0 +1,74 @@
+"""
+Benchmark vectorized derived quantities against per-element scalar
+conversions over a year of synthetic 1-minute data
+
+Usage: python benchmarks/bench_derived.py [-n ndays]
+"""
+import os
+import sys
+import math
+import time
+import numpy as np
+from argparse import ArgumentParser
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), os.pardir))
+from derived import c_to_f, ms_to_mph, dewpoint, wind_chill, heat_index
+# --------------------------------
+def derived_loop(T, RH, V):
+    """
+    Same quantities computed one element at a time, as in the notebooks
+    """
+    TF, TD, VM, WC, HI = ([] for _ in range(5))
+    for t, rh, v in zip(T, RH, V):
+        tf = 1.8 * t + 32.
+        vm = 2.24 * v
+        es = 6.112 * math.exp(17.67 * t / (t + 243.5))
+        e = rh * es / 100.
+        TD.append(1.8 * (243.5*math.log(e/6.112)) /
+                  (17.67 - math.log(e/6.112)) + 32.)
+        TF.append(tf)
+        VM.append(vm)
+        if tf <= 50. and vm >= 3.:
+            WC.append(35.74 + 0.6215*tf - 35.75*vm**0.16 +
+                      0.4275*tf*vm**0.16)
+        else:
+            WC.append(math.nan)
+        hi = 0.5 * (tf + 61. + (tf - 68.)*1.2 + rh*0.094)
+        if (hi + tf) / 2. >= 80.:
+            hi = -42.379 + 2.04901523*tf + 10.14333127*rh - .22475541*tf*rh -\
+                 .00683783*tf*tf - .05481717*rh*rh + .00122874*tf*tf*rh +\
+                 .00085282*tf*rh*rh - .00000199*tf*tf*rh*rh
+            if rh < 13. and 80. < tf < 112.:
+                hi -= ((13.-rh)/4.)*math.sqrt((17.-abs(tf-95.))/17.)
+            elif rh > 85. and 80. < tf < 87.:
+                hi += ((rh-85.)/10.) * ((87.-tf)/5.)
+        HI.append(hi)
+    return [np.array(x) for x in (TF, TD, VM, WC, HI)]
+# --------------------------------
+def derived_vec(T, RH, V):
+    TF = c_to_f(T)
+    VM = ms_to_mph(V)
+    return [TF, c_to_f(dewpoint(T, RH)), VM, wind_chill(TF, VM),
+            heat_index(TF, RH)]
+# --------------------------------
+if __name__ == "__main__":
+    parser = ArgumentParser()
+    parser.add_argument("-n", action="store", dest="ndays", type=int,
+                        default=365, help="Number of days of data")
+    args = parser.parse_args()
+    n = 1440 * args.ndays
+    rng = np.random.default_rng(0)
+    T = rng.uniform(-20., 45., n)
+    RH = rng.uniform(5., 100., n)
+    V = rng.uniform(0., 20., n)
+    t0 = time.perf_counter()
+    out_loop = derived_loop(T, RH, V)
+    t_loop = time.perf_counter() - t0
+    t0 = time.perf_counter()
+    out_vec = derived_vec(T, RH, V)
+    t_vec = time.perf_counter() - t0
+    for a, b in zip(out_loop, out_vec):
+        np.testing.assert_allclose(a, b, rtol=1e-10)
+    print(f"{n} samples")
+    print(f"Per-element loop: {t_loop:.2f} s")
+    print(f"Vectorized:       {t_vec:.3f} s")
+    print(f"Speedup: {t_loop/t_vec:.0f}x")
@@ -0,0 +1,129 @@
+'''
+Benchmark plot_gfs_NH.py frame rendering: the original loop, adding the
+cartopy coastline, state, and border features to each panel of every frame,
+against the pre-projected, disk-cached background drawn as vectors
+(serially and in parallel worker processes) and the opt-in rasterized
+background. Frames are drawn from synthetic analysis files; the PNGs of
+each mode are compared pixel by pixel with the original loop's.
+
+Usage: python benchmarks/bench_gfs_render.py [-n nframes] [-p nproc]
+'''
+import os
+import sys
+import time
+import tempfile
+import numpy as np
+import xarray as xr
+import matplotlib
+matplotlib.use('Agg')
+import matplotlib.pyplot as plt
+import cartopy.feature as cfeature
+from argparse import ArgumentParser
+from datetime import datetime, timedelta
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), os.pardir))
+import plot_gfs_NH as P
+
+
+def synthetic_files(n, root, seed=0):
+    '''
+    Write n converted-style 1-degree analysis files with the 300 mb level
+    Return list of str paths
+    '''
+    rng = np.random.default_rng(seed)
+    lat = np.linspace(90., -90., 181)
+    lon = np.arange(360.)
+    lon2, lat2 = np.meshgrid(np.radians(lon), np.radians(lat))
+    paths = []
+    for i in range(n):
+        dt = datetime(2019, 9, 1) + timedelta(hours=6*i)
+        ph = 0.1 * i
+        wave = np.cos(5*lon2 + ph) * np.cos(lat2)**2
+        ds = xr.Dataset({
+            'UGRD_P0_L100_GLL0': (('lat_0', 'lon_0'),
+                                  30. + 25.*wave + rng.normal(0, 1, wave.shape)),
+            'VGRD_P0_L100_GLL0': (('lat_0', 'lon_0'), 20.*np.sin(5*lon2 + ph)),
+            'HGT_P0_L100_GLL0': (('lat_0', 'lon_0'),
+                                 9200. - 800.*np.sin(lat2)**2 + 100.*wave),
+            'PRMSL_P0_L101_GLL0': (('lat_0', 'lon_0'),
+                                   101300. + 1500.*wave),
+            'TMP_P0_L1_GLL0': (('lat_0', 'lon_0'),
+                               300. - 50.*np.sin(lat2)**2 + 5.*wave)},
+            coords={'lat_0': lat, 'lon_0': lon})
+        path = os.path.join(root, f'gfsanl_3_{dt:%Y%m%d_%H%M}_000.nc')
+        ds.to_netcdf(path)
+        paths.append(path)
+    return paths
+
+
+def draw_reference(frame):
+    '''
+    Draw a frame as the original script did: the panels, then the cartopy
+    features added directly to each axes as vectors
+    Return (matplotlib figure, datetime valid)
+    '''
+    # an empty projected background: panels only
+    fig1, dt_valid = P.draw_frame(frame, layers=[])
+    for ax in fig1.axes[:2]:
+        ax.add_feature(cfeature.COASTLINE.with_scale('50m'), linewidth=0.5)
+        ax.add_feature(cfeature.STATES, linewidth=0.5)
+        ax.add_feature(cfeature.BORDERS, linewidth=0.5)
+    return fig1, dt_valid
+
+
+def compare(d_ref, d):
+    '''
+    Return (int pixels differing, int largest difference out of 255) of
+    the PNGs in directory d against those in d_ref
+    '''
+    ndiff, dmax = 0, 0
+    for f in sorted(os.listdir(d_ref)):
+        a = (255 * plt.imread(d_ref + f)).round().astype(int)
+        b = (255 * plt.imread(d + f)).round().astype(int)
+        diff = np.abs(a - b)
+        ndiff += int(np.any(diff > 0, axis=-1).sum())
+        dmax = max(dmax, int(diff.max()))
+    return ndiff, dmax
+
+
+if __name__ == '__main__':
+    parser = ArgumentParser()
+    parser.add_argument('-n', action='store', dest='nframes', type=int,
+                        default=16, help='Number of frames to render')
+    parser.add_argument('-p', action='store', dest='nproc', type=int,
+                        default=os.cpu_count(), help='Worker processes')
+    args = parser.parse_args()
+    root = tempfile.mkdtemp()
+    sources = [('file', f) for f in synthetic_files(args.nframes, root)]
+    dirs = {}
+    for mode in ('ref', 'vector', 'raster', 'par'):
+        dirs[mode] = os.path.join(root, mode) + os.sep
+        os.mkdir(dirs[mode])
+
+    # original loop: features added and projected on every frame
+    t0 = time.time()
+    for src in sources:
+        P.save_frame(*draw_reference(P.read_frame(src)), dirs['ref'])
+    fps_old = args.nframes / (time.time() - t0)
+
+    # background projected once (first call builds the disk cache)
+    t0 = time.time()
+    layers = P.project_background()
+    t_cache = time.time() - t0
+    fps = {}
+    for mode, raster in (('vector', False), ('raster', True)):
+        t0 = time.time()
+        for src in sources:
+            P.save_frame(*P.draw_frame(P.read_frame(src), layers, raster),
+                         dirs[mode])
+        fps[mode] = args.nframes / (time.time() - t0)
+    fps['par'] = P.render_all(sources, dirs['par'], args.nproc, layers)
+
+    print(f'Background load/build: {t_cache:.2f} s')
+    print(f'Serial, features every frame:    {fps_old:.2f} frames/s')
+    for mode, label in (('vector', 'Serial, projected background:   '),
+                        ('raster', 'Serial, rasterized background:  '),
+                        ('par', f'{args.nproc} processes, projected:      ')):
+        ndiff, dmax = compare(dirs['ref'], dirs[mode])
+        print(f'{label} {fps[mode]:.2f} frames/s '
+              f'({fps[mode]/fps_old:.1f}x), {ndiff} pixels differ from '
+              f'the original, max {dmax}/255')
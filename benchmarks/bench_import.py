@@ -0,0 +1,103 @@
+"""
+Import-time budget check of the wx.py entry point with python -X importtime.
+Runs `wx.py --help` and the daily NWC cron job (`wx.py nwc`) when there is
+nothing to do: the figure already exists, and, with an archive configured,
+the day is already archived. Fails (exit status 1) if a run's imports take
+longer than the budget or pull in a heavy plotting/data library.
+
+Usage: python benchmarks/bench_import.py [-b budget] [-r repeats]
+"""
+import os
+import sys
+import time
+import tempfile
+import subprocess
+from argparse import ArgumentParser
+from datetime import datetime
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), os.pardir))
+from NWCmesonet import parse_mts, fig_path
+from mts_archive import MTSArchive
+from bench_parse_mts import synthetic_mts
+# --------------------------------
+WX = os.path.join(os.path.dirname(os.path.abspath(__file__)), os.pardir,
+                  "wx.py")
+# modules a run with nothing to do should never import
+HEAVY = ["xarray", "pandas", "matplotlib", "cartopy", "mpl_toolkits",
+         "scipy", "cmocean"]
+# --------------------------------
+def importtime(args):
+    """
+    Run wx.py under python -X importtime
+    input args: list of str arguments to wx.py
+    Return (float wall seconds, dict of {top-level module: cumulative
+            import seconds}, set of all imported module names)
+    """
+    t0 = time.perf_counter()
+    p = subprocess.run([sys.executable, "-X", "importtime", WX] + args,
+                       capture_output=True, text=True)
+    wall = time.perf_counter() - t0
+    if p.returncode != 0:
+        raise RuntimeError(f"wx.py {' '.join(args)} failed:\n{p.stderr}")
+    top, names = {}, set()
+    for line in p.stderr.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        _, cum, name = line[len("import time:"):].split("|")
+        names.add(name.strip())
+        # nested imports are indented under the module importing them
+        if not name[1:].startswith(" "):
+            top[name.strip()] = int(cum) / 1e6
+    return wall, top, names
+# --------------------------------
+def check(label, args, budget, repeats):
+    """
+    Time a wx.py run and compare its imports to the budget
+    Return bool True if within budget
+    """
+    # first run may compile .pyc files: keep the fastest
+    runs = [importtime(args) for _ in range(repeats)]
+    wall, top, names = min(runs, key=lambda r: sum(r[1].values()))
+    total = sum(top.values())
+    heavy = sorted(h for h in HEAVY
+                   if any(n == h or n.startswith(h + ".") for n in names))
+    ok = total <= budget and len(heavy) == 0
+    print(f"{label}: imports {total:.3f} s, process {wall:.3f} s "
+          f"[{'ok' if ok else 'FAIL'}]")
+    for name, t in sorted(top.items(), key=lambda x: -x[1])[:5]:
+        print(f"    {t:.3f} s  {name}")
+    if heavy:
+        print(f"    imported heavy modules: {', '.join(heavy)}")
+    return ok
+# --------------------------------
+if __name__ == "__main__":
+    parser = ArgumentParser()
+    parser.add_argument("-b", action="store", dest="budget", type=float,
+                        default=0.5, help="Import time budget in seconds")
+    parser.add_argument("-r", action="store", dest="repeats", type=int,
+                        default=3, help="Runs per command, fastest is kept")
+    args = parser.parse_args()
+
+    # a day whose figure exists and is archived
+    date = datetime(2026, 10, 17)
+    tmp = tempfile.mkdtemp()
+    sdir = os.path.join(tmp, "figures") + os.sep
+    os.makedirs(f"{sdir}{date.year:04d}")
+    open(fig_path(date, f"{sdir}{date.year:04d}/"), "w").close()
+    adir = os.path.join(tmp, "archive")
+    MTSArchive(adir).append(parse_mts(synthetic_mts(date)))
+    configs = {}
+    for name, extra in (("plain", ""), ("archive", f"archive_dir: {adir}\n")):
+        configs[name] = os.path.join(tmp, f"{name}.yaml")
+        with open(configs[name], "w") as f:
+            f.write(f"sdir_local: {sdir}\n{extra}")
+    day = ["-d", date.strftime("%Y%m%d"), "--no-upload"]
+
+    results = [
+        check("wx.py --help", ["--help"], args.budget, args.repeats),
+        check("wx.py nwc, figure exists", ["nwc", "-c", configs["plain"]]
+              + day, args.budget, args.repeats),
+        check("wx.py nwc, figure exists and day archived",
+              ["nwc", "-c", configs["archive"]] + day, args.budget,
+              args.repeats)
+    ]
+    raise SystemExit(0 if all(results) else 1)
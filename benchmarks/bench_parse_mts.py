@@ -0,0 +1,86 @@
+"""
+Benchmark vectorized parse_mts against the original per-line loop used in
+plot_NWC, over a year of synthetic 1440-row NWC mts files
+
+Usage: python benchmarks/bench_parse_mts.py [-n ndays]
+"""
+import os
+import sys
+import time
+import numpy as np
+import pandas as pd
+import xarray as xr
+from argparse import ArgumentParser
+from datetime import datetime, timedelta
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), os.pardir))
+from NWCmesonet import parse_mts
+# --------------------------------
+HEADERS = ["TIME", "RELH", "TAIR", "WSPD", "WVEC", "WDIR", "WDSD", "WSSD",
+           "WMAX", "RAIN", "PRES", "SRAD", "TA9M", "WS2M", "SKIN"]
+# --------------------------------
+def synthetic_mts(date, seed=0):
+    """
+    Create text of a synthetic 1440-row NWC mts file
+    input date: datetime object of file date
+    input seed: int seed for random number generator
+    Return str
+    """
+    rng = np.random.default_rng(seed)
+    data = rng.uniform(0., 100., size=(1440, len(HEADERS)))
+    # sprinkle in missing values
+    data[rng.random(data.shape) < 0.01] = -996.
+    data[:, 0] = np.arange(1440)
+    lines = ["  101 ! (c) 2022 Board of Regents of the University of Oklahoma.",
+             f"   {len(HEADERS)+2} {date.strftime('%Y %m %d')} 00 00 00",
+             " STID  STNM " + " ".join(f"{h:>6s}" for h in HEADERS)]
+    for row in data:
+        lines.append(" NWCM   999 " + " ".join(f"{v:6.2f}" for v in row))
+    return "\n".join(lines) + "\n"
+# --------------------------------
+def parse_mts_loop(text, date):
+    """
+    Original per-line parser from plot_NWC, kept for comparison
+    """
+    dat = text.split("\n")
+    headers = dat[2].split()[2:]
+    nwc = {}
+    for h in headers:
+        nwc[h] = []
+    for line in dat[3:-1]:
+        [nwc[h].append(float(ll)) for ll, h in zip(line.split()[2:], nwc.keys())]
+    for key in nwc.keys():
+        nwc[key] = np.array(nwc[key])
+    for val in nwc.values():
+        val[val < -100.] = np.nan
+    times = pd.date_range(start=date, periods=1440, freq="min")
+    df = xr.Dataset(data_vars=None, coords=dict(time=times))
+    for key, val in nwc.items():
+        df[key] = xr.DataArray(data=val, dims="time", coords=dict(time=times))
+    return df
+# --------------------------------
+if __name__ == "__main__":
+    parser = ArgumentParser()
+    parser.add_argument("-n", action="store", dest="ndays", type=int,
+                        default=365, help="Number of days to parse")
+    args = parser.parse_args()
+    days = [datetime(2021, 1, 1) + timedelta(days=i) for i in range(args.ndays)]
+    print(f"Generating {args.ndays} synthetic mts files")
+    files = [synthetic_mts(d, seed=i) for i, d in enumerate(days)]
+    # make sure both parsers agree on first file
+    ds_loop = parse_mts_loop(files[0], days[0])
+    ds_vec = parse_mts(files[0])
+    for h in HEADERS[1:]:
+        np.testing.assert_array_equal(ds_loop[h].values, ds_vec[h].values)
+    np.testing.assert_array_equal(ds_loop.time.values, ds_vec.time.values)
+    # time each
+    t0 = time.perf_counter()
+    for f, d in zip(files, days):
+        parse_mts_loop(f, d)
+    t_loop = time.perf_counter() - t0
+    t0 = time.perf_counter()
+    for f in files:
+        parse_mts(f)
+    t_vec = time.perf_counter() - t0
+    print(f"Loop parser:       {t_loop:.2f} s ({1000*t_loop/args.ndays:.1f} ms/file)")
+    print(f"Vectorized parser: {t_vec:.2f} s ({1000*t_vec/args.ndays:.1f} ms/file)")
+    print(f"Speedup: {t_loop/t_vec:.1f}x")
@@ -0,0 +1,106 @@
+'''
+Benchmark the nearest-station perimeter extension: the per-vertex nearest()
+loop from OK_map_contour.py against ok_gridding.StationIndex (one cKDTree
+query). By default the border is the Oklahoma polygon from a states
+shapefile read through a resolution 'h' Basemap; without a shapefile a
+synthetic border with the same number of vertices is used.
+
+Usage: python benchmarks/bench_perimeter.py [-s shapefile] [-n nstation]
+       [-b nborder] [-r repeats]
+'''
+import os
+import sys
+import time
+import numpy as np
+from argparse import ArgumentParser
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), os.pardir))
+from ok_grid import llcrnrlat, urcrnrlat, llcrnrlon, urcrnrlon
+from ok_gridding import StationIndex
+
+
+def perimeter_loop(x1, y1, values, xy):
+    '''
+    Perimeter extension as written in OK_map_contour.py
+    '''
+    def nearest(Lon, Lat):
+        # returns index of closest mesonet site
+        dist = np.sqrt((Lon - np.array(x1))**2. + (Lat - np.array(y1))**2.)
+        return np.argmin(dist)
+
+    v_perim, latperim, lonperim = ([] for i in range(3))
+    for i in range(len(xy)):
+        iclose = nearest(xy[i, 0], xy[i, 1])
+        v_perim.append(values[iclose])
+        latperim.append(xy[i, 1])
+        lonperim.append(xy[i, 0])
+
+    x2 = np.concatenate((x1, np.array(lonperim)))
+    y2 = np.concatenate((y1, np.array(latperim)))
+    v2 = np.concatenate((values, np.array(v_perim)))
+    return np.array(list(zip(x2, y2))), v2
+
+
+def border_h(shapefile):
+    '''
+    Return Oklahoma border vertices from shapefile on a resolution 'h' map
+    and the map
+    '''
+    from mpl_toolkits.basemap import Basemap
+    m = Basemap(projection='merc', llcrnrlat=llcrnrlat, urcrnrlat=urcrnrlat,
+                llcrnrlon=llcrnrlon, urcrnrlon=urcrnrlon, resolution='h')
+    m.readshapefile(shapefile, 'states', drawbounds=False)
+    for info, shape in zip(m.states_info, m.states):
+        if info['STATE_NAME'] == 'Oklahoma':
+            return np.array(shape), m
+
+
+def border_synthetic(n, rng):
+    '''
+    Return n vertices around a rough Oklahoma outline in metres
+    '''
+    corners = np.array([(0., 380e3), (930e3, 380e3), (950e3, 170e3),
+                        (940e3, 0.), (560e3, 40e3), (320e3, 110e3),
+                        (320e3, 330e3), (0., 330e3), (0., 380e3)])
+    t = np.linspace(0., len(corners) - 1, n)
+    xy = np.column_stack([np.interp(t, np.arange(len(corners)), corners[:, i])
+                          for i in range(2)])
+    return xy + rng.normal(0., 200., xy.shape)
+
+
+if __name__ == '__main__':
+    parser = ArgumentParser()
+    parser.add_argument('-s', action='store', dest='shapefile', type=str,
+                        help='States shapefile (no extension)')
+    parser.add_argument('-n', action='store', dest='nstation', type=int,
+                        default=120, help='Number of stations')
+    parser.add_argument('-b', action='store', dest='nborder', type=int,
+                        default=20000, help='Synthetic border vertices')
+    parser.add_argument('-r', action='store', dest='repeats', type=int,
+                        default=3, help='Repeats per method')
+    args = parser.parse_args()
+    rng = np.random.default_rng(0)
+    if args.shapefile is not None:
+        xy, m = border_h(args.shapefile)
+        x1, y1 = m(rng.uniform(-100., -94.6, args.nstation),
+                   rng.uniform(33.9, 36.9, args.nstation))
+        x1, y1 = np.asarray(x1), np.asarray(y1)
+    else:
+        xy = border_synthetic(args.nborder, rng)
+        x1 = rng.uniform(330e3, 930e3, args.nstation)
+        y1 = rng.uniform(50e3, 370e3, args.nstation)
+    values = rng.normal(20., 5., args.nstation)
+    print(f'{len(xy)} border vertices, {args.nstation} stations')
+
+    t_loop, t_tree = [], []
+    for _ in range(args.repeats):
+        t0 = time.perf_counter()
+        p_loop, v_loop = perimeter_loop(x1, y1, values, xy)
+        t_loop.append(time.perf_counter() - t0)
+        t0 = time.perf_counter()
+        p_tree, v_tree = StationIndex(x1, y1).extend_to_border(values, xy)
+        t_tree.append(time.perf_counter() - t0)
+    print(f'nearest() loop: {1000*min(t_loop):.1f} ms')
+    print(f'cKDTree:        {1000*min(t_tree):.1f} ms '
+          f'({min(t_loop)/min(t_tree):.0f}x)')
+    same = np.array_equal(p_loop, p_tree) and np.array_equal(v_loop, v_tree)
+    print(f'Identical output: {same}')
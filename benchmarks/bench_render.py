@@ -0,0 +1,60 @@
+"""
+Benchmark per-day meteogram rendering: new figure every day (render_NWC)
+against one reused MeteogramRenderer, over synthetic days
+
+Usage: python benchmarks/bench_render.py [-n ndays] [--usetex] [--freeze]
+"""
+import os
+import sys
+import time
+import tempfile
+import numpy as np
+import matplotlib
+matplotlib.use("Agg")
+from matplotlib import rc
+from argparse import ArgumentParser
+from datetime import datetime, timedelta
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), os.pardir))
+from NWCmesonet import parse_mts, add_colors, render_NWC, MeteogramRenderer, \
+    set_style
+from derived import add_derived
+from bench_parse_mts import synthetic_mts
+# --------------------------------
+def time_days(render, days):
+    """
+    Return array of seconds spent rendering each Dataset in days
+    """
+    dt = []
+    for df in days:
+        t0 = time.perf_counter()
+        render(df)
+        dt.append(time.perf_counter() - t0)
+    return np.array(dt)
+# --------------------------------
+if __name__ == "__main__":
+    parser = ArgumentParser()
+    parser.add_argument("-n", action="store", dest="ndays", type=int,
+                        default=365, help="Number of days to render")
+    parser.add_argument("--usetex", action="store_true", dest="usetex",
+                        help="Render text with LaTeX as NWCmesonet does")
+    parser.add_argument("--freeze", action="store_true", dest="freeze",
+                        help="Freeze renderer layout after first day")
+    args = parser.parse_args()
+    set_style()
+    if not args.usetex:
+        rc("text", usetex=False)
+    days = []
+    for i in range(args.ndays):
+        d = datetime(2021, 1, 1) + timedelta(days=i)
+        days.append(add_colors(add_derived(parse_mts(synthetic_mts(d, i)))))
+    sdir = tempfile.mkdtemp() + os.sep
+    print(f"Rendering {args.ndays} days to {sdir}")
+    dt_new = time_days(lambda df: render_NWC(df, sdir), days)
+    renderer = MeteogramRenderer(freeze_layout=args.freeze)
+    dt_reuse = time_days(lambda df: renderer.render(df, sdir), days)
+    renderer.close()
+    for name, dt in (("New figure per day", dt_new),
+                     ("Reused renderer", dt_reuse)):
+        print(f"{name}: first {dt[0]:.2f} s, mean of rest "
+              f"{np.mean(dt[1:]):.3f} s, total {np.sum(dt):.1f} s")
+    print(f"Speedup over batch: {np.sum(dt_new)/np.sum(dt_reuse):.2f}x")
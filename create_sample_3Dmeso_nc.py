@@ -1,17 +1,15 @@
 import numpy as np
 import matplotlib.pyplot as plt
 import cmocean
-from mpl_toolkits.basemap import Basemap
 import netCDF4
-from scipy import interpolate
-from matplotlib.patches import Polygon
-from matplotlib.collections import PatchCollection
 import matplotlib.patheffects as PathEffects
-from matplotlib.path import Path
-import urllib2
 import warnings
 import numpy.ma as ma
 import time
+from ok_grid import MercTransform, get_ok_grid
+from ok_gridding import StationIndex, get_interpolator
+from mesonet_current import valid
+from mesonet_poll import latest_snapshot
 
 warnings.filterwarnings("ignore",".*invalid value encountered in less.*")
 
@@ -33,100 +31,40 @@ urcrnrlon = -94.0
 # Grid spacing - degrees lat, lon
 gridspace = 0.01
 
-# Initialize map
-fig_map, ax_map = plt.subplots(1, figsize=(12, 6.75))
-m = Basemap(projection='merc', llcrnrlat=llcrnrlat, urcrnrlat=urcrnrlat, 
-    llcrnrlon=llcrnrlon, urcrnrlon=urcrnrlon, resolution='i', ax=ax_map)
+# Map projection (same coordinates as the merc Basemap, without building it)
+m = MercTransform(llcrnrlon, llcrnrlat, urcrnrlon, urcrnrlat)
 
-# Draw patches over not Oklahoma
+# Oklahoma border, grid, and mask, cached per grid spacing and projection
 shapefile = my_nextcloud + 'documentation/States/states_21basic/states'
-m.readshapefile(shapefile, 'states', drawbounds = False)
-patch = []
-patch_ok = []
-for info, shape in zip(m.states_info, m.states):
-	if info['STATE_NAME'] != 'Oklahoma':
-		patch.append( Polygon(np.array(shape), True) )
-	else:
-		patch_ok.append( Polygon(np.array(shape), True))
-
-# get OK border polygon points
-xy = patch_ok[0].get_xy()
-
-# dimensions of new meshgrid
-xnew = np.arange(llcrnrlon, urcrnrlon, gridspace)
-ynew = np.arange(llcrnrlat, urcrnrlat, gridspace)
-xx, yy = np.meshgrid(xnew, ynew)
-# flatten
-xxyyflat = np.dstack((xx, yy))
-xxyyflat = xxyyflat.reshape(-1, 2)
-
-URL = 'http://www.mesonet.org/data/public/mesonet/current/current.csv.txt'
-fd = urllib2.urlopen(URL)
-data_long = fd.read()
-data = data_long.split('\n')
-lat_, lon_, yr_, mo_, da_, hr_, mi_, T_, Temps, lats, lons, yr, mo, da, hr, mi \
-	= ([] for i in range(16))
-for i in np.arange(1, len(data)-1):
-	data_short = data[i].split(',')
-	lat_.append(float(data_short[3]))
-	lon_.append(float(data_short[4]))
-	yr_.append(float(data_short[5]))
-	mo_.append(float(data_short[6]))
-	da_.append(float(data_short[7]))
-	hr_.append(float(data_short[8]))
-	mi_.append(float(data_short[9]))
-	T_.append(data_short[11])
-
-for i in np.arange(len(T_)):
-	if T_[i] != ' ':
-		Temps.append(float(T_[i]))
-		lats.append(lat_[i])
-		lons.append(lon_[i])
-		yr.append(yr_[i]) 
-		mo.append(mo_[i]) 
-		da.append(da_[i]) 
-		hr.append(hr_[i]) 
-		mi.append(mi_[i]) 
+grid = get_ok_grid(m, shapefile, gridspace)
+xy = grid.border
+xnew, ynew = grid.xnew, grid.ynew
+
+stations = valid(latest_snapshot(), 'TDEW')
+Temps = stations.TDEW
+lats = stations.LAT
+lons = stations.LON
+yr, mo, da, hr, mi = (stations[c]
+	for c in ('YR', 'MO', 'DA', 'HR', 'MI'))
 
 timeValid_str = '%04d%02d%02d_%02d%02d' % (yr[0], mo[0], da[0], hr[0], mi[0])
 
 # transopose to basemap coordinates
-lon, lat, xplot, yplot = m.makegrid(len(xnew), len(ynew), returnxy=True)
+xplot, yplot = grid.xplot, grid.yplot
 x1, y1 = m(lons, lats)
 
-# Extend values to perimiter
-def nearest(Lon, Lat):
-	# returns index of closest mesonet site
-	dist = np.sqrt((Lon - np.array(x1))**2. + (Lat - np.array(y1))**2.)
-	return np.argmin(dist)
-
-Tperim, latperim, lonperim = ([] for i in range(3))
-for i in range(len(xy)):
-	iclose = nearest(xy[i, 0], xy[i, 1])
-	Tperim.append(Temps[iclose])
-	latperim.append(xy[i, 1])
-	lonperim.append(xy[i, 0])
-
-x2 = x1 + lonperim
-y2 = y1 + latperim
-T2 = Temps + Tperim
-
+# Extend values to perimiter: each border point takes its nearest station
 # mesonet lat lon pairs in basemap coords
-points = np.array(zip(x2, y2))
+points, T2 = StationIndex(x1, y1).extend_to_border(Temps, xy)
 
 # interpolate
 t0 = time.time()
-Tnew = interpolate.griddata(points, T2, (xplot, yplot), method='cubic')
-print "Interpolate time: %s seconds" % (time.time() - t0)
-# Determine which points inside OK
-mpath = Path(xy)
-xxyyplot = np.dstack((xplot, yplot))
-xxyyplot_flat = xxyyplot.reshape(-1, 2)
+Tnew = get_interpolator(points, xplot, yplot)(T2, method='cubic')
+print("Interpolate time: %s seconds" % (time.time() - t0))
+# Determine which points inside OK (computed once, then loaded from cache)
 tstart = time.time()
-# use invert because this shapefile goes clockwise, mpath assumes ccw
-mask_flat = np.invert(mpath.contains_points(xxyyplot_flat))
-mask = mask_flat.reshape(xplot.shape)
-print "Mask time: %s seconds" % (time.time() - tstart)
+mask = grid.mask
+print("Mask time: %s seconds (%s)" % (time.time() - tstart, grid.report()))
 
 # Cast mask as nans - this is sfc level
 T0 = Tnew
@@ -182,11 +120,11 @@ Tstation[:len(Temps)] = Temps
 x_station[:len(Temps)] = lons
 y_station[:len(Temps)] = lats
 # Assign to unlimited dimension variable
-levels = range(4)
-x = range(len(Temps))
+levels = list(range(4))
+x = list(range(len(Temps)))
 
 # Close file
 rootgrp.close()
 
-print '>>File created successfully'
-print '>>Time valid: {0:s}'.format(timeValid_str)
+print('>>File created successfully')
+print('>>Time valid: {0:s}'.format(timeValid_str))
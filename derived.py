@@ -0,0 +1,138 @@
+# --------------------------------
+# Name: derived.py
+# Author: Brian R. Greene
+# University of Oklahoma
+# Updated: 18 October 2026
+# Purpose: Vectorized derived quantities for Mesonet data. Every function
+# works on whole arrays at once; conditional formulas (wind chill, heat
+# index adjustments) are applied with masks instead of scalar if checks.
+# add_derived() computes all of them on a Dataset from parse_mts.
+# --------------------------------
+import numpy as np
+# --------------------------------
+# unit conversions
+def c_to_f(T):
+    return 1.8 * T + 32.
+
+def f_to_c(T):
+    return (T - 32.) / 1.8
+
+def ms_to_mph(V):
+    return 2.24 * V
+
+def ms_to_kts(V):
+    return 1.94384 * V
+# --------------------------------
+def dewpoint(T, RH):
+    """
+    Calculate dewpoint temperature with the Magnus formula
+    input T: air temperature in degC
+    input RH: relative humidity in %
+    Return dewpoint in degC
+    """
+    es = 6.112 * np.exp(17.67 * T / (T + 243.5))
+    e = RH * es / 100.
+    return (243.5*np.log(e/6.112)) / (17.67 - np.log(e/6.112))
+# --------------------------------
+def wind_chill(T, V):
+    """
+    Calculate NWS wind chill, defined for T <= 50 degF and V >= 3 mph
+    input T: air temperature in degF
+    input V: wind speed in mph
+    Return wind chill in degF, nan where undefined
+    """
+    T = np.asarray(T, dtype=np.float64)
+    V = np.asarray(V, dtype=np.float64)
+    V16 = V**0.16
+    WC = 35.74 + 0.6215*T - 35.75*V16 + 0.4275*T*V16
+    return np.where((T <= 50.) & (V >= 3.), WC, np.nan)
+# --------------------------------
+def heat_index(T, RH):
+    """
+    Calculate NWS heat index: simple Steadman formula, replaced by the
+    Rothfusz regression with low/high humidity adjustments where the
+    simple estimate is 80 degF or above
+    input T: air temperature in degF
+    input RH: relative humidity in %
+    Return heat index in degF
+    """
+    T = np.asarray(T, dtype=np.float64)
+    RH = np.asarray(RH, dtype=np.float64)
+    HI = 0.5 * (T + 61. + (T - 68.)*1.2 + RH*0.094)
+    HR = -42.379 + 2.04901523*T + 10.14333127*RH - .22475541*T*RH -\
+         .00683783*T*T - .05481717*RH*RH + .00122874*T*T*RH +\
+         .00085282*T*RH*RH - .00000199*T*T*RH*RH
+    # adjustments
+    lo = (RH < 13.) & (T > 80.) & (T < 112.)
+    HR[lo] -= ((13.-RH[lo])/4.) * np.sqrt((17.-np.abs(T[lo]-95.))/17.)
+    hi = (RH > 85.) & (T > 80.) & (T < 87.)
+    HR[hi] += ((RH[hi]-85.)/10.) * ((87.-T[hi])/5.)
+    use = (HI + T) / 2. >= 80.
+    HI[use] = HR[use]
+    return HI
+# --------------------------------
+def apparent_temperature(T, RH, V):
+    """
+    Calculate apparent temperature: wind chill where defined, heat index
+    where T >= 80 degF, otherwise air temperature
+    input T: air temperature in degF
+    input RH: relative humidity in %
+    input V: wind speed in mph
+    Return apparent temperature in degF, nan where an input it depends on
+           is missing
+    """
+    T = np.asarray(T, dtype=np.float64)
+    V = np.asarray(V, dtype=np.float64)
+    WC = wind_chill(T, V)
+    AT = np.where(np.isnan(WC), T, WC)
+    # missing wind: unknown whether wind chill applies
+    AT[(T <= 50.) & np.isnan(V)] = np.nan
+    hot = T >= 80.
+    AT[hot] = heat_index(T[hot], np.asarray(RH, dtype=np.float64)[hot])
+    return AT
+# --------------------------------
+# derived variables: name -> (units, name_long)
+DERIVED_ATTRS = {
+    "TDEW": ("$^\\circ$C", "1.5m Dewpoint Temperature"),
+    "TAIR_F": ("$^\\circ$F", "1.5m Air Temperature"),
+    "TA9M_F": ("$^\\circ$F", "9m Air Temperature"),
+    "TDEW_F": ("$^\\circ$F", "1.5m Dewpoint Temperature"),
+    "CHIL_F": ("$^\\circ$F", "Wind Chill"),
+    "HEAT_F": ("$^\\circ$F", "Heat Index"),
+    "APPT_F": ("$^\\circ$F", "Apparent Temperature"),
+    "WSPD_mph": ("mph", "Wind Speed"),
+    "WMAX_mph": ("mph", "Wind Gust"),
+    "WS2M_mph": ("mph", "2m Wind Speed")
+}
+# --------------------------------
+def add_derived(df):
+    """
+    Add derived variables to Dataset from parse_mts in place
+    input df: xarray Dataset with TAIR, RELH, WSPD (and optionally TA9M,
+              WMAX, WS2M) in mts units
+    Return df
+    """
+    dims = df.TAIR.dims
+    T = df.TAIR.values
+    RH = df.RELH.values
+    df["TDEW"] = (dims, dewpoint(T, RH))
+    df["TAIR_F"] = (dims, c_to_f(T))
+    df["TDEW_F"] = (dims, c_to_f(df.TDEW.values))
+    df["WSPD_mph"] = (dims, ms_to_mph(df.WSPD.values))
+    if "TA9M" in df:
+        df["TA9M_F"] = (dims, c_to_f(df.TA9M.values))
+    if "WMAX" in df:
+        df["WMAX_mph"] = (dims, ms_to_mph(df.WMAX.values))
+    if "WS2M" in df:
+        df["WS2M_mph"] = (dims, ms_to_mph(df.WS2M.values))
+    # wind chill with 1.5m temp and 10m wspd
+    df["CHIL_F"] = (dims, wind_chill(df.TAIR_F.values, df.WSPD_mph.values))
+    df["HEAT_F"] = (dims, heat_index(df.TAIR_F.values, RH))
+    df["APPT_F"] = (dims, apparent_temperature(df.TAIR_F.values, RH,
+                                               df.WSPD_mph.values))
+    # metadata
+    for key, (units, name_long) in DERIVED_ATTRS.items():
+        if key in df:
+            df[key].attrs["units"] = units
+            df[key].attrs["name_long"] = name_long
+    return df
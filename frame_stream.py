@@ -0,0 +1,219 @@
+'''
+Stream rendered map frames straight into an animation encoder. Figures are
+drawn to raw RGB buffers with the Agg canvas and piped to ffmpeg (mp4, gif,
+webp, ...) one at a time, so no intermediate PNGs are written and memory
+stays bounded. GIFs are encoded with a palette made in a separate ffmpeg
+pass over the first few frames only, so the encoder does not have to hold
+the whole stream to build one. Without ffmpeg, short animated WebP/GIF loops are written
+with Pillow, which holds every frame until the file is written.
+stream_frames() renders frames in worker processes with a bounded window of
+frames in flight and hands them to the encoder in order.
+
+Author: Brian R. Greene, University of Oklahoma
+Updated: 18 October 2026
+'''
+import os
+import shutil
+import tempfile
+import subprocess
+import multiprocessing
+import numpy as np
+from concurrent.futures import ProcessPoolExecutor
+
+
+def fig_to_rgb(fig, dpi=None):
+    '''
+    Draw figure with its Agg canvas and return pixels
+    input fig: matplotlib figure (Agg backend)
+    input dpi: float dots per inch to draw at, default=figure dpi
+    Return uint8 array (height, width, 3)
+    '''
+    if dpi is not None:
+        fig.set_dpi(dpi)
+    fig.canvas.draw()
+    return np.asarray(fig.canvas.buffer_rgba())[..., :3].copy()
+
+
+class FFmpegWriter:
+    '''
+    Encode frames by piping raw rgb24 to an ffmpeg subprocess
+    '''
+    def __init__(self, path, fps=4., loop=0, palette_frames=4):
+        '''
+        input path: str output path; format from extension (.mp4, .gif, ...)
+        input fps: float frames per second
+        input loop: int times to loop gif/webp, 0=forever
+        input palette_frames: int first frames a gif palette is made from
+        '''
+        self.path = path
+        self.fps = fps
+        self.loop = loop
+        self.palette_frames = palette_frames
+        self.gif = os.path.splitext(path)[1].lower() == '.gif'
+        self.proc = None
+        self.palette = None
+        self.sample = []
+
+    def _input(self, shape):
+        h, w = shape[:2]
+        return ['-f', 'rawvideo', '-pix_fmt', 'rgb24', '-s', f'{w}x{h}',
+                '-r', str(self.fps), '-i', '-']
+
+    def _make_palette(self):
+        '''
+        Make a gif palette from the sampled frames in a separate ffmpeg run
+        '''
+        fd, self.palette = tempfile.mkstemp(suffix='.png')
+        os.close(fd)
+        cmd = ['ffmpeg', '-y', '-loglevel', 'error'] + \
+            self._input(self.sample[0].shape) + \
+            ['-vf', 'palettegen', '-update', '1', self.palette]
+        subprocess.run(cmd, input=b''.join(
+            np.ascontiguousarray(f).tobytes() for f in self.sample),
+            check=True)
+
+    def _start(self, shape):
+        ext = os.path.splitext(self.path)[1].lower()
+        cmd = ['ffmpeg', '-y', '-loglevel', 'error'] + self._input(shape)
+        if self.gif:
+            # fixed palette: paletteuse maps each frame as it arrives
+            self._make_palette()
+            cmd += ['-i', self.palette, '-lavfi', '[0:v][1:v]paletteuse',
+                    '-loop', str(self.loop)]
+        elif ext == '.webp':
+            cmd += ['-vcodec', 'libwebp_anim', '-lossless', '0',
+                    '-loop', str(self.loop)]
+        else:
+            # yuv420p needs even dimensions
+            cmd += ['-vf', 'pad=ceil(iw/2)*2:ceil(ih/2)*2',
+                    '-vcodec', 'libx264', '-pix_fmt', 'yuv420p']
+        self.proc = subprocess.Popen(cmd + [self.path], stdin=subprocess.PIPE)
+        for frame in self.sample:
+            self.proc.stdin.write(np.ascontiguousarray(frame).tobytes())
+        self.sample = []
+
+    def write(self, frame):
+        '''
+        Encode one uint8 (height, width, 3) frame
+        '''
+        if self.proc is None:
+            self.sample.append(frame)
+            # a gif waits for the frames its palette is made from
+            if not self.gif or len(self.sample) >= self.palette_frames:
+                self._start(frame.shape)
+            return
+        self.proc.stdin.write(np.ascontiguousarray(frame).tobytes())
+
+    def close(self):
+        try:
+            if self.proc is None and len(self.sample) > 0:
+                self._start(self.sample[0].shape)
+            if self.proc is not None:
+                self.proc.stdin.close()
+                if self.proc.wait() != 0:
+                    raise RuntimeError(f'ffmpeg failed writing {self.path}')
+        finally:
+            if self.palette is not None:
+                os.remove(self.palette)
+                self.palette = None
+
+
+class PillowWriter:
+    '''
+    Encode animated WebP or GIF with Pillow. Pillow can only encode an
+    animation once it has every frame, so frames are held in memory until
+    close(): GIF frames palettized (1 byte per pixel), WebP frames as RGB.
+    Memory grows with the number of frames, so at most max_frames are
+    accepted; use ffmpeg for long loops.
+    '''
+    def __init__(self, path, fps=4., loop=0, max_frames=240):
+        '''
+        input path: str output path ending in .webp or .gif
+        input fps: float frames per second
+        input loop: int times to loop, 0=forever
+        input max_frames: int most frames held before encoding
+        '''
+        self.path = path
+        self.fps = fps
+        self.loop = loop
+        self.max_frames = max_frames
+        self.gif = os.path.splitext(path)[1].lower() == '.gif'
+        self.frames = []
+
+    def write(self, frame):
+        '''
+        Add one uint8 (height, width, 3) frame
+        '''
+        from PIL import Image
+        if len(self.frames) >= self.max_frames:
+            raise RuntimeError(f'{self.path}: more than {self.max_frames} '
+                               'frames need ffmpeg to stream them')
+        im = Image.fromarray(frame)
+        if self.gif:
+            # as Pillow's GIF encoder converts RGB frames
+            im = im.convert('P', palette=Image.Palette.ADAPTIVE)
+        self.frames.append(im)
+
+    def close(self):
+        if len(self.frames) > 0:
+            self.frames[0].save(self.path, save_all=True,
+                                append_images=self.frames[1:],
+                                duration=int(1000 / self.fps),
+                                loop=self.loop)
+        self.frames = []
+
+
+def get_writer(path, fps=4., loop=0):
+    '''
+    Return FFmpegWriter if ffmpeg is installed, else PillowWriter for
+    .webp/.gif output (frames held in memory, capped)
+    '''
+    if shutil.which('ffmpeg') is not None:
+        return FFmpegWriter(path, fps, loop)
+    if os.path.splitext(path)[1].lower() in ('.webp', '.gif'):
+        return PillowWriter(path, fps, loop)
+    raise RuntimeError(f'ffmpeg is required to write {path}')
+
+
+def stream_frames(render, sources, writer, nproc=1, window=None,
+                  initializer=None, initargs=()):
+    '''
+    Render frames and write them to writer in order of sources
+    input render: function of one source returning uint8 (h, w, 3) frame;
+                  must be importable by worker processes when nproc > 1
+    input sources: list of arguments for render
+    input writer: FFmpegWriter or PillowWriter, closed when done
+    input nproc: int number of worker processes, 1=render in this process
+    input window: int frames rendered ahead of the encoder, default=2*nproc;
+                  bounds frames waiting on the encoder to window
+    input initializer, initargs: worker process initializer and arguments
+    Return int number of frames written
+    '''
+    try:
+        # fail before rendering, not after max_frames renders
+        max_frames = getattr(writer, 'max_frames', None)
+        if max_frames is not None and len(sources) > max_frames:
+            raise RuntimeError(f'{len(sources)} frames is more than '
+                               f'{max_frames}; install ffmpeg to stream them')
+        if nproc <= 1:
+            if initializer is not None:
+                initializer(*initargs)
+            for src in sources:
+                writer.write(render(src))
+            return len(sources)
+        if window is None:
+            window = 2 * nproc
+        ctx = multiprocessing.get_context('spawn')
+        with ProcessPoolExecutor(max_workers=nproc, mp_context=ctx,
+                                 initializer=initializer,
+                                 initargs=initargs) as pool:
+            futures = [pool.submit(render, src) for src in sources[:window]]
+            for i in range(len(sources)):
+                frame = futures[i].result()
+                futures[i] = None
+                if i + window < len(sources):
+                    futures.append(pool.submit(render, sources[i+window]))
+                writer.write(frame)
+        return len(sources)
+    finally:
+        writer.close()
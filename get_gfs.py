@@ -1,80 +1,95 @@
 '''
-Automatically fetch grb2 files from nomads ncdc/ncei ftp server and save to
+Automatically fetch grb2 files from the NCEI GFS analysis archive and save to
 directory of choosing. Optionally will convert files to netCDF4 and remove
-grib files.
+grib files. Conversion runs in parallel worker processes and writes packed,
+compressed netCDF; --clean only removes grib files that converted.
 
 Note: requires python 3 environment with pynio - pyn_env
 
 Author: Brian R. Greene, University of Oklahoma
-Updated: 11 September 2019
+Updated: 18 October 2026 - parallel, resumable downloads with gfs_download;
+    only the fields in gfs_fields.py are fetched unless --full; parallel
+    compressed netCDF conversion with gfs_convert; --store consolidates into
+    one time-indexed file with gfs_store
 '''
 import os
-import xarray as xr
-from datetime import datetime, timedelta
+from datetime import datetime
 from argparse import ArgumentParser
 from glob import glob
-
-# command line arguments
-parser = ArgumentParser()
-parser.add_argument('-ds', required=True, action='store', dest='d_s',
-    nargs=1, type=str, help='Start date YYYYMMDD')
-parser.add_argument('-de', required=True, action='store', dest='d_e',
-    nargs=1, type=str, help='End date YYYYMMDD')
-parser.add_argument('-s', required=True, action='store', dest='s',
-    nargs=1, type=str, help='Save folder name')
-parser.add_argument('--netCDF', action='store_true', dest='convert', 
-    help='Convert to netCDF4?')
-parser.add_argument('--clean', action='store_true', dest='clean',
-    help='Remove grib files?')
-args = parser.parse_args()
-
-# base url for ftp server
-url_base = 'ftp://nomads.ncdc.noaa.gov/GFS/analysis_only/'
-# save directory
-save_path = os.path.join(f'{os.path.expanduser("~")}', 'Documents', 'Data',
-    'GFS', args.s[0])
-# create directory if it does not already exist
-if not os.path.exists(save_path):
-    os.mkdir(save_path)
-
-# convert to datetime objects for easier handling
-dt_s = datetime.strptime(args.d_s[0], '%Y%m%d')
-dt_e = datetime.strptime(args.d_e[0], '%Y%m%d')
-
-# create array of datetime objects between start and end dates
-dt_range = []
-i_dt = dt_s
-while i_dt <= dt_e:
-    dt_range.append(i_dt)
-    i_dt += timedelta(days=1)
-
-# download files
-for dt in dt_range:
-    url = f'{url_base}{dt.strftime("%Y%m")}/{dt.strftime("%Y%m%d")}/gfsanl_3_*000.grb2'
-    os.system(f'cd {save_path}; wget {url}')
-
-print('Finished saving grib files.')
-
-# convert to netCDF if selected
-if args.convert:
-    grib = glob(os.path.join(save_path, '*.grb2'))
-    for f in grib:
-        f_new = ''.join(f.split('.')[:-1]) + '.nc'
-        ds = xr.open_dataset(f, engine='pynio')
-        print(f'Saving {f_new.split(os.sep)[-1]}')
-        ds.to_netcdf(f_new)
-        ds.close()
-
-    print('Finished saving netCDF files.')
-
-# remove grib files if selected
-if args.clean:
-    os.system(f'cd {save_path}; rm *.grb2')
-    print('Finished removing grib files.')
-
-print('get_gfs.py complete.')
-
-
-
-
-
+from gfs_download import URL_BASE, gfs_urls, download_all
+from gfs_fields import FIELDS
+from gfs_convert import convert_all, nc_path
+from gfs_store import GFSStore
+
+
+def main():
+    # command line arguments
+    parser = ArgumentParser()
+    parser.add_argument('-ds', required=True, action='store', dest='d_s',
+        nargs=1, type=str, help='Start date YYYYMMDD')
+    parser.add_argument('-de', required=True, action='store', dest='d_e',
+        nargs=1, type=str, help='End date YYYYMMDD')
+    parser.add_argument('-s', required=True, action='store', dest='s',
+        nargs=1, type=str, help='Save folder name')
+    parser.add_argument('--netCDF', action='store_true', dest='convert', 
+        help='Convert to netCDF4?')
+    parser.add_argument('--clean', action='store_true', dest='clean',
+        help='Remove grib files that were converted to netCDF?')
+    parser.add_argument('-n', action='store', dest='nproc', type=int, default=4,
+        help='Number of concurrent downloads and conversion processes')
+    parser.add_argument('--nopack', action='store_true', dest='nopack',
+        help='Store netCDF variables as float instead of packed int16')
+    parser.add_argument('-u', action='store', dest='url', type=str,
+        default=URL_BASE, help='Base url of GFS analysis archive')
+    parser.add_argument('--full', action='store_true', dest='full',
+        help='Download whole files, not only the fields in gfs_fields.py')
+    parser.add_argument('--store', action='store', dest='store', type=str,
+        help='Add converted files to this consolidated gfs_store.py file')
+    args = parser.parse_args()
+    # save directory
+    save_path = os.path.join(f'{os.path.expanduser("~")}', 'Documents', 'Data',
+        'GFS', args.s[0])
+    # create directory if it does not already exist
+    if not os.path.exists(save_path):
+        os.mkdir(save_path)
+
+    # convert to datetime objects for easier handling
+    dt_s = datetime.strptime(args.d_s[0], '%Y%m%d')
+    dt_e = datetime.strptime(args.d_e[0], '%Y%m%d')
+
+    # download files for all cycles between start and end dates
+    # by default only the grib messages used for plotting are fetched
+    urls = gfs_urls(dt_s, dt_e, args.url)
+    fields = None if args.full else FIELDS
+    done, failed = download_all(urls, save_path, args.nproc, fields=fields)
+
+    print(f'Finished saving {len(done)} of {len(urls)} grib files.')
+
+    # convert to netCDF if selected
+    converted = []
+    if args.convert:
+        grib = glob(os.path.join(save_path, '*.grb2'))
+        converted, failed_nc = convert_all(grib, args.nproc,
+                                           pack=not args.nopack)
+
+        print(f'Finished saving {len(converted)} of {len(grib)} netCDF files.')
+
+    # add converted files to consolidated time-indexed store if selected
+    if args.store is not None and len(converted) > 0:
+        n = GFSStore(args.store).consolidate([nc_path(f) for f in converted])
+        print(f'Added {n} analyses to {args.store}')
+
+    # remove grib files if selected, only those with a complete netCDF copy
+    if args.clean:
+        for f in converted:
+            os.remove(f)
+            if os.path.exists(f + '.sha256'):
+                os.remove(f + '.sha256')
+        print(f'Finished removing {len(converted)} grib files.')
+
+    print('get_gfs.py complete.')
+
+
+# worker processes re-import this module, so only run as a script
+if __name__ == '__main__':
+    main()
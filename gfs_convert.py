@@ -0,0 +1,150 @@
+'''
+Parallel conversion of GFS grib2 files to compressed netCDF4. Each file is
+converted in its own worker process with pynio; data variables with a known
+precision are packed to int16 with a per-variable scale/offset when that
+round-trips within the precision, others are kept as float32. All are
+compressed with zlib and shuffle, and chunked so that one 2-D lat/lon slice
+is one chunk. Output is written to a temporary file and renamed into place,
+so a .nc file that exists is always complete.
+
+Author: Brian R. Greene, University of Oklahoma
+Updated: 18 October 2026
+'''
+import os
+import time
+import numpy as np
+import xarray as xr
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+# packed values use -32767..32767, -32768 is the fill value
+FILL_INT16 = np.int16(-32768)
+NPACK = 2**16 - 2
+# grib variable -> largest absolute error packing may introduce, in the
+# variable's units; the same precision as gfs_store.PACKING. Variables not
+# listed (e.g. SPFH, whose values span several orders of magnitude) and
+# fields whose range needs more than NPACK steps are kept as float32.
+PACK_TOLERANCE = {
+    'UGRD': 0.005, 'VGRD': 0.005, 'VVEL': 0.0005, 'TMP': 0.005,
+    'HGT': 0.5, 'PRMSL': 0.5, 'PRES': 0.5, 'RH': 0.05
+}
+
+
+def nc_path(grib):
+    '''
+    Return str path of netCDF file for grib file
+    '''
+    return os.path.splitext(grib)[0] + '.nc'
+
+
+def packing(values, tolerance):
+    '''
+    int16 scale and offset for values, if packing round-trips within tolerance
+    input values: float array
+    input tolerance: float largest absolute error allowed
+    Return (float scale_factor, float add_offset), or None to keep float32
+    '''
+    vmin, vmax = np.nanmin(values), np.nanmax(values)
+    if not (np.isfinite(vmin) and np.isfinite(vmax)):
+        return None
+    scale = max(float(vmax - vmin), 1e-12) / NPACK
+    offset = (float(vmax) + float(vmin)) / 2.
+    packed = np.round((values - offset) / scale)
+    err = np.nanmax(np.abs(packed * scale + offset - values))
+    if err > tolerance:
+        return None
+    return scale, offset
+
+
+def encoding(ds, pack=True, complevel=4):
+    '''
+    netCDF encoding for every data variable in ds
+    input ds: xarray Dataset
+    input pack: bool pack variables listed in PACK_TOLERANCE to int16
+    input complevel: int zlib compression level
+    Return dict of {var: encoding dict}
+    '''
+    enc = {}
+    for v, da in ds.data_vars.items():
+        e = {'zlib': True, 'shuffle': True, 'complevel': complevel}
+        if da.ndim >= 2:
+            # one chunk per 2-D level slice
+            e['chunksizes'] = (1,) * (da.ndim - 2) + da.shape[-2:]
+        if np.issubdtype(da.dtype, np.floating):
+            # pynio names are like TMP_P0_L100_GLL0
+            tol = PACK_TOLERANCE.get(v.split('_')[0])
+            pk = packing(da.values, tol) if pack and tol is not None \
+                else None
+            if pk is None:
+                e['dtype'] = 'f4'
+            else:
+                e['dtype'] = 'i2'
+                e['scale_factor'], e['add_offset'] = pk
+                e['_FillValue'] = FILL_INT16
+        enc[v] = e
+    return enc
+
+
+def convert_file(grib, pack=True, engine='pynio'):
+    '''
+    Convert one grib file to netCDF next to it
+    input grib: str path of grib file
+    input pack: bool pack variables listed in PACK_TOLERANCE to int16
+    input engine: str xarray engine to read grib with
+    Return (str grib path, str nc path, float seconds, int grib bytes,
+            int nc bytes)
+    '''
+    t0 = time.time()
+    f_new = nc_path(grib)
+    tmp = f_new + '.tmp'
+    with xr.open_dataset(grib, engine=engine) as ds:
+        ds.load()
+        ds.to_netcdf(tmp, format='NETCDF4', encoding=encoding(ds, pack))
+    os.replace(tmp, f_new)
+    return grib, f_new, time.time() - t0, os.path.getsize(grib), \
+        os.path.getsize(f_new)
+
+
+def convert_all(gribs, nproc=4, skip_existing=True, **kwargs):
+    '''
+    Convert grib files to netCDF with a pool of worker processes
+    input gribs: list of str grib paths
+    input nproc: int number of worker processes
+    input skip_existing: bool skip files that already have a .nc file
+    input kwargs: passed on to convert_file
+    Return (list of str converted grib paths, dict of failed {grib: error})
+    '''
+    done, failed = [], {}
+    todo = []
+    for grib in sorted(gribs):
+        if skip_existing and os.path.exists(nc_path(grib)):
+            done.append(grib)
+        else:
+            todo.append(grib)
+    t0 = time.time()
+    nin, nout = 0, 0
+    with ProcessPoolExecutor(max_workers=nproc) as pool:
+        futures = {pool.submit(convert_file, grib, **kwargs): grib
+                   for grib in todo}
+        for fut in as_completed(futures):
+            grib = futures[fut]
+            try:
+                _, f_new, dt, sin, sout = fut.result()
+            except Exception as e:
+                failed[grib] = f'{type(e).__name__}: {e}'
+                print(f'Failed {os.path.basename(grib)}: {failed[grib]}')
+                # leave no partial output behind
+                if os.path.exists(nc_path(grib) + '.tmp'):
+                    os.remove(nc_path(grib) + '.tmp')
+                continue
+            done.append(grib)
+            nin += sin
+            nout += sout
+            print(f'Saved {os.path.basename(f_new)} in {dt:.1f} s '
+                  f'({sin/1024**2:.1f} -> {sout/1024**2:.1f} MB)')
+    dt = time.time() - t0
+    n = len(todo) - len(failed)
+    if n > 0:
+        print(f'Converted {n} files in {dt:.1f} s: {n/dt:.2f} files/s, '
+              f'{nin/1024**2/dt:.1f} MB/s of grib, output is '
+              f'{100.*nout/nin:.0f}% of grib size')
+    return sorted(done), failed
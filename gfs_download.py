@@ -0,0 +1,284 @@
+'''
+Parallel, resumable downloader for GFS analysis grib files. Files are
+downloaded by a bounded pool of threads sharing a pooled session, written
+to a .part file that is resumed with a byte-range request after an
+interruption, checked against the server size, and renamed into place only
+when complete. A sha256 sidecar is written next to each finished file so
+later runs can skip files that are already complete and intact. Given a
+list of fields, only those grib messages are fetched, using byte ranges
+from the file's .inv/.idx inventory. The field set (or 'full') is recorded
+in the sidecar and next to the .part file, so a file or partial download of
+a different field set is never taken as complete or resumed.
+
+Author: Brian R. Greene, University of Oklahoma
+Updated: 18 October 2026
+'''
+import os
+import time
+import hashlib
+import requests
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from datetime import timedelta
+from mts_fetch import make_session
+
+# NCEI archive of GFS analyses (replaces the retired nomads ftp server)
+URL_BASE = 'https://www.ncei.noaa.gov/data/global-forecast-system/access/historical/analysis/'
+# analysis cycles each day
+CYCLES = (0, 6, 12, 18)
+# bytes per read while streaming
+CHUNK = 1024**2
+
+
+def gfs_urls(dt_s, dt_e, url_base=URL_BASE, cycles=CYCLES):
+    '''
+    List urls of 1-degree analysis files for every cycle from dt_s to dt_e
+    input dt_s: datetime object of first day
+    input dt_e: datetime object of last day (inclusive)
+    input url_base: str base url of archive
+    input cycles: iterable of int cycle hours
+    Return list of str
+    '''
+    urls = []
+    dt = dt_s
+    while dt <= dt_e:
+        for hh in cycles:
+            urls.append(f'{url_base}{dt.strftime("%Y%m")}/{dt.strftime("%Y%m%d")}/'
+                        f'gfsanl_3_{dt.strftime("%Y%m%d")}_{hh:02d}00_000.grb2')
+        dt += timedelta(days=1)
+    return urls
+
+
+def sha256sum(path):
+    '''
+    Return hex sha256 digest of file at path
+    '''
+    h = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for block in iter(lambda: f.read(CHUNK), b''):
+            h.update(block)
+    return h.hexdigest()
+
+
+def fields_key(fields=None):
+    '''
+    Return str identifying a field set: 'full' for the whole file, else a
+    hash of its (grib, level) pairs
+    '''
+    if fields is None:
+        return 'full'
+    pairs = sorted({(f['grib'], f['level']) for f in fields})
+    return hashlib.sha256(repr(pairs).encode()).hexdigest()[:16]
+
+
+def is_complete(path, fields=None):
+    '''
+    Check that path exists, holds the field set, and matches the checksum
+    in its .sha256 sidecar
+    input fields: list of dicts from gfs_fields, default=whole file
+    '''
+    try:
+        with open(path + '.sha256') as f:
+            digest, size, key = f.read().split()
+    except (OSError, ValueError):
+        return False
+    return key == fields_key(fields) and os.path.exists(path) and \
+        os.path.getsize(path) == int(size) and sha256sum(path) == digest
+
+
+def inventory_urls(url):
+    '''
+    Return candidate inventory urls for a grib file: NCEI .inv, nomads .idx
+    '''
+    return [url.rsplit('.', 1)[0] + '.inv', url + '.idx']
+
+
+def parse_inventory(text):
+    '''
+    Parse wgrib2-style inventory lines 'n:offset:d=YYYYMMDDHH:VAR:level:...'
+    input text: str contents of .idx/.inv file
+    Return list of (var, level, start byte, end byte or None for last message)
+    '''
+    rows = [line.split(':') for line in text.splitlines() if line.strip()]
+    msgs = []
+    for i, row in enumerate(rows):
+        start = int(row[1])
+        end = int(rows[i+1][1]) - 1 if i + 1 < len(rows) else None
+        msgs.append((row[3], row[4], start, end))
+    return msgs
+
+
+def select_ranges(msgs, fields):
+    '''
+    Byte ranges of inventory messages matching fields, adjacent ranges merged
+    input msgs: list from parse_inventory
+    input fields: list of dicts with 'grib' and 'level' keys (gfs_fields)
+    Return list of [start, end or None]
+    '''
+    want = {(f['grib'], f['level']) for f in fields}
+    ranges = []
+    for var, level, start, end in msgs:
+        if (var, level) not in want:
+            continue
+        if ranges and ranges[-1][1] is not None and ranges[-1][1] + 1 == start:
+            ranges[-1][1] = end
+        else:
+            ranges.append([start, end])
+    missing = want - {(var, level) for var, level, _, _ in msgs}
+    if missing:
+        raise ValueError(f'Fields not in inventory: {sorted(missing)}')
+    return ranges
+
+
+def get_ranges(url, session, fields, timeout=60):
+    '''
+    Fetch inventory of grib file at url and return byte ranges of fields
+    '''
+    for inv in inventory_urls(url):
+        r = session.get(inv, timeout=timeout)
+        if r.status_code == 404:
+            continue
+        r.raise_for_status()
+        return select_ranges(parse_inventory(r.text), fields)
+    raise requests.HTTPError(f'No inventory found for {url}', response=r)
+
+
+def _fetch_range(url, f, start, end, skip, session, timeout):
+    '''
+    Stream bytes start+skip..end (None = to end of file) of url into open
+    file f, where the first skip bytes of the range are already in f
+    Return int total size of remote file
+    '''
+    rng = f'bytes={start+skip}-' if end is None else f'bytes={start+skip}-{end}'
+    with session.get(url, headers={'Range': rng}, stream=True,
+                     timeout=timeout) as r:
+        if r.status_code == 416:
+            # nothing past our offset; server reports 'bytes */size'
+            return int(r.headers.get('Content-Range', '*/-1').split('/')[-1])
+        r.raise_for_status()
+        if r.status_code != 206:
+            if start > 0 or end is not None:
+                # can't subset without range support
+                raise requests.HTTPError(f'{url} does not support ranges',
+                                         response=r)
+            # whole file sent: start over
+            f.seek(f.tell() - skip)
+            f.truncate()
+            total = int(r.headers.get('Content-Length', -1))
+        else:
+            total = int(r.headers['Content-Range'].split('/')[-1])
+        for block in r.iter_content(CHUNK):
+            f.write(block)
+    return total
+
+
+def _download(url, part, ranges, session, timeout):
+    '''
+    Download byte ranges of url into part, resuming from its current size
+    input ranges: list of [start, end or None]; [[0, None]] for whole file
+    Return int expected size of part
+    '''
+    have = os.path.getsize(part) if os.path.exists(part) else 0
+    expected = 0
+    with open(part, 'ab') as f:
+        for start, end in ranges:
+            n = None if end is None else end - start + 1
+            # skip ranges (and the part of a range) already on disk
+            if n is not None and have >= n:
+                have -= n
+                expected += n
+                continue
+            total = _fetch_range(url, f, start, end, have, session, timeout)
+            if n is None:
+                # size unknown without Content-Length: take what was sent
+                n = total - start if total >= 0 else f.tell() - expected
+            have = 0
+            expected += n
+    return expected
+
+
+def download_file(url, save_path, session, fields=None, max_retries=5,
+                  backoff=1., timeout=60):
+    '''
+    Download url into save_path, resuming a partial .part file if present
+    input url: str url of file
+    input save_path: str directory to save into
+    input session: requests.Session to download with
+    input fields: list of dicts from gfs_fields to download only those grib
+                  messages using the file inventory, default=whole file
+    input max_retries: int retries on connection errors and 5xx responses
+    input backoff: float seconds before first retry, doubles each time
+    input timeout: float seconds to wait on server
+    Return str path of complete file
+    '''
+    dest = os.path.join(save_path, url.split('/')[-1])
+    part = dest + '.part'
+    key = fields_key(fields)
+    if is_complete(dest, fields):
+        print(f'Already complete: {os.path.basename(dest)}')
+        return dest
+    # a partial download is only resumed for the same field set
+    try:
+        with open(part + '.fields') as f:
+            part_key = f.read().strip()
+    except OSError:
+        part_key = None
+    if part_key != key:
+        if os.path.exists(part):
+            os.remove(part)
+        with open(part + '.fields', 'w') as f:
+            f.write(f'{key}\n')
+    ranges = None if fields is not None else [[0, None]]
+    for attempt in range(max_retries + 1):
+        try:
+            if ranges is None:
+                ranges = get_ranges(url, session, fields, timeout)
+            expected = _download(url, part, ranges, session, timeout)
+            size = os.path.getsize(part)
+            if size != expected:
+                if size > expected:
+                    # stale partial from a different file, start over
+                    os.remove(part)
+                raise requests.ConnectionError(
+                    f'incomplete download {size} of {expected} bytes')
+            # checksum, then move into place atomically
+            with open(part + '.sha256', 'w') as f:
+                f.write(f'{sha256sum(part)} {size} {key}\n')
+            os.replace(part, dest)
+            os.replace(part + '.sha256', dest + '.sha256')
+            os.remove(part + '.fields')
+            print(f'Finished {os.path.basename(dest)} ({size/1024**2:.1f} MB)')
+            return dest
+        except requests.HTTPError as e:
+            if e.response is None or e.response.status_code < 500:
+                raise
+            err = e
+        except (requests.ConnectionError, requests.Timeout) as e:
+            err = e
+        if attempt < max_retries:
+            wait = backoff * 2**attempt
+            print(f'Retrying {os.path.basename(dest)} in {wait:.0f} s ({err})')
+            time.sleep(wait)
+    raise err
+
+
+def download_all(urls, save_path, nproc=4, **kwargs):
+    '''
+    Download urls into save_path with a bounded pool of worker threads
+    input urls: list of str urls
+    input save_path: str directory to save into
+    input nproc: int number of concurrent downloads
+    input kwargs: passed on to download_file
+    Return (list of str completed paths, dict of failed {url: error})
+    '''
+    session = make_session(nproc)
+    done, failed = [], {}
+    with ThreadPoolExecutor(max_workers=nproc) as pool:
+        futures = {pool.submit(download_file, url, save_path, session,
+                               **kwargs): url for url in urls}
+        for fut in as_completed(futures):
+            try:
+                done.append(fut.result())
+            except Exception as e:
+                failed[futures[fut]] = f'{type(e).__name__}: {e}'
+                print(f'Failed {futures[fut]}: {failed[futures[fut]]}')
+    return sorted(done), failed
@@ -0,0 +1,18 @@
+'''
+GFS fields used by the plotting scripts. get_gfs.py downloads only these
+messages from each analysis file and plot_gfs_NH.py reads them by the
+variable names pynio gives them after conversion to netCDF.
+
+Each entry: grib short name, grib level as written in the .idx/.inv
+inventory, and variable name in converted netCDF files.
+
+Author: Brian R. Greene, University of Oklahoma
+Updated: 18 October 2026
+'''
+FIELDS = [
+    {'grib': 'UGRD', 'level': '300 mb', 'nc': 'UGRD_P0_L100_GLL0'},
+    {'grib': 'VGRD', 'level': '300 mb', 'nc': 'VGRD_P0_L100_GLL0'},
+    {'grib': 'HGT', 'level': '300 mb', 'nc': 'HGT_P0_L100_GLL0'},
+    {'grib': 'PRMSL', 'level': 'mean sea level', 'nc': 'PRMSL_P0_L101_GLL0'},
+    {'grib': 'TMP', 'level': 'surface', 'nc': 'TMP_P0_L1_GLL0'},
+]
@@ -0,0 +1,241 @@
+'''
+Consolidated store of GFS analyses: the fields in gfs_fields.py from every
+converted netCDF file merged into one netCDF4 file with an unlimited time
+dimension. Variables are packed to int16, compressed, and chunked by time,
+level, and hemisphere, so select() reads only the slab it is asked for
+instead of whole global multi-level arrays.
+
+Isobaric fields are stored under their grib name with a level dimension in
+hPa (e.g. UGRD), other fields under grib name and level (e.g. TMP_surface).
+
+Author: Brian R. Greene, University of Oklahoma
+Updated: 18 October 2026
+'''
+import os
+import numpy as np
+import xarray as xr
+import netCDF4
+from datetime import datetime
+from argparse import ArgumentParser
+from gfs_fields import FIELDS
+
+# int16 packing for each grib variable: (scale_factor, add_offset)
+# variables not listed are stored as float32
+PACKING = {
+    'UGRD': (0.01, 0.), 'VGRD': (0.01, 0.), 'HGT': (1., 16000.),
+    'PRMSL': (1., 97000.), 'TMP': (0.01, 273.15)
+}
+FILL_INT16 = np.int16(-32768)
+TIME_UNITS = 'hours since 1970-01-01 00:00:00'
+
+
+def isobaric(level):
+    '''
+    Return float pressure in hPa of an inventory level like '300 mb', or None
+    '''
+    if level.endswith(' mb'):
+        return float(level[:-3])
+    return None
+
+
+def store_name(grib, level):
+    '''
+    Return str name of variable in store for a grib variable and level
+    '''
+    if isobaric(level) is not None:
+        return grib
+    return f'{grib}_{level.replace(" ", "_")}'
+
+
+def file_time(path):
+    '''
+    Return datetime of analysis from file name gfsanl_3_YYYYMMDD_HHMM_000.*
+    '''
+    fname = os.path.basename(path)
+    return datetime.strptime(''.join(fname.split('_')[2:4]), '%Y%m%d%H%M')
+
+
+class GFSStore:
+    '''
+    Time-indexed netCDF4 store of GFS fields at path
+    '''
+    def __init__(self, path, fields=FIELDS):
+        '''
+        input path: str path of store file
+        input fields: list of dicts from gfs_fields to store
+        '''
+        self.path = path
+        self.fields = fields
+        # isobaric levels in hPa stored for each grib variable
+        self.levels = {}
+        for f in fields:
+            hpa = isobaric(f['level'])
+            if hpa is not None:
+                self.levels.setdefault(f['grib'], []).append(hpa)
+        for grib in self.levels:
+            self.levels[grib] = sorted(self.levels[grib], reverse=True)
+
+    def _create(self, lat, lon):
+        '''
+        Create empty store on grid lat, lon
+        '''
+        nc = netCDF4.Dataset(self.path, 'w', format='NETCDF4')
+        nc.createDimension('time', None)
+        nc.createDimension('lat', len(lat))
+        nc.createDimension('lon', len(lon))
+        t = nc.createVariable('time', 'i4', ('time',))
+        t.units = TIME_UNITS
+        t.calendar = 'standard'
+        nc.createVariable('lat', 'f4', ('lat',))[:] = lat
+        nc.createVariable('lon', 'f4', ('lon',))[:] = lon
+        nc['lat'].units = 'degrees_north'
+        nc['lon'].units = 'degrees_east'
+        # half the latitudes per chunk: a hemisphere is one chunk
+        chunk = (1, (len(lat) + 1) // 2, len(lon))
+        for grib, levels in self.levels.items():
+            dim = f'level_{grib}'
+            nc.createDimension(dim, len(levels))
+            nc.createVariable(dim, 'f4', (dim,))[:] = levels
+            nc[dim].units = 'hPa'
+        done = set()
+        for f in self.fields:
+            name = store_name(f['grib'], f['level'])
+            if name in done:
+                continue
+            done.add(name)
+            if name in self.levels:
+                dims = ('time', f'level_{name}', 'lat', 'lon')
+                chunks = chunk[:1] + (1,) + chunk[1:]
+            else:
+                dims = ('time', 'lat', 'lon')
+                chunks = chunk
+            if f['grib'] in PACKING:
+                var = nc.createVariable(name, 'i2', dims, zlib=True,
+                                        shuffle=True, chunksizes=chunks,
+                                        fill_value=FILL_INT16)
+                var.scale_factor, var.add_offset = PACKING[f['grib']]
+            else:
+                var = nc.createVariable(name, 'f4', dims, zlib=True,
+                                        shuffle=True, chunksizes=chunks,
+                                        fill_value=np.float32(np.nan))
+            var.level = f['level']
+        return nc
+
+    def times(self):
+        '''
+        Return array of datetime64 of stored analyses
+        '''
+        if not os.path.exists(self.path):
+            return np.array([], dtype='datetime64[h]')
+        with netCDF4.Dataset(self.path) as nc:
+            hours = nc['time'][:].astype(np.int64)
+        return np.datetime64('1970-01-01T00', 'h') + hours.astype('m8[h]')
+
+    def append(self, path):
+        '''
+        Add one converted analysis file to the store
+        input path: str path of netCDF file from get_gfs.py
+        Return bool True if added, False if its time was already stored
+        '''
+        dt = np.datetime64(file_time(path), 'h')
+        times = self.times()
+        if len(times) and dt <= times[-1]:
+            # store is append-only and sorted in time
+            if dt not in times:
+                print(f'Skipping {os.path.basename(path)}: older than store')
+            return False
+        with netCDF4.Dataset(path) as src:
+            if os.path.exists(self.path):
+                nc = netCDF4.Dataset(self.path, 'a')
+            else:
+                nc = self._create(src['lat_0'][:], src['lon_0'][:])
+            with nc:
+                it = len(nc['time'])
+                for f in self.fields:
+                    name = store_name(f['grib'], f['level'])
+                    var = src[f['nc']]
+                    hpa = isobaric(f['level'])
+                    if hpa is None:
+                        nc[name][it] = var[:]
+                        continue
+                    il = self.levels[name].index(hpa)
+                    if var.ndim == 3:
+                        # full file: pick level (Pa) from lv_ISBL0
+                        ilev = np.where(src['lv_ISBL0'][:] == 100.*hpa)[0][0]
+                        nc[name][it, il] = var[ilev]
+                    else:
+                        nc[name][it, il] = var[:]
+                nc['time'][it] = (dt - np.datetime64('1970-01-01T00', 'h')) \
+                    .astype(np.int64)
+        return True
+
+    def consolidate(self, paths):
+        '''
+        Add converted analysis files to the store in time order
+        input paths: list of str netCDF paths
+        Return int number of files added
+        '''
+        n = 0
+        for path in sorted(paths, key=file_time):
+            if self.append(path):
+                print(f'Stored {os.path.basename(path)}')
+                n += 1
+        return n
+
+    def select(self, var, level=None, time_range=None, lat_range=None):
+        '''
+        Read one slab of a variable, touching only the chunks it covers
+        input var: str grib variable name, e.g. 'UGRD'
+        input level: inventory level, e.g. '300 mb' or 'surface'; isobaric
+                     levels may also be given as a number in hPa
+        input time_range: (start, end) inclusive, default=all times
+        input lat_range: (south, north) inclusive, default=all latitudes
+        Return xarray DataArray with dims (time, lat, lon)
+        '''
+        if isinstance(level, (int, float)):
+            hpa, name = float(level), var
+        else:
+            hpa = isobaric(level) if level is not None else None
+            name = var if hpa is not None or level is None \
+                else store_name(var, level)
+        times = self.times()
+        with netCDF4.Dataset(self.path) as nc:
+            # times are sorted, latitudes monotonic: contiguous slices
+            it = slice(None)
+            if time_range is not None:
+                t0, t1 = [np.datetime64(t, 'h') for t in time_range]
+                it = slice(np.searchsorted(times, t0, side='left'),
+                           np.searchsorted(times, t1, side='right'))
+            lat = nc['lat'][:]
+            il = slice(None)
+            if lat_range is not None:
+                i = np.where((lat >= lat_range[0]) & (lat <= lat_range[1]))[0]
+                il = slice(i[0], i[-1] + 1)
+            v = nc[name]
+            if v.ndim == 4:
+                if hpa is None:
+                    raise ValueError(f'{var} needs an isobaric level')
+                ilev = list(nc[f'level_{name}'][:]).index(hpa)
+                data = v[it, ilev, il, :]
+            else:
+                data = v[it, il, :]
+            return xr.DataArray(np.ma.filled(data.astype(np.float32), np.nan),
+                                dims=('time', 'lat', 'lon'),
+                                coords={'time': times[it], 'lat': lat[il],
+                                        'lon': nc['lon'][:]},
+                                name=name, attrs={'level': v.level})
+
+
+def main():
+    parser = ArgumentParser()
+    parser.add_argument('-i', required=True, action='store', dest='files',
+                        nargs='*', help='Converted netCDF files to add')
+    parser.add_argument('-o', required=True, action='store', dest='store',
+                        type=str, help='Path of store file')
+    args = parser.parse_args()
+    n = GFSStore(args.store).consolidate(args.files)
+    print(f'Added {n} of {len(args.files)} files to {args.store}')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,206 @@
+'''
+Pre-rendered static map layers (coastlines, states, counties, borders).
+
+These vector overlays are the same on every frame and are slow to draw.
+add_static_layer() puts a StaticLayer artist on an axes in their place. The
+first time the layer is drawn for a layout (figure size in pixels, dpi, axes
+position, and axis limits) it renders the overlays alone on a transparent
+copy of the axes and keeps the RGBA pixels, in memory and in a compressed
+.npz cache on disk. Every later draw with the same layout blits those
+pixels at the layer's zorder, so data drawn below and above it composite as
+with the vector layers. Renderers other than Agg (pdf, svg) get the vector
+layers.
+
+The composited pixels are not identical to drawing the vectors: opaque and
+empty pixels match, but partially transparent antialiased edge pixels may
+differ by up to about 10/255 per channel (8-bit alpha rounding). Callers
+therefore use it only when asked to (raster=True, raster_overlays).
+
+Author: Brian R. Greene, University of Oklahoma
+Updated: 18 October 2026
+'''
+# Python Packages
+import os
+import hashlib
+from collections import OrderedDict
+
+# Installed packages
+import numpy as np
+import matplotlib
+from matplotlib.artist import Artist
+from matplotlib.figure import Figure
+from matplotlib.backends.backend_agg import FigureCanvasAgg, RendererAgg
+
+from atomic_io import atomic_save
+
+CACHE_DIR = os.path.join(os.path.expanduser("~"), ".cache", "Wx",
+                         "background")
+
+# rendered layers kept in memory, least recently used dropped
+_layers = OrderedDict()
+MAXSIZE = 16
+
+
+def _layer_path(key, cache_dir):
+    """
+    Return str path of cache file for a layer key
+    """
+    digest = hashlib.sha256(repr((matplotlib.__version__,) + key).encode())
+    return os.path.join(cache_dir, f"layer_{digest.hexdigest()[:16]}.npz")
+
+
+def _load_layer(path):
+    """
+    Return layer tuple from cache file, or None if there is none
+    """
+    try:
+        with np.load(path) as f:
+            return int(f["x0"]), int(f["y0"]), f["img"]
+    except (OSError, ValueError, KeyError):
+        return None
+
+
+def _save_layer(path, layer):
+    """
+    Write layer tuple to cache file atomically; Return layer
+    """
+    atomic_save(path, lambda f: np.savez_compressed(
+        f, x0=layer[0], y0=layer[1], img=layer[2]))
+    return layer
+
+
+def render_layer(ax, draw, dpi):
+    """
+    Render overlays alone on a transparent copy of an axes layout
+    input ax: axes whose projection, position, and limits are copied
+    input draw: function(ax) adding the vector overlays to an axes
+    input dpi: float dots per inch rendered at
+    Return (x0, y0 int pixel offset from lower left, uint8 RGBA array
+            cropped to the drawn pixels, bottom row first as
+            renderer.draw_image takes it)
+    """
+    # same size in inches, not pixels: fractional pixel sizes shift layout
+    fig = Figure(figsize=ax.figure.get_size_inches(), dpi=dpi)
+    FigureCanvasAgg(fig)
+    fig.patch.set_visible(False)
+    kw = {"projection": ax.projection} if hasattr(ax, "projection") else {}
+    pos = ax.get_position()
+    ax2 = fig.add_axes(pos, **kw)
+    draw(ax2)
+    # drawing may rescale or reshape the axes (Basemap, GeoAxes): pin the
+    # layout of the axes being composited onto
+    ax2.set_aspect("auto")
+    ax2.set_autoscale_on(False)
+    ax2.set_xlim(ax.get_xlim())
+    ax2.set_ylim(ax.get_ylim())
+    ax2.set_position(pos)
+    ax2.set_axis_off()
+    fig.canvas.draw()
+    rgba = np.asarray(fig.canvas.buffer_rgba())
+    rows = np.nonzero(rgba[..., 3].any(axis=1))[0]
+    cols = np.nonzero(rgba[..., 3].any(axis=0))[0]
+    if len(rows) == 0:
+        return 0, 0, np.zeros((0, 0, 4), dtype=np.uint8)
+    img = rgba[rows[-1]:(rows[0] - 1 if rows[0] else None):-1,
+               cols[0]:cols[-1] + 1].copy()
+    return int(cols[0]), int(rgba.shape[0] - 1 - rows[-1]), img
+
+
+def get_layer(key, ax, draw, dpi, cache_dir=CACHE_DIR):
+    """
+    Return rendered layer from memory, disk, or render_layer
+    input key: tuple identifying the layer content and layout
+    other inputs: as render_layer
+    """
+    if key in _layers:
+        _layers.move_to_end(key)
+        return _layers[key]
+    path = None if cache_dir is None else _layer_path(key, cache_dir)
+    layer = None if path is None else _load_layer(path)
+    if layer is None:
+        layer = render_layer(ax, draw, dpi)
+        if path is not None:
+            # another process (e.g. a spawn worker) may have installed the
+            # layer while this one rendered: use theirs
+            layer = _load_layer(path) or _save_layer(path, layer)
+    _layers[key] = layer
+    if len(_layers) > MAXSIZE:
+        _layers.popitem(last=False)
+    return layer
+
+
+class StaticLayer(Artist):
+    """
+    Artist drawing cached pixels of static vector overlays
+    """
+    def __init__(self, draw, key, zorder=2, cache_dir=CACHE_DIR):
+        """
+        input draw: function(ax) adding the vector overlays to an axes
+        input key: hashable (repr-stable) identifying what draw adds,
+                   e.g. features and projection
+        input zorder: float zorder the overlays would have been drawn at
+        input cache_dir: str directory of cache files, None for memory only
+        """
+        super().__init__()
+        self.draw_layers = draw
+        self.key = key
+        self.cache_dir = cache_dir
+        self.set_zorder(zorder)
+        self._vectors = None
+
+    def _layout_key(self, renderer):
+        """
+        Return tuple of layer key and the layout it is rendered for
+        """
+        ax = self.axes
+        bounds = tuple(round(float(v), 6) for v in ax.bbox.bounds)
+        lims = tuple(round(float(v), 9) for v in ax.get_xlim() + ax.get_ylim())
+        return (self.key, int(renderer.width), int(renderer.height),
+                float(renderer.dpi), bounds, lims)
+
+    def _draw_vectors(self, renderer):
+        """
+        Draw the vector overlays directly (non-raster renderers)
+        """
+        ax = self.axes
+        if self._vectors is None:
+            before = set(map(id, ax.get_children()))
+            lims = ax.get_xlim(), ax.get_ylim()
+            self.draw_layers(ax)
+            ax.set_xlim(lims[0])
+            ax.set_ylim(lims[1])
+            self._vectors = [a for a in ax.get_children()
+                             if id(a) not in before]
+        for a in self._vectors:
+            a.set_visible(True)
+            a.draw(renderer)
+            a.set_visible(False)
+
+    def draw(self, renderer):
+        if not self.get_visible():
+            return
+        if not isinstance(renderer, RendererAgg):
+            self._draw_vectors(renderer)
+            return
+        key = self._layout_key(renderer)
+        x0, y0, img = get_layer(key, self.axes, self.draw_layers,
+                                renderer.dpi, self.cache_dir)
+        if img.size:
+            gc = renderer.new_gc()
+            renderer.draw_image(gc, x0, y0, img)
+            gc.restore()
+        self.stale = False
+
+
+def add_static_layer(ax, draw, key, zorder=2, cache_dir=CACHE_DIR):
+    """
+    Add static overlays to ax as a cached raster layer
+    input ax: matplotlib axes (GeoAxes, or the axes a Basemap draws on)
+    input draw: function(ax) adding the vector overlays to an axes
+    input key: hashable (repr-stable) identifying what draw adds
+    input zorder: float zorder the overlays would have been drawn at
+                  (cartopy features 1.5, Basemap boundaries 2)
+    input cache_dir: str directory of cache files, None for memory only
+    Return StaticLayer
+    """
+    return ax.add_artist(StaticLayer(draw, key, zorder, cache_dir))
@@ -0,0 +1,175 @@
+'''
+Typed, vectorized reader for the Oklahoma Mesonet current.csv feed.
+
+The file is parsed once by np.loadtxt into a structured array typed by a
+declared column schema. Blank fields become nan, numeric columns are
+float64, compass wind directions are decoded to degrees (WDIR_DEG) when
+first used, and the valid time is decoded once from the YR/MO/DA/HR/MI
+columns, which are Oklahoma local time (CST or CDT). The result is a station table (one
+row per station) the gridding code can use directly.
+
+Author: Brian R. Greene, University of Oklahoma
+Updated: 18 October 2026
+'''
+# Python Packages
+from datetime import datetime, timezone
+from urllib.request import urlopen
+from zoneinfo import ZoneInfo
+
+# Installed packages
+import numpy as np
+
+CURRENT_URL = "http://www.mesonet.org/data/public/mesonet/current/current.csv.txt"
+
+# column -> dtype; blank numeric fields are read as nan
+SCHEMA = {
+    "STID": str, "NAME": str, "ST": str,
+    "LAT": np.float64, "LON": np.float64,
+    "YR": np.int32, "MO": np.int32, "DA": np.int32, "HR": np.int32,
+    "MI": np.int32,
+    "TAIR": np.float64, "TDEW": np.float64, "RELH": np.float64,
+    "CHIL": np.float64, "HEAT": np.float64, "WDIR": str,
+    "WSPD": np.float64, "WMAX": np.float64, "PRES": np.float64,
+    "TMAX": np.float64, "TMIN": np.float64, "RAIN": np.float64
+}
+# 16-point compass wind direction -> degrees
+COMPASS = {d: 22.5 * i for i, d in enumerate(
+    ["N", "NNE", "NE", "ENE", "E", "ESE", "SE", "SSE",
+     "S", "SSW", "SW", "WSW", "W", "WNW", "NW", "NNW"])}
+# current.csv times are local time in Oklahoma (CST or CDT)
+LOCAL_TZ = ZoneInfo("America/Chicago")
+
+
+def _fill_blanks(body):
+    """
+    Return rows of current.csv with blank fields ("" or " ") written as nan,
+    which np.loadtxt parses
+    input body: str rows of the file, each ending in a newline
+    """
+    for blank in (" ", ""):
+        # twice, for runs of adjacent blank fields
+        for _ in range(2):
+            body = body.replace(f",{blank},", ",nan,")
+        body = body.replace(f",{blank}\n", ",nan\n")
+    return body
+
+
+def _wind_degrees(wdir):
+    """
+    Return float array of degrees for compass (or numeric) directions
+    """
+    deg = np.empty(len(wdir))
+    for i, d in enumerate(wdir):
+        if d in COMPASS:
+            deg[i] = COMPASS[d]
+            continue
+        # feed gives degrees, or blank
+        try:
+            deg[i] = float(d)
+        except ValueError:
+            deg[i] = np.nan
+    return deg
+
+
+class StationTable:
+    """
+    Stations of one current.csv snapshot. Columns are read as df["TAIR"] or
+    df.TAIR (numpy arrays), rows selected with a mask, index array, or
+    slice: df[mask]. Selections share the columns of their table.
+    """
+    def __init__(self, columns, attrs=None):
+        """
+        input columns: dict of column name -> array, one row per station
+        input attrs: dict of metadata, e.g. valid_time
+        """
+        self.names = list(columns)
+        self._columns = columns
+        self._rows = None
+        self.attrs = {} if attrs is None else attrs
+
+    def __len__(self):
+        if self._rows is None:
+            return len(self._columns[self.names[0]])
+        return len(self._rows)
+
+    def _column(self, name):
+        """
+        Return full column, decoding WDIR_DEG on first use
+        """
+        col = self._columns.get(name)
+        if col is None:
+            if name != "WDIR_DEG":
+                raise KeyError(name)
+            col = _wind_degrees(self._column("WDIR"))
+            self._columns[name] = col
+        return col
+
+    def __getitem__(self, key):
+        if isinstance(key, str):
+            col = self._column(key)
+            return col if self._rows is None else col[self._rows]
+        rows = np.arange(len(self)) if self._rows is None else self._rows
+        sub = StationTable(self._columns, self.attrs)
+        sub.names = self.names
+        sub._rows = rows[key]
+        return sub
+
+    def __getattr__(self, name):
+        if name.startswith("_"):
+            raise AttributeError(name)
+        try:
+            return self[name]
+        except KeyError:
+            raise AttributeError(name) from None
+
+
+def read_current(source=CURRENT_URL):
+    """
+    Read a current.csv snapshot into a station table
+    input source: str path or url, bytes of file contents, or file-like
+    Return StationTable with columns of the schema plus WDIR_DEG; attribute
+           attrs["valid_time"] is the observation time as a UTC datetime
+    """
+    if isinstance(source, str) and source.startswith(("http://",
+                                                      "https://")):
+        with urlopen(source, timeout=30) as f:
+            source = f.read()
+    elif isinstance(source, str):
+        with open(source, "rb") as f:
+            source = f.read()
+    elif hasattr(source, "read"):
+        source = source.read()
+    text = source.decode() if isinstance(source, bytes) else source
+    header, body = text.replace("\r", "").split("\n", 1)
+    names = [c.strip() for c in header.split(",")]
+    body = body.strip("\n")
+    if not body:
+        raise ValueError("current.csv has no stations")
+    # one typed parse of every column; text columns as python str
+    dtype = [(c, object if SCHEMA.get(c, np.float64) is str
+              else SCHEMA.get(c, np.float64)) for c in names]
+    data = np.loadtxt(_fill_blanks(body + "\n").splitlines(), delimiter=",",
+                      dtype=dtype, ndmin=1)
+    columns = {}
+    for c in names:
+        col = data[c]
+        if col.dtype == object:
+            col = np.char.strip(col.astype(str))
+            col[col == "nan"] = ""
+        columns[c] = col
+    df = StationTable(columns)
+    # all stations share one observation time
+    t = datetime(*(int(columns[c][0]) for c in ("YR", "MO", "DA", "HR",
+                                                 "MI")), tzinfo=LOCAL_TZ)
+    df.attrs["valid_time"] = t.astimezone(timezone.utc).replace(tzinfo=None)
+    return df
+
+
+def valid(df, *columns):
+    """
+    Return rows of station table with all of columns reported
+    """
+    ok = np.ones(len(df), dtype=bool)
+    for c in columns:
+        ok &= ~np.isnan(df[c])
+    return df[ok]
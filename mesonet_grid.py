@@ -0,0 +1,237 @@
+'''
+Grid a time series of Oklahoma Mesonet current.csv snapshots into one
+CF-compliant netCDF with dimensions (time, lat, lon).
+
+For each snapshot, air temperature, dewpoint, wind (as u/v components and
+speed), and pressure are interpolated together in one batched pass over a
+single cached triangulation, masked outside Oklahoma, and appended along an
+unlimited time dimension. Variables are packed to int16, compressed, and
+chunked one time step per chunk. A day of 5-minute snapshots is one run:
+
+    python mesonet_grid.py -i snapshots/*.csv -o okmeso_20261018.nc
+
+Author: Brian R. Greene, University of Oklahoma
+Updated: 18 October 2026
+'''
+# Python Packages
+import os
+import time
+from argparse import ArgumentParser
+
+# Installed packages
+import numpy as np
+import netCDF4
+
+from ok_grid import MercTransform, get_ok_grid
+from ok_gridding import StationIndex, get_interpolator
+from mesonet_current import read_current
+
+# gridded variables: name -> (standard_name, units, long_name,
+#                             scale_factor, add_offset)
+VARIABLES = {
+    "TAIR": ("air_temperature", "degF", "Air Temperature", 0.01, 0.),
+    "TDEW": ("dew_point_temperature", "degF", "Dewpoint Temperature",
+             0.01, 0.),
+    "UWND": ("eastward_wind", "mph", "Eastward Wind", 0.01, 0.),
+    "VWND": ("northward_wind", "mph", "Northward Wind", 0.01, 0.),
+    "WSPD": ("wind_speed", "mph", "Wind Speed", 0.01, 0.),
+    "PRES": ("surface_air_pressure", "inHg", "Station Pressure",
+             0.001, 28.)
+}
+FILL_INT16 = np.int16(-32768)
+TIME_UNITS = "minutes since 1970-01-01 00:00:00"
+# interpolation method -> name recorded in the file's source attribute
+METHODS = {"cubic": "Clough-Tocher", "linear": "linear barycentric"}
+SHAPEFILE = os.path.join(os.path.expanduser("~"), "Nextcloud", "thermo",
+                         "documentation", "States", "states_21basic",
+                         "states")
+
+
+def station_values(df):
+    """
+    Values of gridded variables at each station
+    input df: station table from mesonet_current.read_current
+    Return dict of {var: float array}
+    """
+    spd = df.WSPD
+    # meteorological direction wind blows from
+    wdir = np.radians(df.WDIR_DEG)
+    return {"TAIR": df.TAIR, "TDEW": df.TDEW,
+            "UWND": -spd * np.sin(wdir), "VWND": -spd * np.cos(wdir),
+            "WSPD": spd, "PRES": df.PRES}
+
+
+def grid_snapshot(lons, lats, values, m, grid, method="cubic"):
+    """
+    Interpolate all variables of one snapshot onto the grid. Variables
+    reported by the same stations share one batched interpolation.
+    input lons, lats: arrays of station longitude, latitude
+    input values: dict of {var: array} from station_values
+    input m: MercTransform or Basemap the grid is projected with
+    input grid: ok_grid.OKGrid
+    input method: str "cubic" or "linear"
+    Return dict of {var: 2-D array}, nan outside Oklahoma
+    """
+    x1, y1 = m(np.asarray(lons), np.asarray(lats))
+    x1, y1 = np.asarray(x1), np.asarray(y1)
+    names = list(values)
+    V = np.column_stack([values[v] for v in names])
+    valid = np.isfinite(V)
+    out = {}
+    # group variables by which stations reported them
+    patterns = {}
+    for j, v in enumerate(names):
+        patterns.setdefault(valid[:, j].tobytes(), []).append(j)
+    for cols in patterns.values():
+        ok = valid[:, cols[0]]
+        points, V2 = StationIndex(x1[ok], y1[ok]).extend_to_border(
+            V[ok][:, cols], grid.border)
+        G = get_interpolator(points, grid.xplot, grid.yplot)(V2, method)
+        G[grid.mask] = np.nan
+        for k, j in enumerate(cols):
+            out[names[j]] = G[..., k]
+    return out
+
+
+class AnalysisFile:
+    """
+    CF netCDF of gridded analyses with an unlimited time dimension
+    """
+    def __init__(self, path, method="cubic"):
+        """
+        input path: str path of netCDF file
+        input method: str "cubic" or "linear" interpolation of the analyses
+        """
+        self.path = path
+        self.method = method
+
+    def _create(self, grid):
+        """
+        Create empty file on grid
+        """
+        lat = grid.lat[:, 0]
+        lon = grid.lon[0, :]
+        nc = netCDF4.Dataset(self.path, "w", format="NETCDF4")
+        nc.Conventions = "CF-1.8"
+        nc.title = "Oklahoma Mesonet gridded analyses"
+        nc.source = (f"Oklahoma Mesonet current.csv, {METHODS[self.method]} "
+                     "interpolation")
+        nc.interpolation = self.method
+        nc.createDimension("time", None)
+        nc.createDimension("lat", len(lat))
+        nc.createDimension("lon", len(lon))
+        t = nc.createVariable("time", "i4", ("time",))
+        t.units = TIME_UNITS
+        t.calendar = "standard"
+        t.standard_name = "time"
+        t.axis = "T"
+        for name, vals, units, axis in (("lat", lat, "degrees_north", "Y"),
+                                        ("lon", lon, "degrees_east", "X")):
+            var = nc.createVariable(name, "f8", (name,))
+            var[:] = vals
+            var.units = units
+            var.standard_name = "latitude" if name == "lat" else "longitude"
+            var.axis = axis
+        for v, (std, units, long_name, scale, offset) in VARIABLES.items():
+            var = nc.createVariable(v, "i2", ("time", "lat", "lon"),
+                                    zlib=True, shuffle=True,
+                                    chunksizes=(1, len(lat), len(lon)),
+                                    fill_value=FILL_INT16)
+            var.scale_factor = scale
+            var.add_offset = offset
+            var.standard_name = std
+            var.units = units
+            var.long_name = long_name
+        return nc
+
+    def times(self):
+        """
+        Return array of datetime64 of stored analyses
+        """
+        if not os.path.exists(self.path):
+            return np.array([], dtype="datetime64[m]")
+        with netCDF4.Dataset(self.path) as nc:
+            minutes = nc["time"][:].astype(np.int64)
+        return np.datetime64("1970-01-01T00:00", "m") + \
+            minutes.astype("m8[m]")
+
+    def append(self, t, fields, grid):
+        """
+        Append one analysis
+        input t: numpy datetime64 valid time (UTC)
+        input fields: dict of {var: 2-D array} from grid_snapshot
+        input grid: ok_grid.OKGrid, used to create the file
+        """
+        if os.path.exists(self.path):
+            nc = netCDF4.Dataset(self.path, "a")
+            # files from before the attribute are all Clough-Tocher
+            method = getattr(nc, "interpolation", "cubic")
+            if method != self.method:
+                nc.close()
+                raise ValueError(f"{self.path} holds {method} analyses, "
+                                 f"not {self.method}")
+        else:
+            nc = self._create(grid)
+        with nc:
+            it = len(nc["time"])
+            for v in VARIABLES:
+                val = fields[v]
+                bad = np.isnan(val)
+                nc[v][it] = np.ma.array(np.where(bad, 0., val), mask=bad)
+            nc["time"][it] = (np.datetime64(t, "m") -
+                              np.datetime64("1970-01-01T00:00", "m")) \
+                .astype(np.int64)
+
+
+def grid_snapshots(paths, out, m, grid, method="cubic"):
+    """
+    Grid snapshots in time order and append them to one netCDF, skipping
+    times already in the file
+    input paths: list of str current.csv paths
+    input out: str path of netCDF file
+    input m: MercTransform or Basemap the grid is projected with
+    input grid: ok_grid.OKGrid
+    input method: str "cubic" or "linear"
+    Return int number of analyses appended
+    """
+    snaps = sorted((read_current(p) for p in paths),
+                   key=lambda df: df.attrs["valid_time"])
+    f = AnalysisFile(out, method)
+    times = f.times()
+    last = times[-1] if len(times) else None
+    n = 0
+    t0 = time.time()
+    for df in snaps:
+        t = np.datetime64(df.attrs["valid_time"], "m")
+        if last is not None and t <= last:
+            continue
+        fields = grid_snapshot(df.LON, df.LAT,
+                               station_values(df), m, grid, method)
+        f.append(t, fields, grid)
+        last = t
+        n += 1
+    print(f"Gridded {n} snapshots in {time.time() - t0:.1f} seconds")
+    return n
+
+
+def main():
+    parser = ArgumentParser()
+    parser.add_argument("-i", required=True, action="store", dest="files",
+                        nargs="+", help="current.csv snapshots")
+    parser.add_argument("-o", required=True, action="store", dest="out",
+                        type=str, help="Output netCDF path")
+    parser.add_argument("-g", action="store", dest="gridspace", type=float,
+                        default=0.05, help="Grid spacing in degrees")
+    parser.add_argument("-s", action="store", dest="shapefile", type=str,
+                        default=SHAPEFILE, help="States shapefile")
+    parser.add_argument("--linear", action="store_true", dest="linear",
+                        help="Linear instead of cubic interpolation")
+    args = parser.parse_args()
+    m = MercTransform()
+    grid = get_ok_grid(m, args.shapefile, args.gridspace)
+    grid_snapshots(args.files, args.out, m, grid,
+                   "linear" if args.linear else "cubic")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,265 @@
+'''
+Polling ingest of the statewide Oklahoma Mesonet current.csv feed.
+
+A long-running poller re-requests the feed with conditional GET
+(If-None-Match/If-Modified-Since), so unchanged snapshots cost a 304 and no
+parsing. New content is deduplicated on its observation time, kept in a
+fixed-size in-memory ring buffer, and appended to disk as one csv per
+observation time (UTC) under a per-day directory, plus a latest.csv that is
+replaced atomically:
+
+    snapshots/20261018/current_20261018_1435.csv
+    snapshots/latest.csv
+
+The gridding pipeline consumes the archive directly
+(python mesonet_grid.py -i snapshots/20261018/*.csv -o ...), and the map
+scripts read the newest snapshot from disk with latest_snapshot() instead
+of fetching the feed themselves. Run with:
+
+    python mesonet_poll.py -o snapshots
+
+Author: Brian R. Greene, University of Oklahoma
+Updated: 18 October 2026
+'''
+# Python Packages
+import os
+import glob
+import time
+import threading
+from collections import deque
+from argparse import ArgumentParser
+
+# Installed packages
+import requests
+
+from mesonet_current import CURRENT_URL, read_current
+from atomic_io import atomic_write
+from mts_fetch import RETRY_STATUS, make_session
+
+SNAPSHOT_DIR = os.path.join(os.path.expanduser("~"), ".cache", "Wx",
+                            "mesonet_current")
+LATEST = "latest.csv"
+
+
+def snapshot_path(out_dir, valid_time):
+    """
+    Return str path of archived snapshot for a valid time
+    input out_dir: str root directory of snapshots
+    input valid_time: datetime observation time (UTC)
+    """
+    return os.path.join(out_dir, valid_time.strftime("%Y%m%d"),
+                        f"current_{valid_time.strftime('%Y%m%d_%H%M')}.csv")
+
+
+def archived(out_dir):
+    """
+    Return sorted list of str paths of archived snapshots in out_dir
+    """
+    return sorted(glob.glob(os.path.join(out_dir, "*", "current_*.csv")))
+
+
+def latest_snapshot(out_dir=SNAPSHOT_DIR, max_age=600.):
+    """
+    Read the newest snapshot written by the poller, fetching the feed
+    directly if no poller has written one recently
+    input out_dir: str root directory of snapshots
+    input max_age: float seconds after which latest.csv is considered stale
+    Return station table from mesonet_current.read_current
+    """
+    path = os.path.join(out_dir, LATEST)
+    try:
+        if time.time() - os.path.getmtime(path) <= max_age:
+            return read_current(path)
+    except OSError:
+        pass
+    return read_current(CURRENT_URL)
+
+
+class SnapshotRing:
+    """
+    Fixed-size buffer of the most recent snapshots, oldest dropped first.
+    Safe to read from other threads while the poller appends.
+    """
+    def __init__(self, size):
+        """
+        input size: int number of snapshots kept
+        """
+        self.size = size
+        self._buf = deque(maxlen=size)
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self._buf)
+
+    def append(self, df):
+        """
+        Add station table, dropping the oldest if full
+        """
+        with self._lock:
+            self._buf.append(df)
+
+    def latest(self):
+        """
+        Return newest station table, or None if empty
+        """
+        with self._lock:
+            return self._buf[-1] if self._buf else None
+
+    def snapshots(self):
+        """
+        Return list of buffered station tables, oldest first
+        """
+        with self._lock:
+            return list(self._buf)
+
+    def times(self):
+        """
+        Return list of valid times (UTC datetimes) of buffered snapshots
+        """
+        return [df.attrs["valid_time"] for df in self.snapshots()]
+
+
+class MesonetPoller:
+    """
+    Conditional-GET poller of current.csv with a ring buffer and disk archive
+    """
+    def __init__(self, out_dir=SNAPSHOT_DIR, url=CURRENT_URL, size=288,
+                 session=None, timeout=30):
+        """
+        input out_dir: str root directory of snapshots, None to keep
+                       snapshots in memory only
+        input url: str url of current.csv feed
+        input size: int snapshots kept in memory (288 = one day of 5-min)
+        input session: requests.Session to poll with, default=new session
+        input timeout: float seconds to wait on server
+        """
+        self.out_dir = out_dir
+        self.url = url
+        self.ring = SnapshotRing(size)
+        self.session = make_session(1) if session is None else session
+        self.timeout = timeout
+        self.etag = None
+        self.last_modified = None
+        self.last_time = None
+        self._restore()
+
+    def _restore(self):
+        """
+        Refill ring buffer from archive so a restarted poller neither loses
+        history nor rewrites snapshots it already has
+        """
+        if self.out_dir is None:
+            return
+        for path in archived(self.out_dir)[-self.ring.size:]:
+            try:
+                df = read_current(path)
+            except (OSError, ValueError):
+                continue
+            self.ring.append(df)
+            self.last_time = df.attrs["valid_time"]
+
+    def _save(self, content, df):
+        """
+        Write raw snapshot to archive and replace latest.csv
+        """
+        path = snapshot_path(self.out_dir, df.attrs["valid_time"])
+        if not os.path.exists(path):
+            atomic_write(path, content)
+        atomic_write(os.path.join(self.out_dir, LATEST), content)
+
+    def _validators(self, r):
+        """
+        Keep ETag and Last-Modified of response r for the next request
+        """
+        self.etag = r.headers.get("ETag")
+        self.last_modified = r.headers.get("Last-Modified")
+
+    def poll(self):
+        """
+        Request the feed once
+        Return station table if it holds a new observation time, else None
+        """
+        headers = {}
+        if self.etag:
+            headers["If-None-Match"] = self.etag
+        if self.last_modified:
+            headers["If-Modified-Since"] = self.last_modified
+        r = self.session.get(self.url, headers=headers, timeout=self.timeout)
+        if r.status_code == 304:
+            return None
+        r.raise_for_status()
+        df = read_current(r.content)
+        t = df.attrs["valid_time"]
+        # servers without validators, or a rebuilt file with old obs
+        if self.last_time is not None and t <= self.last_time:
+            self._validators(r)
+            return None
+        if self.out_dir is not None:
+            self._save(r.content, df)
+        # only once saved: a failed write is retried with a full GET
+        self._validators(r)
+        self.ring.append(df)
+        self.last_time = t
+        return df
+
+    def run(self, interval=60., max_polls=None, max_backoff=600.):
+        """
+        Poll until interrupted, backing off after failures
+        input interval: float seconds between polls
+        input max_polls: int stop after this many polls, default=forever
+        input max_backoff: float cap on seconds between polls after failures
+        """
+        n = 0
+        failures = 0
+        while max_polls is None or n < max_polls:
+            t0 = time.time()
+            try:
+                df = self.poll()
+                failures = 0
+                if df is not None:
+                    print(f"{df.attrs['valid_time']:%Y-%m-%d %H:%M} UTC: "
+                          f"{len(df)} stations ({len(self.ring)} buffered)")
+            except requests.HTTPError as e:
+                # client errors other than rate limiting will not fix themselves
+                if e.response is not None and \
+                        e.response.status_code not in RETRY_STATUS:
+                    raise
+                failures += 1
+                print(f"Poll failed ({e})")
+            except (requests.ConnectionError, requests.Timeout,
+                    ValueError) as e:
+                failures += 1
+                print(f"Poll failed ({e})")
+            except OSError as e:
+                # disk full, permissions: the snapshot is fetched again
+                failures += 1
+                print(f"Saving snapshot failed ({e})")
+            n += 1
+            if max_polls is not None and n >= max_polls:
+                break
+            wait = min(interval * 2**failures, max(max_backoff, interval))
+            time.sleep(max(0., wait - (time.time() - t0)))
+
+
+def main():
+    parser = ArgumentParser()
+    parser.add_argument("-o", action="store", dest="out_dir", type=str,
+                        default=SNAPSHOT_DIR, help="Snapshot directory")
+    parser.add_argument("-u", action="store", dest="url", type=str,
+                        default=CURRENT_URL, help="current.csv url")
+    parser.add_argument("-n", action="store", dest="size", type=int,
+                        default=288, help="Snapshots kept in memory")
+    parser.add_argument("-t", action="store", dest="interval", type=float,
+                        default=60., help="Seconds between polls")
+    parser.add_argument("--once", action="store_true", dest="once",
+                        help="Poll once and exit")
+    args = parser.parse_args()
+    poller = MesonetPoller(args.out_dir, args.url, args.size)
+    try:
+        poller.run(args.interval, 1 if args.once else None)
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
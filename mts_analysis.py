@@ -0,0 +1,110 @@
+# --------------------------------
+# Name: mts_analysis.py
+# Author: Brian R. Greene
+# University of Oklahoma
+# Updated: 18 October 2026
+# Purpose: Time series analysis for long Mesonet records. FFT-based
+# autocorrelation and power spectrum that treat nans as gaps rather than
+# requiring interpolation, and least-squares decomposition into diurnal and
+# annual harmonics.
+# --------------------------------
+import numpy as np
+from scipy import fft
+# --------------------------------
+def _gap_series(x):
+    """
+    Return (anomaly with gaps set to 0, float weights 1 valid/0 gap)
+    """
+    x = np.asarray(x, dtype=np.float64)
+    w = np.isfinite(x).astype(np.float64)
+    x0 = np.where(w > 0, x - np.nanmean(x), 0.)
+    return x0, w
+# --------------------------------
+def _lagged_sums(a, b, max_lag, block):
+    """
+    Sum over i of a[i]*b[i+k] for k = 0..max_lag using FFTs over blocks of
+    length block, so memory scales with block + max_lag rather than len(a)
+    """
+    n = len(a)
+    nfft = fft.next_fast_len(block + max_lag + 1)
+    out = np.zeros(max_lag + 1)
+    for s in range(0, n, block):
+        A = fft.rfft(a[s:s+block], nfft)
+        B = fft.rfft(b[s:s+block+max_lag], nfft)
+        out += fft.irfft(np.conj(A) * B, nfft)[:max_lag+1]
+    return out
+# --------------------------------
+def autocorr(x, max_lag=None, block=None, min_pairs=1):
+    """
+    Autocorrelation of a series with gaps via FFT. Each lag is normalized
+    by the number of valid pairs and the variance of valid points
+    (masked, normalized correlation), so nans need no gap filling.
+    input x: 1-D array, nan for missing
+    input max_lag: int largest lag in samples, default=len(x)-1
+    input block: int samples per FFT block, default=max(4*max_lag, 2**16);
+                 smaller blocks bound memory for very long records
+    input min_pairs: int lags with fewer valid pairs than this are nan
+    Return (lags, r) arrays of length max_lag+1, lags in samples
+    """
+    x0, w = _gap_series(x)
+    n = len(x0)
+    if max_lag is None:
+        max_lag = n - 1
+    max_lag = int(min(max_lag, n - 1))
+    if block is None:
+        block = max(4 * max_lag, 2**16)
+    block = min(block, n)
+    # lagged sums of products and of valid pairs
+    num = _lagged_sums(x0, x0, max_lag, block)
+    pairs = np.rint(_lagged_sums(w, w, max_lag, block))
+    var = np.sum(x0 * x0) / np.sum(w)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        r = num / pairs / var
+    r[pairs < min_pairs] = np.nan
+    return np.arange(max_lag + 1), r
+# --------------------------------
+def power_spectrum(x, dt=1.):
+    """
+    One-sided power spectral density of a series with gaps. Gaps are set to
+    the mean and the result is scaled up by the fraction of valid points.
+    input x: 1-D array, nan for missing
+    input dt: float sample spacing (units of result are per unit of dt)
+    Return (freq, psd) arrays
+    """
+    x0, w = _gap_series(x)
+    n = len(x0)
+    X = fft.rfft(x0)
+    psd = 2. * dt * np.abs(X)**2 / n / np.mean(w)
+    psd[0] /= 2.
+    if n % 2 == 0:
+        psd[-1] /= 2.
+    return fft.rfftfreq(n, dt), psd
+# --------------------------------
+def harmonics(time, x, periods=(1., 365.25), nharm=(3, 2)):
+    """
+    Least-squares fit of mean plus harmonics of given periods, ignoring nans
+    input time: 1-D datetime64 array
+    input x: 1-D array, nan for missing
+    input periods: periods in days, default=(diurnal, annual)
+    input nharm: number of harmonics of each period to fit
+    Return dict with "mean", per-period lists of "amplitude" and "phase"
+           (radians, of cos(2 pi k t / P - phase)) under each period key,
+           and "fit" evaluated at all times
+    """
+    x = np.asarray(x, dtype=np.float64)
+    t = (time - time[0]) / np.timedelta64(1, "D")
+    cols = [np.ones_like(t)]
+    for P, K in zip(periods, nharm):
+        for k in range(1, K + 1):
+            arg = 2. * np.pi * k * t / P
+            cols += [np.cos(arg), np.sin(arg)]
+    G = np.column_stack(cols)
+    ok = np.isfinite(x)
+    coef = np.linalg.lstsq(G[ok], x[ok], rcond=None)[0]
+    out = {"mean": coef[0], "fit": G @ coef}
+    i = 1
+    for P, K in zip(periods, nharm):
+        a, b = coef[i:i+2*K:2], coef[i+1:i+2*K:2]
+        out[P] = {"amplitude": np.hypot(a, b), "phase": np.arctan2(b, a)}
+        i += 2 * K
+    return out
@@ -0,0 +1,260 @@
+# --------------------------------
+# Name: mts_archive.py
+# Author: Brian R. Greene
+# University of Oklahoma
+# Updated: 18 October 2026
+# Purpose: Append-only archive of Mesonet 1-minute observations, one netCDF4
+# file per station per year with an unlimited time dimension. Values are
+# packed to int16 with scale/offset and compressed, days are appended
+# incrementally, and query() reads only the requested times and variables.
+# A day missing (or partly missing) before the end of a file is merged in by
+# rewriting that year's file, so times stay sorted.
+# --------------------------------
+import os
+import tempfile
+import numpy as np
+import netCDF4
+from NWCmesonet import parse_mts, MTS_ATTRS
+from mts_cache import get_cache
+from mts_fetch import fetch_day, fetch_range
+# --------------------------------
+# int16 packing for each variable: (scale_factor, add_offset)
+# variables not listed are stored as float32
+PACKING = {
+    "RELH": (0.01, 0.), "TAIR": (0.01, 0.), "TA9M": (0.01, 0.),
+    "SKIN": (0.01, 0.), "WSPD": (0.01, 0.), "WVEC": (0.01, 0.),
+    "WS2M": (0.01, 0.), "WMAX": (0.01, 0.), "WDSD": (0.01, 0.),
+    "WSSD": (0.01, 0.), "WDIR": (0.1, 0.), "RAIN": (0.01, 0.),
+    "PRES": (0.01, 900.), "SRAD": (0.1, 0.),
+    "TS10": (0.01, 0.), "TB10": (0.01, 0.), "TS05": (0.01, 0.),
+    "TS25": (0.01, 0.), "TS60": (0.01, 0.), "TR05": (0.01, 0.),
+    "TR25": (0.01, 0.), "TR60": (0.01, 0.)
+}
+FILL_INT16 = np.int16(-32768)
+# one chunk holds a day of 1-minute data
+CHUNK = 1440
+# --------------------------------
+def _masked(val):
+    """
+    Return masked array of val with nans masked, stored as fill value
+    """
+    bad = np.isnan(val)
+    return np.ma.array(np.where(bad, 0., val), mask=bad)
+# --------------------------------
+def _write(nc, i0, minutes, ds):
+    """
+    Write rows of ds at index i0 of open archive file nc
+    input minutes: int array of minutes since start of year of ds rows
+    """
+    nc.variables["time"][i0:i0+len(minutes)] = minutes
+    for v in ds.data_vars:
+        if v in nc.variables:
+            nc.variables[v][i0:i0+len(minutes)] = _masked(ds[v].values)
+# --------------------------------
+class MTSArchive:
+    """
+    Yearly netCDF archive of one station's mts data under root directory
+    """
+    def __init__(self, root, station="nwcm"):
+        """
+        input root: str directory holding yearly files
+        input station: str 4-letter station id
+        """
+        self.root = root
+        self.station = station.lower()
+
+    def path(self, year):
+        """
+        Return str path of file for year
+        """
+        return os.path.join(self.root, f"{self.station}_{year:04d}.nc")
+
+    def years(self):
+        """
+        Return sorted list of years with a file in the archive
+        """
+        if not os.path.isdir(self.root):
+            return []
+        pre = f"{self.station}_"
+        return sorted(int(f[len(pre):-3]) for f in os.listdir(self.root)
+                      if f.startswith(pre) and f.endswith(".nc"))
+
+    def _create(self, year, variables, path=None):
+        """
+        Create empty file for year with packed variables
+        input path: str path to create, default=self.path(year)
+        """
+        os.makedirs(self.root, exist_ok=True)
+        nc = netCDF4.Dataset(self.path(year) if path is None else path, "w",
+                             format="NETCDF4")
+        nc.createDimension("time", None)
+        t = nc.createVariable("time", "i4", ("time",), zlib=True,
+                              chunksizes=(CHUNK,))
+        t.units = f"minutes since {year:04d}-01-01 00:00:00"
+        t.calendar = "standard"
+        for v in variables:
+            if v in PACKING:
+                var = nc.createVariable(v, "i2", ("time",), zlib=True,
+                                        shuffle=True, chunksizes=(CHUNK,),
+                                        fill_value=FILL_INT16)
+                var.scale_factor, var.add_offset = PACKING[v]
+            else:
+                var = nc.createVariable(v, "f4", ("time",), zlib=True,
+                                        shuffle=True, chunksizes=(CHUNK,),
+                                        fill_value=np.float32(np.nan))
+            if v in MTS_ATTRS:
+                var.units, var.name_long = MTS_ATTRS[v]
+        nc.station = self.station
+        return nc
+
+    def last_time(self):
+        """
+        Return numpy datetime64 of last stored observation, or None
+        """
+        years = self.years()
+        if len(years) == 0:
+            return None
+        with netCDF4.Dataset(self.path(years[-1])) as nc:
+            t = nc.variables["time"]
+            if len(t) == 0:
+                return None
+            return np.datetime64(f"{years[-1]:04d}-01-01", "m") + \
+                np.timedelta64(int(t[-1]), "m")
+
+    def has_day(self, date):
+        """
+        Check whether a day needs no fetching: all 1440 minutes of the day
+        are archived. A day cut short (fetched before it ended, or by a
+        failed download) is fetched again, and append() adds only the
+        minutes it is missing
+        input date: datetime object of day (UTC)
+        Return bool
+        """
+        path = self.path(date.year)
+        if not os.path.exists(path):
+            return False
+        m0 = (date.timetuple().tm_yday - 1) * 1440
+        with netCDF4.Dataset(path) as nc:
+            t = nc.variables["time"][:]
+        # times are sorted and unique: count those in [m0, m0 + 1 day)
+        i0, i1 = np.searchsorted(t, [m0, m0 + 1440])
+        return i1 - i0 == 1440
+
+    def append(self, ds):
+        """
+        Add Dataset from parse_mts, skipping times already archived. Times
+        after the end of a year's file are appended; earlier ones (a missed
+        day) are merged in by rewriting the file
+        input ds: xarray Dataset with time dimension
+        Return int number of rows added
+        """
+        n = 0
+        years = ds.time.dt.year.values
+        for year in np.unique(years):
+            dsy = ds.isel(time=years == year)
+            minutes = ((dsy.time.values - np.datetime64(f"{year:04d}-01-01"))
+                       // np.timedelta64(1, "m")).astype(np.int32)
+            path = self.path(year)
+            if not os.path.exists(path):
+                with self._create(year, list(dsy.data_vars)) as nc:
+                    _write(nc, 0, minutes, dsy)
+                n += len(minutes)
+                continue
+            with netCDF4.Dataset(path, "a") as nc:
+                t = nc.variables["time"]
+                last = t[-1] if len(t) else -1
+                if minutes[0] > last:
+                    # daily case: all new rows go at the end
+                    _write(nc, len(t), minutes, dsy)
+                    n += len(minutes)
+                    continue
+                stored = t[:]
+            new = ~np.isin(minutes, stored)
+            if new.any():
+                self._merge(year, minutes[new], dsy.isel(time=new))
+            n += int(new.sum())
+        return n
+
+    def _merge(self, year, minutes, ds):
+        """
+        Rewrite a year's file with rows of ds merged in time order
+        input minutes: int array of minutes since start of year of ds rows
+        input ds: xarray Dataset of rows not in the file
+        """
+        path = self.path(year)
+        with netCDF4.Dataset(path) as old:
+            variables = [v for v in old.variables if v != "time"]
+            t = np.concatenate([old.variables["time"][:], minutes])
+            order = np.argsort(t, kind="stable")
+            values = {}
+            for v in variables:
+                val = np.ma.filled(old.variables[v][:].astype(np.float64),
+                                   np.nan)
+                add = ds[v].values if v in ds.data_vars else \
+                    np.full(len(minutes), np.nan)
+                values[v] = np.concatenate([val, add])[order]
+        # write a new file and rename it into place
+        fd, tmp = tempfile.mkstemp(dir=self.root, suffix=".tmp")
+        os.close(fd)
+        try:
+            with self._create(year, variables, tmp) as nc:
+                nc.variables["time"][:] = t[order]
+                for v in variables:
+                    nc.variables[v][:] = _masked(values[v])
+            os.replace(tmp, path)
+        except BaseException:
+            os.remove(tmp)
+            raise
+
+    def append_day(self, date, cache=None):
+        """
+        Fetch, parse, and append one day of data
+        input date: datetime object for desired date (UTC)
+        input cache: mts_cache.MTSCache to fetch through, default=shared cache
+        Return int number of rows appended
+        """
+        if cache is None:
+            cache = get_cache()
+        return self.append(parse_mts(fetch_day(self.station, date, cache)))
+
+    def backfill(self, start, end, max_workers=8):
+        """
+        Fetch and append all days from start to end (inclusive)
+        input start: datetime object of first day (UTC)
+        input end: datetime object of last day (UTC)
+        input max_workers: int number of concurrent downloads
+        """
+        for date, content in fetch_range(self.station, start, end,
+                                         max_workers=max_workers):
+            n = self.append(parse_mts(content))
+            print(f"Archived {n} rows for {date.strftime('%Y%m%d')}")
+
+    def query(self, start, end, variables=None):
+        """
+        Read observations in [start, end) reading only the requested slices
+        input start: datetime object of first time
+        input end: datetime object of end time (exclusive)
+        input variables: list of str variable names, default=all
+        Return xarray Dataset
+        """
+        # only query needs these: keep appending (daily cron job) fast
+        import pandas as pd
+        import xarray as xr
+        start = pd.Timestamp(start)
+        end = pd.Timestamp(end)
+        parts = []
+        for year in self.years():
+            if year < start.year or year > end.year:
+                continue
+            # decode times lazily; data variables are only read when sliced
+            ds = xr.open_dataset(self.path(year))
+            if variables is not None:
+                ds = ds[variables]
+            # times are append-only so sorted: read one contiguous slab
+            i0, i1 = np.searchsorted(ds.time.values, [start.to_datetime64(),
+                                                      end.to_datetime64()])
+            parts.append(ds.isel(time=slice(i0, i1)).load())
+            ds.close()
+        if len(parts) == 0:
+            raise ValueError(f"No archived data between {start} and {end}")
+        return xr.concat(parts, dim="time")
@@ -0,0 +1,264 @@
+# --------------------------------
+# Name: mts_cache.py
+# Author: Brian R. Greene
+# University of Oklahoma
+# Updated: 18 October 2026
+# Purpose: Local on-disk cache of Mesonet 1-minute mts files. Files are
+# stored content-addressed (by sha256) and referenced by station and date.
+# Days that are over are served straight from disk; the current day is
+# revalidated with ETag/Last-Modified so it is only downloaded when changed.
+# Total size is capped with least-recently-used eviction.
+# --------------------------------
+import os
+import json
+import hashlib
+import threading
+import requests
+from datetime import datetime, timedelta
+from atomic_io import atomic_write
+# --------------------------------
+# NWC tower has its own archive, all other stations use the mdf/mts service
+NWC_URL = "http://www.mesonet.org/data/public/nwc/mts-1m/"
+MTS_URL = "http://www.mesonet.org/index.php/dataMdfMts/dataController/getFile/"
+# default cache location and size cap
+CACHE_DIR = os.path.join(os.path.expanduser("~"), ".cache", "Wx", "mts")
+MAX_BYTES = 2 * 1024**3
+# --------------------------------
+def mts_url(station, date):
+    """
+    Construct url for a daily mts file
+    input station: str 4-letter station id, e.g. "nwcm" or "nrmn"
+    input date: datetime object for desired date (UTC)
+    Return str
+    """
+    station = station.lower()
+    ymd = date.strftime("%Y%m%d")
+    if station == "nwcm":
+        return f"{NWC_URL}{date.strftime('%Y/%m/%d')}/{ymd}nwcm.mts"
+    return f"{MTS_URL}{ymd}{station}/mts/TEXT/"
+# --------------------------------
+class MTSCache:
+    """
+    Content-addressed cache of mts files keyed by (station, date)
+
+    Layout under cache_dir:
+        objects/<sha[:2]>/<sha>         file contents
+        refs/<station>/<YYYYMMDD>.json  sha, url, etag, last_modified, fetched
+    The mtime of each ref file records its last access for LRU eviction.
+    """
+    def __init__(self, cache_dir=CACHE_DIR, max_bytes=MAX_BYTES,
+                 session=None, final_after=timedelta(hours=1), timeout=30):
+        """
+        input cache_dir: str root directory of cache
+        input max_bytes: int cap on total size of cached files
+        input session: requests.Session to fetch with, default=new session
+        input final_after: timedelta after end of day (UTC) when a file
+                           is considered complete and no longer revalidated
+        input timeout: float seconds to wait on server
+        """
+        self.cache_dir = cache_dir
+        self.max_bytes = max_bytes
+        self.session = requests.Session() if session is None else session
+        self.final_after = final_after
+        self.timeout = timeout
+        # running total of object sizes, computed on first store
+        self._total = None
+        # stores may come from several fetch threads at once
+        self._lock = threading.Lock()
+
+    def _ref_path(self, station, date):
+        return os.path.join(self.cache_dir, "refs", station.lower(),
+                            f"{date.strftime('%Y%m%d')}.json")
+
+    def _obj_path(self, sha):
+        return os.path.join(self.cache_dir, "objects", sha[:2], sha)
+
+    def _read_ref(self, station, date):
+        try:
+            with open(self._ref_path(station, date)) as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return None
+
+    def _refs(self):
+        """
+        Yield (str path, dict) of every readable ref
+        """
+        for root, _, files in os.walk(os.path.join(self.cache_dir, "refs")):
+            for f in files:
+                if f.endswith(".json"):
+                    path = os.path.join(root, f)
+                    try:
+                        with open(path) as fr:
+                            yield path, json.load(fr)
+                    except (OSError, ValueError):
+                        continue
+
+    def _referenced(self, sha, exclude=None):
+        """
+        Check whether any ref other than the one at path exclude points to
+        object sha
+        """
+        return any(ref["sha256"] == sha for path, ref in self._refs()
+                   if path != exclude)
+
+    def _load(self, station, date, ref):
+        """
+        Return cached bytes for ref and mark as recently used, or None
+        """
+        try:
+            with open(self._obj_path(ref["sha256"]), "rb") as f:
+                content = f.read()
+        except OSError:
+            return None
+        try:
+            os.utime(self._ref_path(station, date))
+        except OSError:
+            pass
+        return content
+
+    def _store(self, station, date, content, url, headers):
+        """
+        Write content and its ref to disk, then enforce size cap
+        """
+        with self._lock:
+            self._store_locked(station, date, content, url, headers)
+
+    def _store_locked(self, station, date, content, url, headers):
+        sha = hashlib.sha256(content).hexdigest()
+        if self._total is None:
+            self._total = self.size()
+        if not os.path.exists(self._obj_path(sha)):
+            atomic_write(self._obj_path(sha), content)
+            self._total += len(content)
+        # drop object this key previously pointed to (e.g. earlier today),
+        # unless another key shares it
+        old = self._read_ref(station, date)
+        if old is not None and old["sha256"] != sha and \
+                not self._referenced(old["sha256"],
+                                     self._ref_path(station, date)):
+            try:
+                os.remove(self._obj_path(old["sha256"]))
+                self._total -= old["size"]
+            except OSError:
+                pass
+        ref = {"sha256": sha, "url": url, "size": len(content),
+               "etag": headers.get("ETag"),
+               "last_modified": headers.get("Last-Modified"),
+               "fetched": datetime.utcnow().isoformat()}
+        atomic_write(self._ref_path(station, date), json.dumps(ref))
+        if self._total > self.max_bytes:
+            self.evict()
+
+    def is_final(self, date, ref):
+        """
+        Check whether cached file was fetched after its day was complete
+        """
+        day_end = datetime(date.year, date.month, date.day) + timedelta(days=1)
+        fetched = datetime.fromisoformat(ref["fetched"])
+        return fetched >= day_end + self.final_after
+
+    def get(self, station, date):
+        """
+        Return contents of mts file for station and date as bytes, from
+        disk if possible, otherwise from mesonet.org
+        input station: str 4-letter station id
+        input date: datetime object for desired date (UTC)
+        """
+        url = mts_url(station, date)
+        ref = self._read_ref(station, date)
+        headers = {}
+        if ref is not None:
+            if self.is_final(date, ref):
+                content = self._load(station, date, ref)
+                if content is not None:
+                    return content
+            # not final yet: revalidate
+            if ref.get("etag"):
+                headers["If-None-Match"] = ref["etag"]
+            if ref.get("last_modified"):
+                headers["If-Modified-Since"] = ref["last_modified"]
+        print(f"Fetching file from {url}")
+        r = self.session.get(url, headers=headers, timeout=self.timeout)
+        if r.status_code == 304:
+            content = self._load(station, date, ref)
+            if content is not None:
+                # bump fetched time so a complete day becomes final
+                ref["fetched"] = datetime.utcnow().isoformat()
+                atomic_write(self._ref_path(station, date), json.dumps(ref))
+                return content
+            # object went missing, fetch unconditionally
+            r = self.session.get(url, timeout=self.timeout)
+        r.raise_for_status()
+        self._store(station, date, r.content, url, r.headers)
+        return r.content
+
+    def size(self):
+        """
+        Return total size in bytes of cached objects
+        """
+        total = 0
+        for root, _, files in os.walk(os.path.join(self.cache_dir, "objects")):
+            total += sum(os.path.getsize(os.path.join(root, f)) for f in files)
+        return total
+
+    def evict(self):
+        """
+        Remove least recently used refs until cached objects fit in max_bytes,
+        then delete objects that are no longer referenced
+        """
+        refs = []
+        for path, ref in self._refs():
+            try:
+                refs.append((os.path.getmtime(path), path, ref))
+            except OSError:
+                continue
+        # total size of unique objects
+        sizes = {ref["sha256"]: ref["size"] for _, _, ref in refs}
+        total = sum(sizes.values())
+        self._total = total
+        if total <= self.max_bytes:
+            return
+        # count references so shared objects are only freed with last ref
+        count = {}
+        for _, _, ref in refs:
+            count[ref["sha256"]] = count.get(ref["sha256"], 0) + 1
+        for _, path, ref in sorted(refs, key=lambda x: x[0]):
+            if total <= self.max_bytes:
+                break
+            try:
+                os.remove(path)
+            except OSError:
+                continue
+            sha = ref["sha256"]
+            count[sha] -= 1
+            if count[sha] == 0:
+                try:
+                    os.remove(self._obj_path(sha))
+                except OSError:
+                    pass
+                total -= sizes[sha]
+        self._total = total
+# --------------------------------
+# default cache shared within a process
+_cache = None
+def get_cache():
+    """
+    Return default MTSCache instance, created on first use
+    """
+    global _cache
+    if _cache is None:
+        _cache = MTSCache()
+    return _cache
+# --------------------------------
+def fetch_mts(station, date, cache=None):
+    """
+    Fetch mts file contents through the local cache
+    input station: str 4-letter station id
+    input date: datetime object for desired date (UTC)
+    input cache: MTSCache, default=get_cache()
+    Return bytes
+    """
+    if cache is None:
+        cache = get_cache()
+    return cache.get(station, date)
@@ -0,0 +1,94 @@
+# --------------------------------
+# Name: mts_fetch.py
+# Author: Brian R. Greene
+# University of Oklahoma
+# Updated: 18 October 2026
+# Purpose: Concurrent downloader for ranges of daily Mesonet mts files.
+# Uses a pooled requests session shared across a bounded thread pool, retries
+# failed requests with exponential backoff, and returns files in date order.
+# All requests go through the local mts_cache.
+# --------------------------------
+import time
+import requests
+from requests.adapters import HTTPAdapter
+from concurrent.futures import ThreadPoolExecutor
+from datetime import timedelta
+from mts_cache import MTSCache, CACHE_DIR, MAX_BYTES
+# --------------------------------
+# http status codes worth retrying
+RETRY_STATUS = (429, 500, 502, 503, 504)
+# --------------------------------
+def make_session(pool_size=8):
+    """
+    Create requests Session whose connection pool can serve pool_size
+    concurrent requests to the same host
+    input pool_size: int number of pooled connections
+    Return requests.Session
+    """
+    session = requests.Session()
+    adapter = HTTPAdapter(pool_connections=2, pool_maxsize=pool_size)
+    session.mount("http://", adapter)
+    session.mount("https://", adapter)
+    return session
+# --------------------------------
+def fetch_day(station, date, cache, max_retries=5, backoff=0.5,
+              max_backoff=30.):
+    """
+    Fetch one mts file through cache, retrying with exponential backoff
+    input station: str 4-letter station id
+    input date: datetime object for desired date (UTC)
+    input cache: mts_cache.MTSCache to fetch through
+    input max_retries: int number of retries before giving up
+    input backoff: float seconds to wait before first retry, doubles each time
+    input max_backoff: float cap on seconds between retries
+    Return bytes
+    """
+    for attempt in range(max_retries + 1):
+        try:
+            return cache.get(station, date)
+        except requests.HTTPError as e:
+            # client errors other than rate limiting will not fix themselves
+            if e.response is not None and \
+                    e.response.status_code not in RETRY_STATUS:
+                raise
+            err = e
+        except (requests.ConnectionError, requests.Timeout) as e:
+            err = e
+        if attempt < max_retries:
+            wait = min(backoff * 2**attempt, max_backoff)
+            print(f"Retrying {station} {date.strftime('%Y%m%d')} in "
+                  f"{wait:.1f} s ({err})")
+            time.sleep(wait)
+    raise err
+# --------------------------------
+def fetch_range(station, start, end, max_workers=8, cache=None, **kwargs):
+    """
+    Fetch daily mts files from start to end (inclusive) concurrently
+    input station: str 4-letter station id
+    input start: datetime object of first day (UTC)
+    input end: datetime object of last day (UTC)
+    input max_workers: int number of concurrent requests
+    input cache: mts_cache.MTSCache, default=cache in default location with
+                 a session pooled for max_workers connections
+    input kwargs: passed on to fetch_day (max_retries, backoff, max_backoff)
+    Yields (date, bytes) in date order
+    """
+    if cache is None:
+        cache = MTSCache(CACHE_DIR, MAX_BYTES, make_session(max_workers))
+    days = []
+    day = start
+    while day <= end:
+        days.append(day)
+        day += timedelta(days=1)
+    with ThreadPoolExecutor(max_workers=max_workers) as pool:
+        # keep a bounded window of requests in flight so memory stays flat
+        window = 4 * max_workers
+        futures = [pool.submit(fetch_day, station, d, cache, **kwargs)
+                   for d in days[:window]]
+        for i, d in enumerate(days):
+            content = futures[i].result()
+            futures[i] = None
+            if i + window < len(days):
+                futures.append(pool.submit(fetch_day, station,
+                                           days[i+window], cache, **kwargs))
+            yield d, content
@@ -0,0 +1,365 @@
+'''
+Shared Oklahoma map grid and land mask for the Mesonet map scripts.
+
+The Oklahoma border (from the states shapefile, in map coordinates), the
+regular grid from Basemap.makegrid, and the boolean mask of grid points
+outside Oklahoma are computed once per (grid spacing, projection, shapefile)
+and saved to a compressed .npz cache. Nothing is read or computed until an
+attribute is first used, and repeat calls in one process share one OKGrid.
+
+MercTransform is a vectorized pyproj replacement for the transform of a
+corner-defined Basemap(projection="merc"): the same projparams and the same
+x, y (origin at the lower left corner), so it can stand in for the Basemap
+wherever only coordinates are needed, and shares OKGrid caches with it.
+MapContext bundles the transform, grid, station projections, and a pickled
+Basemap (for drawing) per (extent, resolution, grid spacing), so repeated
+products skip Basemap construction entirely.
+
+Author: Brian R. Greene, University of Oklahoma
+Updated: 18 October 2026
+'''
+# Python Packages
+import os
+import math
+import time
+import pickle
+import hashlib
+from collections import OrderedDict
+
+# Installed packages
+import numpy as np
+import pyproj
+from matplotlib.path import Path
+
+from atomic_io import atomic_save
+
+# Oklahoma
+llcrnrlat = 33.5
+urcrnrlat = 37.2
+llcrnrlon = -103.2
+urcrnrlon = -94.0
+
+CACHE_DIR = os.path.join(os.path.expanduser("~"), ".cache", "Wx", "ok_grid")
+# Basemap default sphere radius
+RSPHERE = 6370997.
+_DG2RAD = math.radians(1.)
+_RAD2DG = math.degrees(1.)
+
+
+def _map_key(m):
+    """
+    Return tuple identifying a Basemap projection and extent
+    """
+    return (tuple(sorted((k, str(v)) for k, v in m.projparams.items())),
+            m.llcrnrlon, m.llcrnrlat, m.urcrnrlon, m.urcrnrlat)
+
+
+class MercTransform:
+    """
+    Mercator transform matching Basemap(projection="merc") with corners
+    """
+    def __init__(self, llcrnrlon=llcrnrlon, llcrnrlat=llcrnrlat,
+                 urcrnrlon=urcrnrlon, urcrnrlat=urcrnrlat, rsphere=RSPHERE):
+        """
+        input llcrnrlon, llcrnrlat: float lower left corner in degrees
+        input urcrnrlon, urcrnrlat: float upper right corner in degrees
+        input rsphere: float radius of sphere in m
+        """
+        self.llcrnrlon = llcrnrlon
+        self.llcrnrlat = llcrnrlat
+        self.urcrnrlon = urcrnrlon
+        self.urcrnrlat = urcrnrlat
+        self.rmajor = rsphere
+        # same parameters, in the same order, as Basemap builds them
+        self.projparams = {"proj": "merc", "R": rsphere, "units": "m",
+                           "lat_ts": 0., "lon_0": 0.5*(llcrnrlon + urcrnrlon)}
+        llcrnry = pyproj.Proj(self.projparams)(llcrnrlon, llcrnrlat)[1]
+        # x is linear in longitude and already 0 at llcrnrlon
+        self.projparams["x_0"] = np.negative(0.)
+        self.projparams["y_0"] = np.negative(llcrnry)
+        self._proj4 = pyproj.Proj(self.projparams)
+        self.llcrnrx, self.llcrnry = 0., 0.
+        self.urcrnrx, self.urcrnry = (float(v) for v in
+                                      self(urcrnrlon, urcrnrlat))
+
+    def __call__(self, x, y, inverse=False):
+        """
+        Transform lon, lat in degrees to map x, y in m, or the reverse
+        input x, y: float or arrays of lon, lat (or x, y if inverse)
+        input inverse: bool map coordinates to lon, lat
+        Return x, y (or lon, lat)
+        """
+        x, y = np.asarray(x), np.asarray(y)
+        outx, outy = self._proj4(x, y, inverse=inverse)
+        # as Basemap, x is computed directly so it is exact at the corners
+        if inverse:
+            outx = _RAD2DG * (x / self.rmajor) + self.llcrnrlon
+        else:
+            outx = self.rmajor * _DG2RAD * (x - self.llcrnrlon)
+        return outx, outy
+
+    def makegrid(self, nx, ny, returnxy=False):
+        """
+        Regular grid in map coordinates, as Basemap.makegrid
+        input nx, ny: int number of points in x, y
+        input returnxy: bool also return map coordinates
+        Return lons, lats (, x, y) arrays of shape (ny, nx)
+        """
+        dx = (self.urcrnrx - self.llcrnrx) / (nx - 1)
+        dy = (self.urcrnry - self.llcrnry) / (ny - 1)
+        x = self.llcrnrx + dx * np.indices((ny, nx), np.float32)[1, :, :]
+        y = self.llcrnry + dy * np.indices((ny, nx), np.float32)[0, :, :]
+        lons, lats = self(x, y, inverse=True)
+        if returnxy:
+            return lons, lats, x, y
+        return lons, lats
+
+
+def _basemap_path(extent, resolution, cache_dir):
+    """
+    Return str path of pickled Basemap for extent and resolution
+    """
+    import mpl_toolkits.basemap as basemap
+    key = repr((tuple(float(v) for v in extent), resolution,
+                basemap.__version__))
+    digest = hashlib.sha256(key.encode()).hexdigest()[:16]
+    return os.path.join(cache_dir, f"basemap_{digest}.pickle")
+
+
+_basemaps = {}
+def get_basemap(resolution="h", ax=None, extent=None, cache_dir=CACHE_DIR):
+    """
+    Return merc Basemap for extent, unpickled from cache when possible
+    (building the boundary datasets is the slow part of Basemap)
+    input resolution: str Basemap boundary resolution "c", "l", "i", "h"
+    input ax: matplotlib axes to draw on, default=current axes
+    input extent: tuple (llcrnrlon, llcrnrlat, urcrnrlon, urcrnrlat),
+                  default=Oklahoma
+    input cache_dir: str directory of cache files
+    """
+    if extent is None:
+        extent = (llcrnrlon, llcrnrlat, urcrnrlon, urcrnrlat)
+    key = (tuple(extent), resolution, cache_dir)
+    m = _basemaps.get(key)
+    if m is None:
+        path = _basemap_path(extent, resolution, cache_dir)
+        if os.path.exists(path):
+            with open(path, "rb") as f:
+                m = pickle.load(f)
+        else:
+            from mpl_toolkits.basemap import Basemap
+            m = Basemap(projection="merc", llcrnrlon=extent[0],
+                        llcrnrlat=extent[1], urcrnrlon=extent[2],
+                        urcrnrlat=extent[3], resolution=resolution)
+            atomic_save(path, lambda f: pickle.dump(
+                m, f, protocol=pickle.HIGHEST_PROTOCOL))
+        _basemaps[key] = m
+    m.ax = ax
+    return m
+
+
+class OKGrid:
+    """
+    Grid, Oklahoma border, and outside-Oklahoma mask for one map and spacing
+    """
+    def __init__(self, m, shapefile, gridspace, cache_dir=CACHE_DIR):
+        """
+        input m: Basemap or MercTransform the grid and border are projected
+                 with
+        input shapefile: str path of states shapefile (no extension)
+        input gridspace: float grid spacing in degrees lat, lon
+        input cache_dir: str directory of .npz cache files
+        """
+        self.m = m
+        self.shapefile = shapefile
+        self.gridspace = gridspace
+        self.cache_dir = cache_dir
+        self.timings = {}
+        self._data = None
+
+    @property
+    def path(self):
+        """
+        Return str path of cache file for this map, spacing, and shapefile
+        """
+        shp = self.shapefile + ".shp"
+        stat = os.stat(shp) if os.path.exists(shp) else None
+        key = repr((_map_key(self.m), float(self.gridspace),
+                    os.path.basename(self.shapefile),
+                    None if stat is None else (stat.st_size, stat.st_mtime)))
+        digest = hashlib.sha256(key.encode()).hexdigest()[:16]
+        return os.path.join(self.cache_dir, f"okgrid_{digest}.npz")
+
+    def _compute(self):
+        """
+        Read shapefile, build grid and mask; Return dict of arrays
+        """
+        m = self.m
+        t0 = time.time()
+        if not hasattr(m, "readshapefile"):
+            # MercTransform: read border through the equivalent Basemap
+            m = get_basemap("c", extent=(m.llcrnrlon, m.llcrnrlat,
+                                         m.urcrnrlon, m.urcrnrlat),
+                            cache_dir=self.cache_dir)
+        m.readshapefile(self.shapefile, "states", drawbounds=False)
+        xy = None
+        for info, shape in zip(m.states_info, m.states):
+            if info["STATE_NAME"] == "Oklahoma":
+                xy = np.array(shape)
+                break
+        self.timings["shapefile"] = time.time() - t0
+
+        # dimensions of new meshgrid, in degrees and map coordinates
+        xnew = np.arange(m.llcrnrlon, m.urcrnrlon, self.gridspace)
+        ynew = np.arange(m.llcrnrlat, m.urcrnrlat, self.gridspace)
+        lon, lat, xplot, yplot = m.makegrid(len(xnew), len(ynew),
+                                            returnxy=True)
+
+        # Determine which points inside OK
+        tstart = time.time()
+        # use invert because this shapefile goes clockwise, mpath assumes ccw
+        xxyy = np.dstack((xplot, yplot)).reshape(-1, 2)
+        mask = np.invert(Path(xy).contains_points(xxyy)).reshape(xplot.shape)
+        self.timings["mask"] = time.time() - tstart
+        return {"border": xy, "xnew": xnew, "ynew": ynew,
+                "lon": lon, "lat": lat, "xplot": xplot, "yplot": yplot,
+                "mask": mask}
+
+    def _save(self, data):
+        """
+        Write data to cache; grids are stored as their 1-D axes where
+        separable (always for map coordinates, for lon/lat on cylindrical
+        projections like merc) and the mask as packed bits
+        """
+        lon, lat = data["lon"], data["lat"]
+        if np.array_equal(lon, np.broadcast_to(lon[:1, :], lon.shape)) and \
+                np.array_equal(lat, np.broadcast_to(lat[:, :1], lat.shape)):
+            lon, lat = lon[0, :], lat[:, 0]
+        atomic_save(self.path, lambda f: np.savez_compressed(
+            f, border=data["border"], xnew=data["xnew"], ynew=data["ynew"],
+            lon=lon, lat=lat, x=data["xplot"][0, :], y=data["yplot"][:, 0],
+            mask=np.packbits(data["mask"]),
+            shape=np.array(data["mask"].shape)))
+
+    def _load(self):
+        """
+        Load from cache, computing and caching on a miss
+        """
+        t0 = time.time()
+        path = self.path
+        if os.path.exists(path):
+            with np.load(path) as f:
+                shape = tuple(f["shape"])
+                lon, lat = f["lon"], f["lat"]
+                if lon.ndim == 1:
+                    lon, lat = np.meshgrid(lon, lat)
+                xplot, yplot = np.meshgrid(f["x"], f["y"])
+                mask = np.unpackbits(f["mask"], count=np.prod(shape)) \
+                    .reshape(shape).astype(bool)
+                self._data = {"border": f["border"], "xnew": f["xnew"],
+                              "ynew": f["ynew"], "lon": lon, "lat": lat,
+                              "xplot": xplot, "yplot": yplot, "mask": mask}
+            self.timings["cache load"] = time.time() - t0
+        else:
+            self._data = self._compute()
+            self._save(self._data)
+            self.timings["compute"] = time.time() - t0
+        return self._data
+
+    def __getattr__(self, name):
+        # grid arrays are loaded on first access
+        if name.startswith("_") or name in ("m", "shapefile", "gridspace",
+                                            "cache_dir", "timings"):
+            raise AttributeError(name)
+        data = self._data if self._data is not None else self._load()
+        try:
+            return data[name]
+        except KeyError:
+            raise AttributeError(name) from None
+
+    def report(self):
+        """
+        Return str of recorded timings
+        """
+        return ", ".join(f"{k}: {v:.3f} s" for k, v in self.timings.items())
+
+
+_grids = {}
+def get_ok_grid(m, shapefile, gridspace, cache_dir=CACHE_DIR):
+    """
+    Return OKGrid for map, shapefile, and spacing, shared within a process
+    input m: Basemap instance
+    input shapefile: str path of states shapefile (no extension)
+    input gridspace: float grid spacing in degrees lat, lon
+    input cache_dir: str directory of .npz cache files
+    """
+    key = (_map_key(m), shapefile, float(gridspace), cache_dir)
+    if key not in _grids:
+        _grids[key] = OKGrid(m, shapefile, gridspace, cache_dir)
+    return _grids[key]
+
+
+class MapContext:
+    """
+    Projection, grid, station projections, and Basemap for one
+    (extent, resolution, grid spacing), each built once
+    """
+    def __init__(self, shapefile, gridspace, resolution="h", extent=None,
+                 cache_dir=CACHE_DIR, maxstations=8):
+        """
+        input shapefile: str path of states shapefile (no extension)
+        input gridspace: float grid spacing in degrees lat, lon
+        input resolution: str Basemap boundary resolution for drawing
+        input extent: tuple (llcrnrlon, llcrnrlat, urcrnrlon, urcrnrlat),
+                      default=Oklahoma
+        input cache_dir: str directory of cache files
+        input maxstations: int station sets whose projections are kept
+        """
+        if extent is None:
+            extent = (llcrnrlon, llcrnrlat, urcrnrlon, urcrnrlat)
+        self.extent = tuple(extent)
+        self.resolution = resolution
+        self.cache_dir = cache_dir
+        self.maxstations = maxstations
+        self.proj = MercTransform(*self.extent)
+        self.grid = get_ok_grid(self.proj, shapefile, gridspace, cache_dir)
+        self._stations = OrderedDict()
+
+    def basemap(self, ax=None):
+        """
+        Return Basemap for drawing on ax, loaded from cache
+        """
+        return get_basemap(self.resolution, ax, self.extent, self.cache_dir)
+
+    def project(self, lons, lats):
+        """
+        Map coordinates of stations, reused while the station set is the
+        same
+        input lons, lats: arrays of station longitude, latitude
+        Return x, y arrays
+        """
+        lons = np.ascontiguousarray(lons, dtype=np.float64)
+        lats = np.ascontiguousarray(lats, dtype=np.float64)
+        key = hashlib.sha1(lons.tobytes() + lats.tobytes()).hexdigest()
+        if key in self._stations:
+            self._stations.move_to_end(key)
+        else:
+            self._stations[key] = self.proj(lons, lats)
+            if len(self._stations) > self.maxstations:
+                self._stations.popitem(last=False)
+        return self._stations[key]
+
+
+_contexts = {}
+def get_map_context(shapefile, gridspace, resolution="h", extent=None,
+                    cache_dir=CACHE_DIR):
+    """
+    Return MapContext for shapefile, spacing, resolution, and extent,
+    shared within a process
+    """
+    key = (shapefile, float(gridspace), resolution,
+           None if extent is None else tuple(extent), cache_dir)
+    if key not in _contexts:
+        _contexts[key] = MapContext(shapefile, gridspace, resolution, extent,
+                                    cache_dir)
+    return _contexts[key]
@@ -0,0 +1,280 @@
+'''
+Gridding components for Oklahoma Mesonet station data.
+
+StationIndex wraps a scipy cKDTree over station map coordinates. It assigns
+every Oklahoma border vertex the value of its nearest station in a single
+vectorized query (the perimeter extension the map scripts interpolate
+with), and exposes nearest and k-nearest lookups for other uses.
+
+GridInterpolator triangulates a station set once for a target grid,
+locates every grid point in its triangle once, and then interpolates any
+number of value vectors (variables, times, levels) onto it, with the same
+results as griddata. Cubic interpolation keeps the Bernstein monomials of
+each grid point in its triangle; a call estimates the vertex gradients,
+forms the Clough-Tocher coefficients per triangle, and evaluates the patches
+with one sparse product. get_interpolator() caches
+interpolators by station set and grid.
+
+Author: Brian R. Greene, University of Oklahoma
+Updated: 18 October 2026
+'''
+# Python Packages
+import hashlib
+from collections import OrderedDict
+
+# Installed packages
+import numpy as np
+from scipy import sparse
+from scipy.spatial import cKDTree, Delaunay
+from scipy.interpolate import CloughTocher2DInterpolator
+
+
+class StationIndex:
+    """
+    Spatial index of station locations in map coordinates
+    """
+    def __init__(self, x, y):
+        """
+        input x: array of station x in map coordinates
+        input y: array of station y in map coordinates
+        """
+        self.xy = np.column_stack((np.asarray(x, dtype=np.float64),
+                                   np.asarray(y, dtype=np.float64)))
+        self.tree = cKDTree(self.xy)
+
+    def __len__(self):
+        return len(self.xy)
+
+    def nearest(self, points):
+        """
+        Index of closest station to each point
+        input points: array (n, 2) of map coordinates
+        Return int array (n,)
+        """
+        return self.tree.query(np.asarray(points, dtype=np.float64), k=1)[1]
+
+    def knearest(self, points, k, max_dist=np.inf):
+        """
+        k closest stations to each point
+        input points: array (n, 2) of map coordinates
+        input k: int number of neighbors
+        input max_dist: float ignore stations farther than this; missing
+                        neighbors have distance inf and index len(self)
+        Return (distance array (n, k), int index array (n, k))
+        """
+        dist, idx = self.tree.query(np.asarray(points, dtype=np.float64),
+                                    k=k, distance_upper_bound=max_dist)
+        if k == 1:
+            dist, idx = dist[:, None], idx[:, None]
+        return dist, idx
+
+    def extend_to_border(self, values, border):
+        """
+        Append border vertices carrying the value of their nearest station
+        so interpolation reaches the state edge
+        input values: array (nstation,) or (nstation, nvar) of station data
+        input border: array (nborder, 2) of border vertices in map coords
+        Return (points array (nstation + nborder, 2),
+                values array (nstation + nborder, ...))
+        """
+        values = np.asarray(values)
+        iclose = self.nearest(border)
+        points = np.concatenate((self.xy, border))
+        return points, np.concatenate((values, values[iclose]))
+
+
+# Bernstein terms of the Clough-Tocher cubic: powers of the extended
+# barycentric coordinates (b1, b2, b3, b4) and their multinomial factors
+CT_TERMS = [(3, 0, 0, 0), (2, 1, 0, 0), (2, 0, 1, 0), (2, 0, 0, 1),
+            (1, 2, 0, 0), (1, 1, 0, 1), (1, 0, 2, 0), (1, 0, 1, 1),
+            (1, 0, 0, 2), (0, 3, 0, 0), (0, 2, 1, 0), (0, 2, 0, 1),
+            (0, 1, 2, 0), (0, 1, 1, 1), (0, 1, 0, 2), (0, 0, 3, 0),
+            (0, 0, 2, 1), (0, 0, 1, 2), (0, 0, 0, 3)]
+CT_MULTIPLIERS = np.array([6. / np.prod([np.prod(range(1, k + 1)) for k in t])
+                           for t in CT_TERMS])
+
+
+class GridInterpolator:
+    """
+    Station-to-grid interpolation with the Delaunay triangulation built, and
+    the grid points located in it, once
+    """
+    def __init__(self, points, xplot, yplot):
+        """
+        input points: array (npoint, 2) of station (and border) map coords
+        input xplot: 2-D array of grid x in map coordinates
+        input yplot: 2-D array of grid y in map coordinates
+        """
+        self.points = np.asarray(points, dtype=np.float64)
+        self.shape = np.shape(xplot)
+        self.xi = np.column_stack((np.ravel(xplot), np.ravel(yplot)))
+        self.tri = Delaunay(self.points)
+        self._weights = None
+        self._outside = None
+        self._location = None
+        self._cubic = None
+
+    def _locate(self):
+        """
+        Find the triangle of each grid point and its barycentric coordinates,
+        once for both methods
+        Return (int array of grid indices inside the hull, int array of their
+                simplices, array (ninside, 3) of barycentric coordinates)
+        """
+        if self._location is not None:
+            return self._location
+        simplex = self.tri.find_simplex(self.xi)
+        self._outside = simplex < 0
+        inside = np.nonzero(~self._outside)[0]
+        s = simplex[inside]
+        T = self.tri.transform[s]
+        b = np.einsum("nij,nj->ni", T[:, :2, :],
+                      self.xi[inside] - T[:, 2, :])
+        self._location = inside, s, np.column_stack((b, 1. - b.sum(axis=1)))
+        return self._location
+
+    def _linear_weights(self):
+        """
+        Sparse (ngrid, npoint) matrix of barycentric weights of each grid
+        point in its triangle; rows of points outside the hull are empty
+        """
+        inside, s, w = self._locate()
+        rows = np.repeat(inside, 3)
+        cols = self.tri.simplices[s].ravel()
+        self._weights = sparse.csr_matrix(
+            (w.ravel(), (rows, cols)), shape=(len(self.xi), len(self.points)))
+        return self._weights
+
+    def _cubic_geometry(self):
+        """
+        Parts of the Clough-Tocher patches that depend only on the
+        triangulation (as scipy's _clough_tocher_2d_single): edge vectors
+        and affine invariant cross-edge directions g of every triangle, and
+        a sparse (ngrid, ntriangle*19) matrix of the cubic Bernstein
+        monomials of each grid point's extended barycentric coordinates
+        """
+        inside, s, c = self._locate()
+        tri = self.tri
+        p = tri.points[tri.simplices]
+        ntri = len(p)
+        # e12, e23, e31
+        edges = np.stack((p[:, 1] - p[:, 0], p[:, 2] - p[:, 1],
+                          p[:, 0] - p[:, 2]), axis=1)
+        # centroid of each neighbor in barycentric coordinates of the triangle
+        g = np.full((ntri, 3), -0.5)
+        for k in range(3):
+            nb = tri.neighbors[:, k]
+            has = nb >= 0
+            y = p[nb[has]].mean(axis=1)
+            T = tri.transform[has]
+            b = np.einsum("nij,nj->ni", T[:, :2, :], y - T[:, 2, :])
+            cn = np.column_stack((b, 1. - b.sum(axis=1)))
+            i, j = (k + 2) % 3, (k + 1) % 3
+            g[has, k] = (2*cn[:, i] + cn[:, j] - 1) / \
+                (2 - 3*cn[:, i] - 3*cn[:, j])
+        # extended barycentric coordinates: one of the four is zero
+        minval = c.min(axis=1, keepdims=True)
+        b = np.column_stack((c - minval, 3*minval))
+        powers = np.array(CT_TERMS)
+        M = np.prod(b[:, None, :] ** powers[None], axis=2) * CT_MULTIPLIERS
+        nterm = len(CT_TERMS)
+        monomials = sparse.csr_matrix(
+            (M.ravel(), (np.repeat(inside, nterm),
+                         (s[:, None] * nterm + np.arange(nterm)).ravel())),
+            shape=(len(self.xi), ntri * nterm))
+        self._cubic = edges, g, monomials
+        return self._cubic
+
+    def _clough_tocher(self, values):
+        """
+        Evaluate Clough-Tocher patches at the grid points
+        input values: array (npoint, nvar)
+        Return array (ngrid, nvar), zero outside the hull
+        """
+        edges, g, monomials = self._cubic if self._cubic is not None \
+            else self._cubic_geometry()
+        verts = self.tri.simplices
+        # vertex gradients depend on the values; no point location here
+        grad = CloughTocher2DInterpolator(self.tri, values).grad
+        f = values[verts]  # (ntri, 3, nvar)
+        df = grad[verts]   # (ntri, 3, nvar, 2)
+
+        def d(vertex, edge, sign):
+            # derivative at vertex along edge
+            return sign * np.einsum("nvk,nk->nv", df[:, vertex],
+                                    edges[:, edge])
+        c = {}
+        c[3, 0, 0, 0], c[0, 3, 0, 0], c[0, 0, 3, 0] = f[:, 0], f[:, 1], f[:, 2]
+        c[2, 1, 0, 0] = (d(0, 0, 1) + 3*c[3, 0, 0, 0])/3
+        c[2, 0, 1, 0] = (d(0, 2, -1) + 3*c[3, 0, 0, 0])/3
+        c[1, 2, 0, 0] = (d(1, 0, -1) + 3*c[0, 3, 0, 0])/3
+        c[0, 2, 1, 0] = (d(1, 1, 1) + 3*c[0, 3, 0, 0])/3
+        c[1, 0, 2, 0] = (d(2, 2, 1) + 3*c[0, 0, 3, 0])/3
+        c[0, 1, 2, 0] = (d(2, 1, -1) + 3*c[0, 0, 3, 0])/3
+        c[2, 0, 0, 1] = (c[2, 1, 0, 0] + c[2, 0, 1, 0] + c[3, 0, 0, 0])/3
+        c[0, 2, 0, 1] = (c[1, 2, 0, 0] + c[0, 3, 0, 0] + c[0, 2, 1, 0])/3
+        c[0, 0, 2, 1] = (c[1, 0, 2, 0] + c[0, 1, 2, 0] + c[0, 0, 3, 0])/3
+        g0, g1, g2 = g[:, 0:1], g[:, 1:2], g[:, 2:3]
+        c[0, 1, 1, 1] = (g0*(-c[0, 3, 0, 0] + 3*c[0, 2, 1, 0]
+                             - 3*c[0, 1, 2, 0] + c[0, 0, 3, 0])
+                         + (-c[0, 3, 0, 0] + 2*c[0, 2, 1, 0] - c[0, 1, 2, 0]
+                            + c[0, 0, 2, 1] + c[0, 2, 0, 1]))/2
+        c[1, 0, 1, 1] = (g1*(-c[0, 0, 3, 0] + 3*c[1, 0, 2, 0]
+                             - 3*c[2, 0, 1, 0] + c[3, 0, 0, 0])
+                         + (-c[0, 0, 3, 0] + 2*c[1, 0, 2, 0] - c[2, 0, 1, 0]
+                            + c[2, 0, 0, 1] + c[0, 0, 2, 1]))/2
+        c[1, 1, 0, 1] = (g2*(-c[3, 0, 0, 0] + 3*c[2, 1, 0, 0]
+                             - 3*c[1, 2, 0, 0] + c[0, 3, 0, 0])
+                         + (-c[3, 0, 0, 0] + 2*c[2, 1, 0, 0] - c[1, 2, 0, 0]
+                            + c[2, 0, 0, 1] + c[0, 2, 0, 1]))/2
+        c[1, 0, 0, 2] = (c[1, 1, 0, 1] + c[1, 0, 1, 1] + c[2, 0, 0, 1])/3
+        c[0, 1, 0, 2] = (c[1, 1, 0, 1] + c[0, 1, 1, 1] + c[0, 2, 0, 1])/3
+        c[0, 0, 1, 2] = (c[1, 0, 1, 1] + c[0, 1, 1, 1] + c[0, 0, 2, 1])/3
+        c[0, 0, 0, 3] = (c[1, 0, 0, 2] + c[0, 1, 0, 2] + c[0, 0, 1, 2])/3
+        C = np.stack([c[t] for t in CT_TERMS], axis=1)  # (ntri, 19, nvar)
+        return monomials @ C.reshape(-1, values.shape[1])
+
+    def __call__(self, values, method="cubic"):
+        """
+        Interpolate values onto the grid, nan outside the station hull
+        input values: array (npoint,) or (npoint, nvar); several variables
+                      or times are interpolated in one pass
+        input method: str "cubic" (Clough-Tocher, as griddata) or "linear"
+        Return array of grid shape, with trailing nvar axis if given
+        """
+        values = np.asarray(values, dtype=np.float64)
+        if method == "linear":
+            W = self._weights if self._weights is not None \
+                else self._linear_weights()
+            out = W @ values
+            out[self._outside] = np.nan
+        elif method == "cubic":
+            out = self._clough_tocher(values.reshape(len(values), -1))
+            out[self._outside] = np.nan
+        else:
+            raise ValueError(f"Unknown method {method}")
+        return out.reshape(self.shape + values.shape[1:])
+
+
+_interpolators = OrderedDict()
+def get_interpolator(points, xplot, yplot, maxsize=8):
+    """
+    Return GridInterpolator for station points and grid, reusing the one
+    built for the same station set and grid if cached
+    input points: array (npoint, 2) of map coordinates
+    input xplot, yplot: 2-D arrays of grid map coordinates
+    input maxsize: int interpolators kept, least recently used dropped
+    """
+    h = hashlib.sha1()
+    for a in (points, xplot, yplot):
+        a = np.ascontiguousarray(a, dtype=np.float64)
+        h.update(repr(a.shape).encode())
+        h.update(a.tobytes())
+    key = h.hexdigest()
+    if key in _interpolators:
+        _interpolators.move_to_end(key)
+    else:
+        _interpolators[key] = GridInterpolator(points, xplot, yplot)
+        if len(_interpolators) > maxsize:
+            _interpolators.popitem(last=False)
+    return _interpolators[key]
@@ -1,17 +1,15 @@
 import numpy as np
 import matplotlib.pyplot as plt
 import cmocean
-from mpl_toolkits.basemap import Basemap
-import netCDF4
-from scipy import interpolate
-from matplotlib.patches import Polygon
-from matplotlib.collections import PatchCollection
 import matplotlib.patheffects as PathEffects
-from matplotlib.path import Path
-import urllib2
 import warnings
 import numpy.ma as ma
 import time
+from ok_grid import get_map_context
+from map_background import add_static_layer
+from ok_gridding import get_interpolator
+from mesonet_current import valid
+from mesonet_poll import latest_snapshot
 
 warnings.filterwarnings("ignore",".*invalid value encountered in less.*")
 
@@ -20,32 +18,24 @@ llcrnrlat = 33.5
 urcrnrlat = 37.2
 llcrnrlon = -103.2
 urcrnrlon = -94.0
+# reuse counties and states rasterized once per map layout and dpi instead
+# of drawing them; faster, but antialiased edge pixels may differ from the
+# vector drawing by up to about 10/255 per channel
+raster_overlays = False
 
 # Initialize map
-print 'Initializing map'
+print('Initializing map')
 fig_map, ax_map = plt.subplots(1, figsize=(12, 6.75))
-m = Basemap(projection='merc', llcrnrlat=llcrnrlat, urcrnrlat=urcrnrlat, 
-    llcrnrlon=llcrnrlon, urcrnrlon=urcrnrlon, resolution='l', ax=ax_map)
 
-# Draw patches over not Oklahoma
-print 'Reading shapefile'
-m.readshapefile('/Users/briangreene/Nextcloud/thermo/documentation/States/states_21basic/states',
- 'states', drawbounds = False)
-patch = []
-patch_ok = []
-for info, shape in zip(m.states_info, m.states):
-	if info['STATE_NAME'] != 'Oklahoma':
-		patch.append( Polygon(np.array(shape), True) )
-	else:
-		patch_ok.append( Polygon(np.array(shape), True))
-
-xy = patch_ok[0].get_xy()
-
-
-print 'Creating meshgrid for map'
-xnew = np.arange(llcrnrlon, urcrnrlon, 0.1)
-ynew = np.arange(llcrnrlat, urcrnrlat, 0.1)
-xx, yy = np.meshgrid(xnew, ynew)
+# Projection, Oklahoma border, grid, and mask, cached per extent, resolution,
+# and grid spacing; the Basemap is unpickled instead of rebuilt
+shapefile = '/Users/briangreene/Nextcloud/thermo/documentation/States/states_21basic/states'
+ctx = get_map_context(shapefile, 0.1, resolution='l',
+	extent=(llcrnrlon, llcrnrlat, urcrnrlon, urcrnrlat))
+m = ctx.basemap(ax_map)
+grid = ctx.grid
+xy = grid.border
+xnew, ynew = grid.xnew, grid.ynew
 
 
 
@@ -69,60 +59,33 @@ xx, yy = np.meshgrid(xnew, ynew)
 # 	linewidths=1., zorder=2))
 
 # Grab current Mesonet data
-print 'Grabbing mesonet data'
-URL = 'http://www.mesonet.org/data/public/mesonet/current/current.csv.txt'
-fd = urllib2.urlopen(URL)
-data_long = fd.read()
-data = data_long.split('\n')
-lat_, lon_, yr_, mo_, da_, hr_, mi_, T_, Td_, Tchill_, wind_, dir_, Temps, \
-	Dewpoint, Chill, Wind, Dir, lats, lons = ([] for i in range(19))
-for i in np.arange(1, len(data)-1):
-	data_short = data[i].split(',')
-	lat_.append(float(data_short[3]))
-	lon_.append(float(data_short[4]))
-	yr_.append(float(data_short[5]))
-	mo_.append(float(data_short[6]))
-	da_.append(float(data_short[7]))
-	hr_.append(float(data_short[8]))
-	mi_.append(float(data_short[9]))
-	T_.append(data_short[10])
-	Td_.append(data_short[11])
-	Tchill_.append(data_short[13])
-	wind_.append(data_short[16])
-	dir_.append(data_short[15])
-
-for i in np.arange(len(T_)):
-	if T_[i] != ' ':
-		Temps.append(float(T_[i]))
-		Dewpoint.append(float(Td_[i]))
-		#Chill.append(float(Tchill_[i]))
-		#Wind.append(float(wind_[i]))
-		#Dir.append(dir_[i]) 
-		lats.append(lat_[i])
-		lons.append(lon_[i])   
+print('Grabbing mesonet data')
+stations = valid(latest_snapshot(), 'TDEW')
+Temps = stations.TAIR
+Dewpoint = stations.TDEW
+lats = stations.LAT
+lons = stations.LON
+yr_, mo_, da_, hr_, mi_ = (stations[c]
+	for c in ('YR', 'MO', 'DA', 'HR', 'MI'))
 
 # transpose to basemap coordinates
-print 'transposing to basemap coords'
-lon, lat, xplot, yplot = m.makegrid(len(xnew), len(ynew), returnxy=True)
-x1, y1 = m(lons, lats)
+print('transposing to basemap coords')
+xplot, yplot = grid.xplot, grid.yplot
+x1, y1 = ctx.project(lons, lats)
 
 # xxyy = np.dstack((xplot, yplot))
 # xxyy = xxyy.reshape(-1, 2)
 # xxplot, yyplot = np.meshgrid(xxyy[:,0], xxyy[:,1])
 
-points = np.array(zip(x1, y1))
+points = np.array(list(zip(x1, y1)))
 
 t0 = time.time()
-Tnew = interpolate.griddata(points, Dewpoint, (xplot, yplot), method='cubic')
-print "Interpolate time: %s seconds" % (time.time() - t0)
-# Create mask
-mpath = Path(xy)
-xxyyplot = np.dstack((xplot, yplot))
-xxyyplot_flat = xxyyplot.reshape(-1, 2)
+Tnew = get_interpolator(points, xplot, yplot)(Dewpoint, method='cubic')
+print("Interpolate time: %s seconds" % (time.time() - t0))
+# Create mask (computed once, then loaded from cache)
 tstart = time.time()
-mask_flat = np.invert(mpath.contains_points(xxyyplot_flat))
-mask = mask_flat.reshape(xplot.shape)
-print "Mask time: %s seconds" % (time.time() - tstart)
+mask = grid.mask
+print("Mask time: %s seconds (%s)" % (time.time() - tstart, grid.report()))
 
 Tplot = ma.masked_where(mask, Tnew)
 
@@ -135,8 +98,14 @@ for i in np.arange(len(Temps)):
 		ha='center', va='center')
 	txt.set_path_effects([PathEffects.withStroke(linewidth=3, foreground='w')])
 
-m.drawcounties()
-m.drawstates()
+if raster_overlays:
+	add_static_layer(ax_map,
+		lambda ax: (m.drawcounties(ax=ax), m.drawstates(ax=ax)),
+		('ok_counties_states', m.resolution, m.llcrnrlon, m.llcrnrlat,
+		m.urcrnrlon, m.urcrnrlat))
+else:
+	m.drawcounties()
+	m.drawstates()
 
 title_str = 'Oklahoma Mesonet 2m Td - %d%d%d - %d:%d CST' % (yr_[0], mo_[0], 
 	da_[0], hr_[0], mi_[0])
@@ -1,3 +1,4 @@
+import cartopy
 import cartopy.crs as ccrs
 import cartopy.feature as cfeature
 import matplotlib.pyplot as plt
@@ -5,57 +6,148 @@ import numpy as np
 import netCDF4
 import cmocean
 import os
+import time
+import pickle
+import hashlib
+import multiprocessing
 from datetime import datetime
 from argparse import ArgumentParser
-
-# Input arguments
-parser = ArgumentParser()
-parser.add_argument('-i', required=True, action='store', dest='files',
-                    nargs='*', help='Input file paths')
-parser.add_argument('-s', required=True, action='store', dest='save',
-                    nargs=1, help='Figure save directory')
-args = parser.parse_args()
-
-dates = [datetime.strptime(''.join(d.split('_')[2:4]),
-                           '%Y%m%d%H%M') for d in args.files]
-idx = np.argsort(dates)
-
-figpath = args.save[0]
-if not os.path.exists(figpath):
-    os.mkdir(figpath)
+from concurrent.futures import ProcessPoolExecutor
+from gfs_fields import FIELDS
+from gfs_store import GFSStore
+from frame_stream import fig_to_rgb, get_writer, stream_frames
+from map_background import add_static_layer
 
 # define projection and setup some graphing routines
 crs = ccrs.Orthographic(central_longitude=0., central_latitude=90.)
+FIGSIZE = (20, 13)
+# background features and line widths
+BACKGROUND = [(cfeature.COASTLINE.with_scale('50m'), 0.5),
+              (cfeature.STATES, 0.5),
+              (cfeature.BORDERS, 0.5)]
+CACHE_DIR = os.path.join(os.path.expanduser('~'), '.cache', 'Wx', 'gfs_nh')
 def plot_background(ax):
-    ax.add_feature(cfeature.COASTLINE.with_scale('50m'), linewidth=0.5)
-    ax.add_feature(cfeature.STATES, linewidth=0.5)
-    ax.add_feature(cfeature.BORDERS, linewidth=0.5)
-plt.close('all')
+    for feature, lw in BACKGROUND:
+        ax.add_feature(feature, linewidth=lw)
+
+def background_key():
+    '''
+    Return str hash of projection, figure size, and background features
+    '''
+    key = hashlib.sha256(repr((cartopy.__version__, crs.proj4_init, FIGSIZE,
+                               [(f.category, f.name, lw)
+                                for f, lw in BACKGROUND])).encode())
+    return key.hexdigest()[:16]
+
+def project_background(cache_dir=CACHE_DIR):
+    '''
+    Project background feature geometries into the map projection once and
+    cache them to disk, so later runs skip the shapefile read and projection
+    input cache_dir: str directory of cache files
+    Return list of (list of projected shapely geometries, style kwargs)
+    '''
+    path = os.path.join(cache_dir, f'background_{background_key()}.pkl')
+    if os.path.exists(path):
+        with open(path, 'rb') as f:
+            return pickle.load(f)
+    # features pick their scale and geometries from the axes extent, so
+    # select them on axes laid out like the real figure
+    fig, ax = plt.subplots(nrows=1, ncols=2, figsize=FIGSIZE,
+                           subplot_kw={'projection': crs})
+    layers = []
+    for feature, lw in BACKGROUND:
+        extent = ax[0].get_extent(feature.crs)
+        geoms = [crs.project_geometry(g, feature.crs)
+                 for g in feature.intersecting_geometries(extent)]
+        layers.append(([g for g in geoms if not g.is_empty],
+                       dict(feature.kwargs, linewidth=lw)))
+    plt.close(fig)
+    os.makedirs(cache_dir, exist_ok=True)
+    with open(path + '.tmp', 'wb') as f:
+        pickle.dump(layers, f, protocol=pickle.HIGHEST_PROTOCOL)
+    os.replace(path + '.tmp', path)
+    return layers
+
+def plot_projected_background(ax, layers):
+    '''
+    Add background layers from project_background; geometries already in
+    the map projection are drawn without being projected again
+    '''
+    for geoms, kwargs in layers:
+        ax.add_geometries(geoms, crs, **kwargs)
 
-# loop through selected files
-for f in np.asarray(args.files)[idx]:
+def read_file(f):
+    '''
+    Read northern hemisphere fields from one converted analysis file
+    Return (datetime valid, lon, lat, u300, v300, z300, psfc, Tsfc)
+    '''
     # grab valid time from file name
     fname = f.split(os.sep)[-1]
     d_valid = ''.join(fname.split('_')[2:4])
     dt_valid = datetime.strptime(d_valid, '%Y%m%d%H%M')
 
-    # load gfs data - northern hemisphere
+    # load gfs data - northern hemisphere only, as one contiguous slice
     print(f'Reading file {fname}')
     df = netCDF4.Dataset(f, 'r')
     lon = df.variables['lon_0'][:]
     iN = np.where(df.variables['lat_0'][:] >= 0)[0]
+    iN = slice(iN[0], iN[-1] + 1)
     lat = df.variables['lat_0'][iN]
 
-    i300 = np.where(df.variables['lv_ISBL0'][:] == 30000.)[0][0]
-
-    u300 = df.variables['UGRD_P0_L100_GLL0'][i300, iN, :]
-    v300 = df.variables['VGRD_P0_L100_GLL0'][i300, iN, :]
-    z300 = df.variables['HGT_P0_L100_GLL0'][i300, iN, :]
-    psfc = df.variables['PRMSL_P0_L101_GLL0'][iN, :] / 100.
+    # variables named in gfs_fields; files subset by get_gfs.py hold only
+    # the 300 mb level, so there may be no level dimension
+    var = {fld['grib']: df.variables[fld['nc']] for fld in FIELDS}
+    upper = (var['UGRD'], var['VGRD'], var['HGT'])
+    if var['UGRD'].ndim == 3:
+        i300 = np.where(df.variables['lv_ISBL0'][:] == 30000.)[0][0]
+        u300, v300, z300 = [a[i300, iN, :] for a in upper]
+    else:
+        u300, v300, z300 = [a[iN, :] for a in upper]
+    psfc = var['PRMSL'][iN, :] / 100.
     # PRES_P0_L1_GLL0
     # PRMSL_P0_L101_GLL0
     # MSLET_P0_L101_GLL0
-    Tsfc = df.variables['TMP_P0_L1_GLL0'][iN, :] - 273.15
+    Tsfc = var['TMP'][iN, :] - 273.15
+    df.close()
+    return dt_valid, lon, lat, u300, v300, z300, psfc, Tsfc
+
+def read_store(store, t):
+    '''
+    Read northern hemisphere slabs for time t from a GFSStore
+    Return (datetime valid, lon, lat, u300, v300, z300, psfc, Tsfc)
+    '''
+    print(f'Reading {str(t)} from {store.path}')
+    nh = {'time_range': (t, t), 'lat_range': (0., 90.)}
+    u300 = store.select('UGRD', '300 mb', **nh)[0]
+    v300 = store.select('VGRD', '300 mb', **nh)[0].values
+    z300 = store.select('HGT', '300 mb', **nh)[0].values
+    psfc = store.select('PRMSL', 'mean sea level', **nh)[0].values / 100.
+    Tsfc = store.select('TMP', 'surface', **nh)[0].values - 273.15
+    return t.astype(datetime), u300.lon.values, u300.lat.values, \
+        u300.values, v300, z300, psfc, Tsfc
+
+def read_frame(source):
+    '''
+    Read one valid time from source ('file', path) or ('store', path, time)
+    '''
+    if source[0] == 'file':
+        return read_file(source[1])
+    return read_store(GFSStore(source[1]), source[2])
+
+def draw_frame(frame, layers=None, raster=False):
+    '''
+    Draw both panels for one valid time
+    input frame: tuple from read_frame
+    input layers: background from project_background, default=add cartopy
+                  features directly
+    input raster: bool composite the background from pixels rasterized once
+                  per layout and dpi (map_background) instead of drawing its
+                  vectors on every frame. Faster, but antialiased edge pixels
+                  of the background may differ from the vector drawing by up
+                  to about 10/255 per channel
+    Return (matplotlib figure, datetime valid)
+    '''
+    dt_valid, lon, lat, u300, v300, z300, psfc, Tsfc = frame
 
     # calculate speed from u and v
     spd300 = np.sqrt(u300**2. + v300**2.)
@@ -64,10 +156,20 @@ for f in np.asarray(args.files)[idx]:
     lon_2d, lat_2d = np.meshgrid(lon, lat)
 
     # plot
-    fig1, ax1 = plt.subplots(nrows=1, ncols=2, figsize=(20, 13),
+    fig1, ax1 = plt.subplots(nrows=1, ncols=2, figsize=FIGSIZE,
                              subplot_kw={'projection': crs})
+    if layers is None:
+        draw = plot_background
+    else:
+        def draw(ax):
+            plot_projected_background(ax, layers)
     for a in ax1:
-        plot_background(a)
+        if raster:
+            # cartopy features are drawn at zorder 1.5
+            add_static_layer(a, draw, ('gfs_nh', background_key(),
+                                       layers is not None), zorder=1.5)
+        else:
+            draw(a)
 
     # 300 mb heights and winds
     vmin1 = 0.
@@ -101,10 +203,145 @@ for f in np.asarray(args.files)[idx]:
         cf2, ax=ax1[1], orientation='horizontal', shrink=0.74, pad=0)
     cb2.set_label('deg C', size='x-large')
 
-    plt.suptitle(f'GFS Analysis Valid {dt_valid.strftime("%d-%B-%Y %H UTC")}')
+    fig1.suptitle(f'GFS Analysis Valid {dt_valid.strftime("%d-%B-%Y %H UTC")}')
+    return fig1, dt_valid
 
+def save_frame(fig1, dt_valid, figpath):
+    '''
+    Save figure from draw_frame into figpath and close it
+    '''
     fig1.savefig(f'{figpath}v1_{dt_valid.strftime("%Y%m%d_%H%M")}_GFS.png',
                  format='png', dpi=150)
+    plt.close(fig1)
 
-    df.close()
+# parallel rendering: each worker receives the projected background once
+_layers = None
+_dpi = 150
+_raster = False
+def _init_worker(layers, dpi=150, raster=False):
+    global _layers, _dpi, _raster
+    plt.switch_backend('Agg')
+    _layers = layers
+    _dpi = dpi
+    _raster = raster
+
+def _render(source, figpath):
+    t0 = time.time()
+    fig1, dt_valid = draw_frame(read_frame(source), _layers, _raster)
+    save_frame(fig1, dt_valid, figpath)
+    return dt_valid, time.time() - t0
+
+def _render_rgb(source):
+    fig1, _ = draw_frame(read_frame(source), _layers, _raster)
+    frame = fig_to_rgb(fig1, _dpi)
     plt.close(fig1)
+    return frame
+
+def animate_all(sources, path, fps=4., nproc=1, dpi=150, layers=None,
+                raster=False):
+    '''
+    Render frames and stream them in time order into an animation, without
+    writing PNGs
+    input sources: list of sources for read_frame
+    input path: str output path (.mp4, .gif, .webp, ...)
+    input fps: float frames per second
+    input nproc: int number of worker processes
+    input dpi: float dots per inch of frames
+    input layers: background from project_background, default=load/build it
+    input raster: bool composite a rasterized background (see draw_frame)
+    '''
+    if layers is None:
+        layers = project_background()
+    t0 = time.time()
+    n = stream_frames(_render_rgb, sources, get_writer(path, fps), nproc,
+                      initializer=_init_worker,
+                      initargs=(layers, dpi, raster))
+    print(f'Wrote {n} frames to {path} at {n/(time.time()-t0):.2f} frames/s')
+
+def render_all(sources, figpath, nproc=None, layers=None, raster=False):
+    '''
+    Render and save frames for sources in parallel worker processes
+    input sources: list of sources for read_frame
+    input figpath: str figure save directory
+    input nproc: int number of worker processes, default=cpu count
+    input layers: background from project_background, default=load/build it
+    input raster: bool composite a rasterized background (see draw_frame)
+    Return float frames per second
+    '''
+    if layers is None:
+        layers = project_background()
+    t0 = time.time()
+    ctx = multiprocessing.get_context('spawn')
+    with ProcessPoolExecutor(max_workers=nproc, mp_context=ctx,
+                             initializer=_init_worker,
+                             initargs=(layers, 150, raster)) as pool:
+        futures = [pool.submit(_render, src, figpath) for src in sources]
+        for fut in futures:
+            dt_valid, dt = fut.result()
+            print(f'Saved {dt_valid.strftime("%Y%m%d_%H%M")} in {dt:.1f} s')
+    fps = len(sources) / (time.time() - t0)
+    print(f'Rendered {len(sources)} frames at {fps:.2f} frames/s')
+    return fps
+
+def main():
+    # Input arguments
+    parser = ArgumentParser()
+    parser.add_argument('-i', action='store', dest='files', nargs='*',
+                        default=[], help='Input file paths')
+    parser.add_argument('-c', action='store', dest='store', type=str,
+                        help='Consolidated store from gfs_store.py to plot '
+                             'instead of input files')
+    parser.add_argument('-s', action='store', dest='save', nargs=1,
+                        help='Figure save directory')
+    parser.add_argument('-n', action='store', dest='nproc', type=int,
+                        default=1, help='Number of worker processes; more '
+                        'than 1 renders in parallel with a cached background')
+    parser.add_argument('-a', action='store', dest='anim', type=str,
+                        help='Stream frames into this animation (.mp4, .gif, '
+                             '.webp) instead of saving PNGs')
+    parser.add_argument('--fps', action='store', dest='fps', type=float,
+                        default=4., help='Animation frames per second')
+    parser.add_argument('--dpi', action='store', dest='dpi', type=float,
+                        default=150., help='Animation dots per inch')
+    parser.add_argument('--raster', action='store_true', dest='raster',
+                        help='Reuse a background rasterized once instead of '
+                             'drawing it every frame (faster; edge pixels '
+                             'may differ by up to ~10/255)')
+    args = parser.parse_args()
+
+    if args.store is None and len(args.files) == 0:
+        parser.error('one of -i or -c is required')
+    if args.save is None and args.anim is None:
+        parser.error('one of -s or -a is required')
+
+    plt.close('all')
+
+    # sources for each valid time, in time order
+    if args.store is not None:
+        sources = [('store', args.store, t)
+                   for t in GFSStore(args.store).times()]
+    else:
+        dates = [datetime.strptime(
+            ''.join(d.split(os.sep)[-1].split('_')[2:4]), '%Y%m%d%H%M')
+            for d in args.files]
+        idx = np.argsort(dates)
+        sources = [('file', f) for f in np.asarray(args.files)[idx]]
+
+    if args.anim is not None:
+        animate_all(sources, args.anim, args.fps, args.nproc, args.dpi,
+                    raster=args.raster)
+        return
+    figpath = args.save[0]
+    if not os.path.exists(figpath):
+        os.mkdir(figpath)
+    if args.nproc > 1:
+        render_all(sources, figpath, args.nproc, raster=args.raster)
+        return
+    # loop through valid times
+    for src in sources:
+        fig1, dt_valid = draw_frame(read_frame(src), raster=args.raster)
+        save_frame(fig1, dt_valid, figpath)
+
+# worker processes import this module, so only run as a script
+if __name__ == '__main__':
+    main()
@@ -5,11 +5,12 @@ import numpy as np
 import matplotlib.pyplot as plt
 import matplotlib.patheffects as PathEffects
 import cmocean
-from mpl_toolkits.basemap import Basemap
+from ok_grid import get_basemap
+from map_background import add_static_layer
 import netCDF4
 import warnings
 import numpy.ma as ma
-print 'Import time: %f seconds' % (time.time() - t0)
+print('Import time: %f seconds' % (time.time() - t0))
 
 '''
 Created 27 December 2017
@@ -22,6 +23,10 @@ Select level in user parameters
 ###################
 
 plotlevel = 0 # lowest = 0
+# reuse counties and states rasterized once per map layout and dpi instead
+# of drawing them; faster, but antialiased edge pixels may differ from the
+# vector drawing by up to about 10/255 per channel
+raster_overlays = False
 
 ###############
 # Import data #
@@ -55,9 +60,9 @@ urcrnrlon = df.urlon
 # Figure properties
 t1 = time.time()
 fig_map, ax_map = plt.subplots(1, figsize=(12, 6.75))
-m = Basemap(projection='merc', llcrnrlat=llcrnrlat, urcrnrlat=urcrnrlat, 
-    llcrnrlon=llcrnrlon, urcrnrlon=urcrnrlon, resolution='i', ax=ax_map)
-print 'Time creating basemap: %s seconds' % (time.time() - t1)
+# unpickled from cache after the first run
+m = get_basemap('i', ax_map, (llcrnrlon, llcrnrlat, urcrnrlon, urcrnrlat))
+print('Time creating basemap: %s seconds' % (time.time() - t1))
 # Meshgrid for plotting
 a, b, xplot, yplot = m.makegrid(len(lon), len(lat), returnxy=True)
 x1, y1 = m(station_lons, station_lats)
@@ -103,9 +108,15 @@ title_str = 'Oklahoma Mesonet Dewpoint Temerature - %s CST' % (dtValid_str)
 ax_map.set_title(title_str)
 cbar.ax.set_ylabel('Dewpoint Temperature ($^\circ$F)')
 
-m.drawcounties()
-m.drawstates()
-print 'Total run time: %s seconds' % (time.time() - t0)
+if raster_overlays:
+	add_static_layer(ax_map,
+		lambda ax: (m.drawcounties(ax=ax), m.drawstates(ax=ax)),
+		('ok_counties_states', m.resolution, m.llcrnrlon, m.llcrnrlat,
+		m.urcrnrlon, m.urcrnrlat))
+else:
+	m.drawcounties()
+	m.drawstates()
+print('Total run time: %s seconds' % (time.time() - t0))
 #plt.show()
 
 
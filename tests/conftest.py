@@ -0,0 +1,114 @@
+'''
+Shared fixtures: a local HTTP stand-in for mesonet.org and NCEI, and a
+requests session that sends requests for any host to it.
+'''
+import os
+import sys
+import hashlib
+import threading
+from email.utils import formatdate
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import urlsplit
+import pytest
+import requests
+
+os.environ.setdefault('MPLBACKEND', 'Agg')
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), os.pardir))
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), os.pardir,
+                                'benchmarks'))
+
+
+class StandIn(ThreadingHTTPServer):
+    '''
+    Serves the bytes in self.files by url path. Sends ETag/Last-Modified
+    and answers If-None-Match with 304 unless etag is False, and answers
+    Range requests with 206/416 unless ranges is False. Every request is
+    recorded in self.log as (path, request headers, response status).
+    '''
+    daemon_threads = True
+
+    def __init__(self):
+        super().__init__(('127.0.0.1', 0), Handler)
+        self.files = {}
+        self.etag = True
+        self.ranges = True
+        self.fail = {}  # path -> list of status codes to send first
+        self.log = []
+
+    @property
+    def url(self):
+        return f'http://127.0.0.1:{self.server_address[1]}'
+
+
+class Handler(BaseHTTPRequestHandler):
+    def log_message(self, *args):
+        pass
+
+    def _send(self, status, body=b'', headers=()):
+        self.server.log.append((self.path, dict(self.headers), status))
+        self.send_response(status)
+        for k, v in headers:
+            self.send_header(k, v)
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        if self.command != 'HEAD':
+            self.wfile.write(body)
+
+    def do_GET(self):
+        srv = self.server
+        path = urlsplit(self.path).path
+        if srv.fail.get(path):
+            return self._send(srv.fail[path].pop(0))
+        body = srv.files.get(path)
+        if body is None:
+            return self._send(404)
+        headers = [('Last-Modified', formatdate(0, usegmt=True))]
+        if srv.etag:
+            etag = '"' + hashlib.sha256(body).hexdigest()[:16] + '"'
+            headers.append(('ETag', etag))
+            if self.headers.get('If-None-Match') == etag:
+                return self._send(304, headers=headers)
+        rng = self.headers.get('Range')
+        if srv.ranges and rng is not None:
+            start, end = rng.split('=')[1].split('-')
+            start = int(start)
+            end = len(body) - 1 if end == '' else min(int(end), len(body) - 1)
+            if start >= len(body):
+                return self._send(416, headers=headers + [
+                    ('Content-Range', f'bytes */{len(body)}')])
+            return self._send(206, body[start:end+1], headers + [
+                ('Content-Range', f'bytes {start}-{end}/{len(body)}')])
+        self._send(200, body, headers)
+
+    do_HEAD = do_GET
+
+
+class LocalSession(requests.Session):
+    '''
+    Session sending requests for any host to base url
+    '''
+    def __init__(self, base):
+        super().__init__()
+        self.base = base
+
+    def request(self, method, url, *args, **kwargs):
+        parts = urlsplit(url)
+        path = parts.path + (f'?{parts.query}' if parts.query else '')
+        return super().request(method, self.base + path, *args, **kwargs)
+
+
+@pytest.fixture
+def stand_in():
+    srv = StandIn()
+    thread = threading.Thread(target=srv.serve_forever, daemon=True)
+    thread.start()
+    yield srv
+    srv.shutdown()
+    srv.server_close()
+
+
+@pytest.fixture
+def session(stand_in):
+    s = LocalSession(stand_in.url)
+    yield s
+    s.close()
@@ -0,0 +1,74 @@
+'''
+LiveNWC against the local stand-in: range requests, tail diff, rewrites
+'''
+from datetime import datetime
+import numpy as np
+import pytest
+from matplotlib import rc
+from NWClive import LiveNWC
+from NWCmesonet import set_style
+from mts_cache import mts_url
+from bench_parse_mts import synthetic_mts
+
+
+def head(text, nrows):
+    '''
+    Return bytes of header and first nrows rows of mts text
+    '''
+    return '\n'.join(text.split('\n')[:3+nrows]).encode() + b'\n'
+
+
+@pytest.fixture
+def live(stand_in, session):
+    set_style()
+    # no LaTeX needed to draw in tests
+    rc('text', usetex=False)
+    live = LiveNWC(session)
+    text = synthetic_mts(live.date)
+    path = mts_url('nwcm', live.date).split('mesonet.org')[1]
+    yield live, text, path
+    live.renderer.close()
+
+
+def test_range_requests(stand_in, live):
+    live, text, path = live
+    stand_in.files[path] = head(text, 100)
+    assert live.poll() == 100
+    stand_in.files[path] = head(text, 250)
+    assert live.poll() == 150
+    assert stand_in.log[-1][2] == 206
+    assert live.poll() == 0
+    assert stand_in.log[-1][2] == 416
+    assert live.df.sizes['time'] == 250
+
+
+def test_tail_diff(stand_in, live):
+    live, text, path = live
+    stand_in.ranges = False
+    stand_in.files[path] = head(text, 100)
+    assert live.poll() == 100
+    stand_in.files[path] = head(text, 130)
+    assert live.poll() == 30
+    np.testing.assert_array_equal(live.df.time.values[-1],
+                                  np.datetime64(live.date, 'm') + 129)
+
+
+def test_rewrite(stand_in, live):
+    live, text, path = live
+    stand_in.ranges = False
+    stand_in.files[path] = head(text, 100)
+    assert live.poll() == 100
+    # server replaces the file with different contents
+    stand_in.files[path] = head(synthetic_mts(live.date, seed=1), 60)
+    assert live.poll() == 60
+    assert live.df.sizes['time'] == 60
+
+
+def test_bad_parse_keeps_running(stand_in, live):
+    live, text, path = live
+    stand_in.files[path] = b'garbage\nnot an mts file\nat all\n1 2 3\n'
+    live.run(interval=0., max_polls=2)
+    assert live.df is None
+    stand_in.files[path] = head(text, 10)
+    live.run(interval=0., max_polls=1)
+    assert live.df.sizes['time'] == 10
@@ -0,0 +1,76 @@
+'''
+parse_mts: missing values, time index from the TIME column, and agreement
+with the per-line loop it replaced. load_NWC datasets saved to netCDF and
+Zarr reopen ready to draw.
+'''
+from datetime import datetime
+from urllib.parse import urlsplit
+import numpy as np
+import pytest
+
+xr = pytest.importorskip('xarray')
+import matplotlib.pyplot as plt
+import NWCmesonet
+from NWCmesonet import parse_mts, load_NWC, draw_NWC
+from mts_cache import MTSCache, mts_url
+from bench_parse_mts import HEADERS, parse_mts_loop, synthetic_mts
+
+MTS = '''  101 ! (c) 2026 Board of Regents of the University of Oklahoma.
+  6 2026 10 18 00 00 00
+ STID  STNM  TIME   RELH   TAIR   PRES
+ NWCM   999     0  55.20  18.40 -996.00
+ NWCM   999     5  56.10 -999.00 970.25
+ NWCM   999    10  57.00 -100.00 970.30
+ NWCM   999    20  58.30  17.90 970.40
+'''
+
+
+def test_small_file():
+    for text in (MTS, MTS.encode()):
+        ds = parse_mts(text)
+        assert list(ds.data_vars) == ['RELH', 'TAIR', 'PRES']
+        # index from TIME, including the skipped minute 15
+        np.testing.assert_array_equal(
+            ds.time.values,
+            np.datetime64('2026-10-18T00:00') +
+            np.array([0, 5, 10, 20]).astype('timedelta64[m]'))
+        np.testing.assert_array_equal(ds.RELH, [55.2, 56.1, 57., 58.3])
+        # only values below -100 are missing
+        np.testing.assert_array_equal(ds.TAIR, [18.4, np.nan, -100., 17.9])
+        np.testing.assert_array_equal(ds.PRES,
+                                      [np.nan, 970.25, 970.3, 970.4])
+        assert ds.TAIR.attrs['units']
+
+
+def test_matches_loop():
+    date = datetime(2026, 10, 18)
+    text = synthetic_mts(date, seed=4)
+    ds, ref = parse_mts(text), parse_mts_loop(text, date)
+    np.testing.assert_array_equal(ds.time.values, ref.time.values)
+    for h in HEADERS[1:]:
+        np.testing.assert_array_equal(ds[h].values, ref[h].values)
+    assert np.isnan(ds.TAIR).any()
+
+
+@pytest.mark.parametrize('ext', ['.nc', '.zarr'])
+def test_load_save_reopen(stand_in, session, tmp_path, monkeypatch, ext):
+    if ext == '.zarr':
+        pytest.importorskip('zarr')
+    date = datetime(2026, 10, 17)
+    stand_in.files[urlsplit(mts_url('nwcm', date)).path] = \
+        synthetic_mts(date, seed=3).encode()
+    cache = MTSCache(str(tmp_path / 'mts'), session=session)
+    save = str(tmp_path / f'nwcm_20261017{ext}')
+    df = load_NWC(date, cache, save=save)
+    with (xr.open_zarr(save) if ext == '.zarr' else
+          xr.open_dataset(save)) as saved:
+        saved = saved.load()
+    xr.testing.assert_identical(saved[list(df.data_vars)].drop_attrs(),
+                                df.drop_attrs())
+    assert saved.TDEW_F.attrs['units'] == df.TDEW_F.attrs['units']
+    np.testing.assert_allclose(saved.TAIR.attrs['color'], df.TAIR.color)
+    # the reopened dataset draws without refetching
+    monkeypatch.setattr(NWCmesonet, '_style_set', True)
+    fig = draw_NWC(saved)[0]
+    plt.close(fig)
+    assert len(stand_in.log) == 1
@@ -0,0 +1,92 @@
+'''
+Derived quantities against NWS table values, a scalar implementation of
+the NWS heat index algorithm, and with missing inputs
+'''
+import math
+import numpy as np
+import pytest
+from derived import (dewpoint, wind_chill, heat_index, apparent_temperature,
+                     c_to_f)
+
+
+def rothfusz(T, RH):
+    return (-42.379 + 2.04901523*T + 10.14333127*RH - .22475541*T*RH -
+            .00683783*T*T - .05481717*RH*RH + .00122874*T*T*RH +
+            .00085282*T*RH*RH - .00000199*T*T*RH*RH)
+
+
+def heat_index_scalar(T, RH):
+    '''
+    NWS heat index algorithm, one value at a time
+    '''
+    HI = 0.5 * (T + 61. + (T - 68.)*1.2 + RH*0.094)
+    if (HI + T) / 2. < 80.:
+        return HI
+    HI = rothfusz(T, RH)
+    if RH < 13. and 80. < T < 112.:
+        HI -= ((13.-RH)/4.) * math.sqrt((17.-abs(T-95.))/17.)
+    elif RH > 85. and 80. < T < 87.:
+        HI += ((RH-85.)/10.) * ((87.-T)/5.)
+    return HI
+
+
+def test_dewpoint():
+    Td = dewpoint(np.array([20., 20., 0., 35.]),
+                  np.array([100., 50., 80., 30.]))
+    np.testing.assert_allclose(Td, [20., 9.27, -3.04, 14.87], atol=0.01)
+
+
+def test_wind_chill():
+    # NWS wind chill chart, degF and mph
+    WC = wind_chill([0., 30., -10., 40.], [15., 10., 30., 5.])
+    np.testing.assert_allclose(np.rint(WC), [-19., 21., -39., 36.])
+    # undefined above 50 degF or below 3 mph
+    assert np.isnan(wind_chill([51., 40.], [10., 2.9])).all()
+    assert np.isfinite(wind_chill(50., 3.))
+
+
+def test_heat_index_table():
+    # NWS heat index chart
+    HI = heat_index([90., 100., 80., 96.], [50., 40., 40., 65.])
+    np.testing.assert_allclose(np.rint(HI), [95., 109., 80., 121.])
+
+
+def test_heat_index_branches():
+    # simple formula below 80 degF
+    assert heat_index([70.], [50.])[0] == pytest.approx(
+        0.5 * (70. + 61. + 2.*1.2 + 50.*0.094))
+    # dry adjustment: (13 - RH)/4 * sqrt((17 - |T - 95|)/17)
+    assert heat_index([95.], [10.])[0] == pytest.approx(
+        rothfusz(95., 10.) - 0.75)
+    # humid adjustment: (RH - 85)/10 * (87 - T)/5
+    assert heat_index([85.], [90.])[0] == pytest.approx(
+        rothfusz(85., 90.) + 0.2)
+    T, RH = np.meshgrid(np.arange(60., 121., 1.5), np.arange(0., 101., 2.5))
+    expect = [heat_index_scalar(t, rh) for t, rh in zip(T.ravel(),
+                                                        RH.ravel())]
+    np.testing.assert_allclose(heat_index(T.ravel(), RH.ravel()), expect,
+                               rtol=1e-12)
+
+
+def test_apparent_temperature():
+    AT = apparent_temperature([30., 60., 95., 45.], [50., 50., 50., 50.],
+                              [10., 10., 10., 1.])
+    np.testing.assert_allclose(AT, [wind_chill(30., 10.), 60.,
+                                    heat_index([95.], [50.])[0], 45.])
+
+
+def test_nan_propagation():
+    nan = np.nan
+    assert np.isnan(dewpoint(np.array([nan, 20.]),
+                             np.array([50., nan]))).all()
+    assert np.isnan(c_to_f(nan))
+    assert np.isnan(wind_chill([nan, 30.], [10., nan])).all()
+    HI = heat_index([nan, 95., 70.], [50., nan, nan])
+    assert np.isnan(HI).all()
+    # missing temperature; missing wind where wind chill may apply;
+    # missing humidity where heat index applies
+    AT = apparent_temperature([nan, 30., 95., 60.], [50., 50., nan, nan],
+                              [10., nan, 10., nan])
+    assert np.isnan(AT[:3]).all()
+    # neither wind chill nor heat index at 60 degF
+    assert AT[3] == 60.
@@ -0,0 +1,44 @@
+'''
+Animation writers: GIFs streamed through ffmpeg with a palette from the
+first frames, and the capped Pillow fallback
+'''
+import os
+import glob
+import shutil
+import tempfile
+import numpy as np
+import pytest
+from PIL import Image
+from frame_stream import FFmpegWriter, PillowWriter, stream_frames
+
+
+def frames(n, shape=(60, 80, 3)):
+    rng = np.random.default_rng(0)
+    base = rng.integers(0, 255, shape, dtype=np.uint8)
+    return [np.roll(base, i, axis=1) for i in range(n)]
+
+
+@pytest.mark.skipif(shutil.which('ffmpeg') is None, reason='needs ffmpeg')
+@pytest.mark.parametrize('n', [2, 12])
+def test_ffmpeg_gif(tmp_path, n):
+    path = str(tmp_path / 'loop.gif')
+    before = set(glob.glob(os.path.join(tempfile.gettempdir(), '*.png')))
+    writer = FFmpegWriter(path, fps=10., palette_frames=4)
+    assert stream_frames(lambda f: f, frames(n), writer) == n
+    with Image.open(path) as im:
+        assert im.n_frames == n
+        assert im.size == (80, 60)
+    # palette file removed
+    assert set(glob.glob(os.path.join(tempfile.gettempdir(),
+                                      '*.png'))) == before
+
+
+def test_pillow_gif_capped(tmp_path):
+    path = str(tmp_path / 'loop.gif')
+    assert stream_frames(lambda f: f, frames(3),
+                         PillowWriter(path, max_frames=3)) == 3
+    with Image.open(path) as im:
+        assert im.n_frames == 3
+    with pytest.raises(RuntimeError):
+        stream_frames(lambda f: f, frames(4),
+                      PillowWriter(path, max_frames=3))
@@ -0,0 +1,42 @@
+'''
+gfs_convert packing: int16 only where it round-trips within the
+variable's precision, float32 otherwise
+'''
+import numpy as np
+import pytest
+from gfs_convert import PACK_TOLERANCE, encoding
+
+xr = pytest.importorskip('xarray')
+
+
+def dataset():
+    rng = np.random.default_rng(0)
+    dims = ('lv_ISBL0', 'lat_0', 'lon_0')
+    shape = (4, 30, 60)
+    return xr.Dataset({
+        'TMP_P0_L100_GLL0': (dims, rng.uniform(200., 310., shape)),
+        # kg/kg, 1e-6 aloft to 2e-2 near the surface
+        'SPFH_P0_L100_GLL0': (dims, 10**rng.uniform(-6., -1.7, shape)),
+        # range needs more than 2**16 steps of 1 m
+        'HGT_P0_L100_GLL0': (dims, rng.uniform(0., 90000., shape)),
+        'ABSV_P0_L100_GLL0': (dims, rng.normal(0., 1e-4, shape))})
+
+
+def test_packing_round_trip(tmp_path):
+    ds = dataset()
+    enc = encoding(ds)
+    assert enc['TMP_P0_L100_GLL0']['dtype'] == 'i2'
+    for v in ('SPFH_P0_L100_GLL0', 'HGT_P0_L100_GLL0', 'ABSV_P0_L100_GLL0'):
+        assert enc[v]['dtype'] == 'f4'
+    ds.to_netcdf(tmp_path / 'out.nc', format='NETCDF4', encoding=enc)
+    with xr.open_dataset(tmp_path / 'out.nc') as out:
+        err = abs(out['TMP_P0_L100_GLL0'] - ds['TMP_P0_L100_GLL0']).max()
+        assert float(err) <= PACK_TOLERANCE['TMP'] * 1.001
+        spfh = out['SPFH_P0_L100_GLL0'].values
+        np.testing.assert_allclose(spfh, ds['SPFH_P0_L100_GLL0'].values,
+                                   rtol=1e-6)
+
+
+def test_no_pack():
+    enc = encoding(dataset(), pack=False)
+    assert all(e['dtype'] == 'f4' for e in enc.values())
@@ -0,0 +1,138 @@
+'''
+gfs_download against the local stand-in: byte-range resume of partial
+files, checksum-verified re-download, inventory parsing and field subsets
+'''
+import os
+from urllib.parse import urlsplit
+import pytest
+import requests
+from gfs_download import (download_file, fields_key, get_ranges,
+                          is_complete, parse_inventory, select_ranges)
+
+URL = 'https://www.ncei.noaa.gov/data/gfsanl_3_20261018_0000_000.grb2'
+BODY = bytes(range(256)) * 4096
+
+
+@pytest.fixture
+def grib(stand_in):
+    stand_in.files[urlsplit(URL).path] = BODY
+    return stand_in
+
+
+def test_download_and_skip(grib, session, tmp_path):
+    dest = download_file(URL, str(tmp_path), session, max_retries=0)
+    assert open(dest, 'rb').read() == BODY
+    assert is_complete(dest)
+    assert not os.path.exists(dest + '.part')
+    # complete file with matching sidecar is not fetched again
+    n = len(grib.log)
+    download_file(URL, str(tmp_path), session, max_retries=0)
+    assert len(grib.log) == n
+
+
+def test_resume_partial(grib, session, tmp_path):
+    part = tmp_path / (URL.split('/')[-1] + '.part')
+    part.write_bytes(BODY[:300000])
+    (tmp_path / (part.name + '.fields')).write_text(fields_key() + '\n')
+    dest = download_file(URL, str(tmp_path), session, max_retries=0)
+    assert open(dest, 'rb').read() == BODY
+    _, headers, status = grib.log[-1]
+    assert headers['Range'] == 'bytes=300000-' and status == 206
+
+
+def test_resume_without_ranges(grib, session, tmp_path):
+    grib.ranges = False
+    part = tmp_path / (URL.split('/')[-1] + '.part')
+    part.write_bytes(BODY[:300000])
+    (tmp_path / (part.name + '.fields')).write_text(fields_key() + '\n')
+    dest = download_file(URL, str(tmp_path), session, max_retries=0)
+    # server sent the whole file: partial discarded, not duplicated
+    assert open(dest, 'rb').read() == BODY
+
+
+def test_checksum_mismatch_redownloads(grib, session, tmp_path):
+    dest = download_file(URL, str(tmp_path), session, max_retries=0)
+    # corrupt in place, same size
+    with open(dest, 'r+b') as f:
+        f.seek(1000)
+        f.write(b'\xff\xff\xff')
+    assert not is_complete(dest)
+    n = len(grib.log)
+    download_file(URL, str(tmp_path), session, max_retries=0)
+    assert len(grib.log) == n + 1
+    assert open(dest, 'rb').read() == BODY
+    assert is_complete(dest)
+
+
+# messages of a grib file: (var, level, size in bytes)
+MESSAGES = [('UGRD', '300 mb', 1000), ('VGRD', '300 mb', 1500),
+            ('HGT', '300 mb', 1200), ('RH', '500 mb', 800),
+            ('PRMSL', 'mean sea level', 900), ('TMP', 'surface', 700)]
+FIELDS = [{'grib': v, 'level': lev} for v, lev in
+          (('UGRD', '300 mb'), ('VGRD', '300 mb'), ('PRMSL', 'mean sea level'),
+           ('TMP', 'surface'))]
+
+
+def inventory():
+    lines, offset = [], 0
+    for i, (var, level, size) in enumerate(MESSAGES):
+        lines.append(f'{i+1}:{offset}:d=2026101800:{var}:{level}:anl:')
+        offset += size
+    return '\n'.join(lines) + '\n'
+
+
+def test_parse_inventory():
+    msgs = parse_inventory(inventory())
+    assert msgs[0] == ('UGRD', '300 mb', 0, 999)
+    assert msgs[1] == ('VGRD', '300 mb', 1000, 2499)
+    # last message runs to the end of the file
+    assert msgs[-1] == ('TMP', 'surface', 5400, None)
+
+
+def test_select_ranges():
+    msgs = parse_inventory(inventory())
+    # adjacent UGRD/VGRD merged, PRMSL/TMP merged up to the open end
+    assert select_ranges(msgs, FIELDS) == [[0, 2499], [4500, None]]
+    assert select_ranges(msgs, FIELDS[3:]) == [[5400, None]]
+    assert select_ranges(msgs, FIELDS[:1] + FIELDS[2:3]) == [[0, 999],
+                                                             [4500, 5399]]
+    with pytest.raises(ValueError):
+        select_ranges(msgs, [{'grib': 'SPFH', 'level': '300 mb'}])
+
+
+def test_get_ranges_falls_back_to_idx(stand_in, session):
+    stand_in.files[urlsplit(URL).path + '.idx'] = inventory().encode()
+    assert get_ranges(URL, session, FIELDS) == [[0, 2499], [4500, None]]
+    # NCEI .inv asked first
+    assert [p for p, _, _ in stand_in.log] == [
+        urlsplit(URL).path[:-len('.grb2')] + '.inv', urlsplit(URL).path + '.idx']
+    stand_in.files.clear()
+    with pytest.raises(requests.HTTPError):
+        get_ranges(URL, session, FIELDS)
+
+
+@pytest.fixture
+def subset(grib):
+    grib.files[urlsplit(URL).path[:-len('.grb2')] + '.inv'] = \
+        inventory().encode()
+    return BODY[:2500] + BODY[4500:]
+
+
+def test_subset_then_full(subset, grib, session, tmp_path):
+    dest = download_file(URL, str(tmp_path), session, FIELDS, max_retries=0)
+    assert open(dest, 'rb').read() == subset
+    assert is_complete(dest, FIELDS) and not is_complete(dest)
+    # a whole file is not satisfied by the subset
+    download_file(URL, str(tmp_path), session, max_retries=0)
+    assert open(dest, 'rb').read() == BODY
+    assert is_complete(dest) and not is_complete(dest, FIELDS)
+
+
+def test_stale_full_part_not_resumed(subset, session, tmp_path):
+    part = tmp_path / (URL.split('/')[-1] + '.part')
+    # interrupted whole-file download
+    part.write_bytes(BODY[:3000])
+    (tmp_path / (part.name + '.fields')).write_text(fields_key() + '\n')
+    dest = download_file(URL, str(tmp_path), session, FIELDS, max_retries=0)
+    assert open(dest, 'rb').read() == subset
+    assert not os.path.exists(str(part) + '.fields')
@@ -0,0 +1,41 @@
+'''
+read_current: blank fields, compass directions, and local valid time
+'''
+from datetime import datetime
+import numpy as np
+from mesonet_current import read_current, valid
+
+HEADER = ('STID,NAME,ST,LAT,LON,YR,MO,DA,HR,MI,TAIR,TDEW,RELH,CHIL,HEAT,'
+          'WDIR,WSPD,WMAX,PRES,TMAX,TMIN,RAIN\n')
+
+
+def current(month=10, hour=14):
+    return (HEADER +
+            f'ACME,Acme,OK,34.80833,-98.02325,2026,{month},18,{hour},35,'
+            '61,48,62,61,61,SSW,9,14,28.89,70,44,0.00\n'
+            f'ADAX,Ada,OK,34.79851,-96.66909,2026,{month},18,{hour},35,'
+            ' , ,,,,NE,,,28.95, ,45,\n'
+            f'ALTU,Altus, OK,34.58722,-99.33808,2026,{month},18,{hour},35,'
+            '66,41,40,66,66, ,12,18,28.82,74,47,0.00\n').encode()
+
+
+def test_blank_fields():
+    df = read_current(current())
+    assert len(df) == 3
+    np.testing.assert_array_equal(df.TAIR, [61., np.nan, 66.])
+    assert np.isnan(df.RAIN[1]) and np.isnan(df.WSPD[1])
+    assert list(df.STID) == ['ACME', 'ADAX', 'ALTU']
+    assert df.ST[2] == 'OK' and df.WDIR[2] == ''
+    np.testing.assert_array_equal(df.WDIR_DEG, [202.5, 45., np.nan])
+    assert df.YR.dtype == np.int32
+    ok = valid(df, 'TAIR', 'TDEW')
+    assert list(ok.STID) == ['ACME', 'ALTU']
+    assert list(ok[ok.TAIR > 62.].STID) == ['ALTU']
+
+
+def test_valid_time_local():
+    # central daylight time in October, standard time in January
+    assert read_current(current()).attrs['valid_time'] == \
+        datetime(2026, 10, 18, 19, 35)
+    assert read_current(current(month=1, hour=23)).attrs['valid_time'] == \
+        datetime(2026, 1, 19, 5, 35)
@@ -0,0 +1,149 @@
+'''
+Gridding of current.csv snapshots on a small synthetic Oklahoma: variables
+grouped by reporting stations, masking, wind components, int16 packing,
+and skipping stored times. AnalysisFile records the interpolation method.
+'''
+from types import SimpleNamespace
+import numpy as np
+import pytest
+from matplotlib.path import Path
+
+netCDF4 = pytest.importorskip('netCDF4')
+import mesonet_grid
+from mesonet_grid import (VARIABLES, AnalysisFile, grid_snapshot,
+                          grid_snapshots, station_values)
+from ok_grid import MercTransform
+from bench_current import synthetic
+
+# panhandle-shaped stand-in for the state border, lon/lat
+BORDER = [(-103., 37.), (-94.6, 37.), (-94.6, 33.7), (-100., 34.5),
+          (-100., 36.5), (-103., 36.5)]
+
+
+@pytest.fixture
+def grid():
+    lon, lat = np.meshgrid(np.linspace(-103., -94.5, 5),
+                           np.linspace(33.9, 36.9, 4))
+    return SimpleNamespace(lat=lat, lon=lon)
+
+
+def fields(grid):
+    return {v: np.full(grid.lat.shape, 1.) for v in VARIABLES}
+
+
+@pytest.mark.parametrize('method,name', [('cubic', 'Clough-Tocher'),
+                                         ('linear', 'linear barycentric')])
+def test_source_method(tmp_path, grid, method, name):
+    path = str(tmp_path / 'okmeso.nc')
+    f = AnalysisFile(path, method)
+    f.append(np.datetime64('2026-10-18T20:35'), fields(grid), grid)
+    with netCDF4.Dataset(path) as nc:
+        assert name in nc.source
+        assert nc.interpolation == method
+    # analyses of the other method are not mixed into the file
+    other = 'cubic' if method == 'linear' else 'linear'
+    with pytest.raises(ValueError):
+        AnalysisFile(path, other).append(np.datetime64('2026-10-18T20:40'),
+                                         fields(grid), grid)
+    assert len(AnalysisFile(path, method).times()) == 1
+
+
+@pytest.fixture
+def ok():
+    m = MercTransform()
+    lon, lat, xplot, yplot = m.makegrid(40, 30, returnxy=True)
+    border = np.column_stack(m(*np.array(BORDER).T))
+    inside = Path(border).contains_points(
+        np.column_stack((xplot.ravel(), yplot.ravel())))
+    grid = SimpleNamespace(lon=lon, lat=lat, xplot=xplot, yplot=yplot,
+                           border=border,
+                           mask=~inside.reshape(xplot.shape))
+    return m, grid
+
+
+def stations(n=40, seed=0):
+    rng = np.random.default_rng(seed)
+    path = Path(BORDER)
+    ll = rng.uniform((-103., 33.7), (-94.6, 37.), (4 * n, 2))
+    return ll[path.contains_points(ll)][:n]
+
+
+def test_grid_snapshot_groups_and_masks(ok, monkeypatch):
+    m, grid = ok
+    ll = stations()
+    rng = np.random.default_rng(1)
+    values = {v: rng.normal(size=len(ll)) for v in VARIABLES}
+    values['TDEW'][[3, 7]] = np.nan
+    calls = []
+    get_interpolator = mesonet_grid.get_interpolator
+
+    def counted(*args):
+        calls.append(args)
+        return get_interpolator(*args)
+    monkeypatch.setattr(mesonet_grid, 'get_interpolator', counted)
+    out = grid_snapshot(ll[:, 0], ll[:, 1], values, m, grid)
+    # TDEW is reported by fewer stations: two interpolations, not six
+    assert len(calls) == 2
+    for v in VARIABLES:
+        assert np.isnan(out[v][grid.mask]).all()
+        assert np.isfinite(out[v][~grid.mask]).all()
+        # same as gridding the variable on its own
+        alone = grid_snapshot(ll[:, 0], ll[:, 1], {v: values[v]}, m, grid)
+        np.testing.assert_allclose(out[v], alone[v], atol=1e-12)
+    rep = ~np.isnan(values['TDEW'])
+    dew = grid_snapshot(ll[rep, 0], ll[rep, 1],
+                        {'TDEW': values['TDEW'][rep]}, m, grid)
+    np.testing.assert_allclose(out['TDEW'], dew['TDEW'], atol=1e-12)
+
+
+def test_station_values_wind_components():
+    df = SimpleNamespace(WSPD=np.array([10., 10., 10., 0.]),
+                         WDIR_DEG=np.array([0., 90., 270., np.nan]),
+                         TAIR=np.zeros(4), TDEW=np.zeros(4), PRES=np.zeros(4))
+    val = station_values(df)
+    # winds from the north blow south: v < 0; from the east: u < 0
+    np.testing.assert_allclose(val['UWND'][:3], [0., -10., 10.], atol=1e-12)
+    np.testing.assert_allclose(val['VWND'][:3], [-10., 0., 0.], atol=1e-12)
+    assert np.isnan(val['UWND'][3])
+
+
+def test_int16_round_trip(tmp_path, grid):
+    rng = np.random.default_rng(2)
+    f = fields(grid)
+    f['TAIR'] = rng.uniform(-20., 115., grid.lat.shape)
+    f['PRES'] = rng.uniform(27.5, 30.5, grid.lat.shape)
+    f['UWND'] = rng.uniform(-60., 60., grid.lat.shape)
+    f['TAIR'][0, 0] = np.nan
+    path = str(tmp_path / 'okmeso.nc')
+    AnalysisFile(path).append(np.datetime64('2026-10-18T20:35'), f, grid)
+    with netCDF4.Dataset(path) as nc:
+        assert nc['TAIR'].dtype == np.int16
+        for v in ('TAIR', 'PRES', 'UWND'):
+            got = np.ma.filled(nc[v][0].astype(np.float64), np.nan)
+            np.testing.assert_array_equal(np.isnan(got), np.isnan(f[v]))
+            # within half the packing step
+            np.testing.assert_allclose(got, f[v],
+                                       atol=VARIABLES[v][3] / 2 + 1e-9)
+
+
+def current(tmp_path, minute, seed):
+    text = synthetic(30, np.random.default_rng(seed))
+    path = tmp_path / f'current_{minute:02d}.csv'
+    path.write_text(text.replace(',2026,10,18,14,35,',
+                                 f',2026,10,18,14,{minute:02d},'))
+    return str(path)
+
+
+def test_grid_snapshots_skip_stored(tmp_path, ok):
+    m, grid = ok
+    out = str(tmp_path / 'okmeso.nc')
+    paths = [current(tmp_path, minute, minute) for minute in (10, 0, 5)]
+    assert grid_snapshots(paths, out, m, grid) == 3
+    times = AnalysisFile(out).times()
+    np.testing.assert_array_equal(
+        times, np.array(['2026-10-18T19:00', '2026-10-18T19:05',
+                         '2026-10-18T19:10'], dtype='datetime64[m]'))
+    # stored and older times are skipped, newer ones appended
+    paths.append(current(tmp_path, 15, 15))
+    assert grid_snapshots(paths, out, m, grid) == 1
+    assert len(AnalysisFile(out).times()) == 4
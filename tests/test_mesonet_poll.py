@@ -0,0 +1,88 @@
+'''
+MesonetPoller against the local stand-in serving rotating current.csv
+snapshots: conditional GET, dedup on observation time, ring buffer
+'''
+from datetime import datetime
+import numpy as np
+import pytest
+from mesonet_poll import MesonetPoller, LATEST, archived
+from bench_current import synthetic
+
+
+def snapshot(minute, seed=0, hour=14):
+    '''
+    Return bytes of a current.csv observed at hour:minute local time (CDT)
+    '''
+    text = synthetic(20, np.random.default_rng(seed))
+    return text.replace(',2026,10,18,14,35,',
+                        f',2026,10,18,{hour},{minute:02d},').encode()
+
+
+@pytest.fixture
+def poller(stand_in, session, tmp_path):
+    stand_in.files['/current.csv'] = snapshot(0)
+    return MesonetPoller(str(tmp_path), f'{stand_in.url}/current.csv',
+                         size=3, session=session)
+
+
+def test_not_modified(stand_in, poller, tmp_path):
+    df = poller.poll()
+    assert df.attrs['valid_time'] == datetime(2026, 10, 18, 19, 0)
+    assert poller.poll() is None
+    _, headers, status = stand_in.log[-1]
+    assert status == 304 and 'If-None-Match' in headers
+    assert len(archived(str(tmp_path))) == 1
+    assert open(tmp_path / LATEST, 'rb').read() == snapshot(0)
+
+
+def test_dedup_valid_time(stand_in, poller):
+    # no validators: every poll is a full 200
+    stand_in.etag = False
+    assert poller.poll() is not None
+    # rebuilt file, same observation time
+    stand_in.files['/current.csv'] = snapshot(0, seed=1)
+    assert poller.poll() is None
+    # older observation
+    stand_in.files['/current.csv'] = snapshot(55, seed=2, hour=13)
+    assert poller.poll() is None
+    stand_in.files['/current.csv'] = snapshot(5)
+    assert poller.poll() is not None
+    assert len(poller.ring) == 2
+
+
+def test_ring_eviction_and_restore(stand_in, poller, session, tmp_path):
+    for minute in range(0, 25, 5):
+        stand_in.files['/current.csv'] = snapshot(minute)
+        assert poller.poll() is not None
+    times = [t.minute for t in poller.ring.times()]
+    assert times == [10, 15, 20]
+    assert len(archived(str(tmp_path))) == 5
+    # restarted poller refills the ring and skips what it already has
+    again = MesonetPoller(str(tmp_path), poller.url, size=3,
+                          session=session)
+    assert [t.minute for t in again.ring.times()] == [10, 15, 20]
+    assert again.poll() is None
+
+
+def test_run_survives_server_errors(stand_in, poller):
+    stand_in.fail['/current.csv'] = [503, 503]
+    poller.run(interval=0., max_polls=3)
+    assert len(poller.ring) == 1
+
+
+def test_run_survives_disk_errors(stand_in, poller, tmp_path, monkeypatch):
+    import mesonet_poll
+    atomic_write = mesonet_poll.atomic_write
+    fails = [OSError(28, 'No space left on device')]
+
+    def failing(path, content):
+        if fails:
+            raise fails.pop()
+        atomic_write(path, content)
+    monkeypatch.setattr(mesonet_poll, 'atomic_write', failing)
+    poller.run(interval=0., max_polls=2)
+    # the unsaved snapshot was fetched again in full, not answered with 304
+    assert [status for _, _, status in stand_in.log[-2:]] == [200, 200]
+    assert len(poller.ring) == 1
+    assert len(archived(str(tmp_path))) == 1
+    assert open(tmp_path / LATEST, 'rb').read() == snapshot(0)
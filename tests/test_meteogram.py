@@ -0,0 +1,68 @@
+'''
+MeteogramRenderer reused over several days draws the same figure as a
+fresh draw_NWC for each day
+'''
+from datetime import datetime, timedelta
+import numpy as np
+import pytest
+
+pytest.importorskip('xarray')
+import matplotlib.pyplot as plt
+import NWCmesonet
+from NWCmesonet import MeteogramRenderer, draw_NWC, parse_mts, add_colors
+from derived import add_derived
+from bench_parse_mts import synthetic_mts
+
+
+def day(i):
+    '''
+    Dataset of day i with different ranges each day, as from load_NWC
+    '''
+    date = datetime(2026, 10, 16) + timedelta(days=i)
+    df = parse_mts(synthetic_mts(date, seed=i))
+    for v, scale, shift in (('TAIR', 1. + i, -25. * i), ('PRES', 1., 880.),
+                            ('WSPD', 0.2 * (i + 1), 0.),
+                            ('SRAD', 4. * (i + 1), 0.)):
+        df[v] = df[v] * scale + shift
+    # a short day: the fill polygon changes size
+    if i == 1:
+        df = df.isel(time=slice(0, 1000))
+    add_derived(df)
+    return add_colors(df)
+
+
+def state(fig, ax, ax2_2):
+    axes = list(ax) + [ax2_2]
+    return {
+        'title': fig._suptitle.get_text(),
+        'lines': [l.get_xydata() for a in axes for l in a.lines],
+        'ylim': [a.get_ylim() for a in axes],
+        'yticks': [a.get_yticks() for a in axes],
+        'xlim': ax[3].get_xlim(),
+        'fills': [c.get_paths()[0].vertices for a in axes
+                  for c in a.collections]
+    }
+
+
+def test_update_matches_fresh(monkeypatch):
+    # skip the LaTeX text style: no TeX needed, rc left alone
+    monkeypatch.setattr(NWCmesonet, '_style_set', True)
+    renderer = MeteogramRenderer()
+    try:
+        for i in range(3):
+            df = day(i)
+            renderer.update(df)
+            got = state(renderer.fig, renderer.ax, renderer.ax2_2)
+            fig, ax, ax2_2 = draw_NWC(df)
+            expect = state(fig, ax, ax2_2)
+            plt.close(fig)
+            assert got['title'] == expect['title']
+            # one fill, replaced rather than accumulated
+            assert len(got['fills']) == len(expect['fills']) == 1
+            for k in ('lines', 'ylim', 'yticks', 'fills'):
+                assert len(got[k]) == len(expect[k])
+                for a, b in zip(got[k], expect[k]):
+                    np.testing.assert_array_equal(a, b)
+            np.testing.assert_array_equal(got['xlim'], expect['xlim'])
+    finally:
+        renderer.close()
@@ -0,0 +1,88 @@
+'''
+mts_analysis against direct sums and a synthetic diurnal cycle with gaps
+'''
+import numpy as np
+import pytest
+from mts_analysis import autocorr, power_spectrum, harmonics
+
+DAYS = 10
+
+
+@pytest.fixture
+def diurnal():
+    # 1-minute series: mean, diurnal cycle and its first harmonic, noise
+    rng = np.random.default_rng(0)
+    time = np.datetime64('2026-10-01T00:00') + \
+        np.arange(DAYS * 1440).astype('timedelta64[m]')
+    t = np.arange(DAYS * 1440) / 1440.
+    x = 15. + 3. * np.cos(2 * np.pi * t - 0.5) + \
+        np.cos(4 * np.pi * t - 1.2) + 0.01 * rng.normal(size=len(t))
+    return time, x
+
+
+def with_gaps(x, seed=1):
+    x = x.copy()
+    rng = np.random.default_rng(seed)
+    x[rng.random(len(x)) < 0.1] = np.nan
+    # and an outage
+    x[3000:3500] = np.nan
+    return x
+
+
+@pytest.mark.parametrize('block', [None, 700])
+def test_autocorr_matches_direct(block):
+    rng = np.random.default_rng(2)
+    x = with_gaps(np.cumsum(rng.normal(size=5000)))
+    max_lag = 400
+    lags, r = autocorr(x, max_lag, block=block, min_pairs=10)
+    # direct lagged sums over valid pairs
+    ok = np.isfinite(x)
+    x0 = np.where(ok, x - np.nanmean(x), 0.)
+    w = ok.astype(float)
+    n = len(x)
+    num = np.correlate(x0, x0, 'full')[n-1:n+max_lag]
+    pairs = np.correlate(w, w, 'full')[n-1:n+max_lag]
+    expect = num / pairs / (np.sum(x0**2) / w.sum())
+    np.testing.assert_array_equal(lags, np.arange(max_lag + 1))
+    np.testing.assert_allclose(r, expect, rtol=1e-8, atol=1e-10)
+    assert r[0] == pytest.approx(1.)
+
+
+def test_autocorr_min_pairs():
+    x = np.array([1., np.nan, 3., np.nan, 2., 5.])
+    lags, r = autocorr(x, min_pairs=2)
+    # lag 1 has one valid pair (2, 5), lag 5 has none
+    assert np.isnan(r[1]) and np.isnan(r[5])
+    assert np.isfinite(r[2])
+
+
+def test_power_spectrum_diurnal(diurnal):
+    _, x = diurnal
+    dt = 1. / 1440.
+    freq, psd = power_spectrum(x, dt)
+    df = freq[1]
+    # peaks at 1 and 2 cycles per day
+    top = np.sort(freq[np.argsort(psd)[-2:]])
+    np.testing.assert_allclose(top, [1., 2.])
+    # Parseval: total power is the variance, 3^2/2 + 1^2/2
+    assert np.sum(psd) * df == pytest.approx(np.var(x), rel=1e-6)
+    assert np.sum(psd) * df == pytest.approx(5., rel=1e-3)
+    # gaps: same peaks, total power scaled back up to the variance of the
+    # valid points
+    xg = with_gaps(x)
+    freq, psd = power_spectrum(xg, dt)
+    top = np.sort(freq[np.argsort(psd)[-2:]])
+    np.testing.assert_allclose(top, [1., 2.])
+    assert np.sum(psd) * df == pytest.approx(np.nanvar(xg), rel=1e-6)
+
+
+def test_harmonics_diurnal(diurnal):
+    time, x = diurnal
+    x = with_gaps(x)
+    out = harmonics(time, x, periods=(1.,), nharm=(2,))
+    assert out['mean'] == pytest.approx(15., abs=1e-3)
+    np.testing.assert_allclose(out[1.]['amplitude'], [3., 1.], atol=1e-3)
+    np.testing.assert_allclose(out[1.]['phase'], [0.5, 1.2], atol=1e-3)
+    ok = np.isfinite(x)
+    assert out['fit'].shape == x.shape
+    np.testing.assert_allclose(out['fit'][ok], x[ok], atol=0.05)
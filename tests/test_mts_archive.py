@@ -0,0 +1,58 @@
+'''
+MTSArchive: a day missing, or cut short, before the end of the archive is
+reported as missing and merged in time order
+'''
+from datetime import datetime, timedelta
+import numpy as np
+import pytest
+
+pytest.importorskip('xarray')
+from NWCmesonet import parse_mts
+from mts_archive import MTSArchive
+from bench_parse_mts import synthetic_mts
+
+
+def day(i):
+    return datetime(2026, 10, 1) + timedelta(days=i)
+
+
+def mts(i):
+    return parse_mts(synthetic_mts(day(i), seed=i))
+
+
+def test_gap_backfilled(tmp_path):
+    archive = MTSArchive(str(tmp_path))
+    for i in (0, 2):
+        assert archive.append(mts(i)) == 1440
+    assert archive.has_day(day(0)) and archive.has_day(day(2))
+    assert not archive.has_day(day(1))
+    assert not archive.has_day(day(3))
+    assert not archive.has_day(datetime(2025, 10, 2))
+    # the missing day goes in between, existing rows are kept
+    assert archive.append(mts(1)) == 1440
+    assert archive.has_day(day(1))
+    assert archive.append(mts(1)) == 0
+    ds = archive.query(day(0), day(3))
+    assert len(ds.time) == 3 * 1440
+    assert np.all(np.diff(ds.time.values) > np.timedelta64(0))
+    for i in range(3):
+        expect = mts(i)
+        got = ds.sel(time=expect.time)
+        np.testing.assert_allclose(got.TAIR, expect.TAIR, atol=0.006)
+        np.testing.assert_allclose(got.RELH, expect.RELH, atol=0.006)
+    assert archive.last_time() == np.datetime64('2026-10-03T23:59')
+
+
+def test_partial_day_completed(tmp_path):
+    archive = MTSArchive(str(tmp_path))
+    whole = mts(0)
+    assert archive.append(whole.isel(time=slice(0, 600))) == 600
+    assert not archive.has_day(day(0))
+    # a later day after the partial one: the rest is merged in
+    assert archive.append(mts(1)) == 1440
+    assert not archive.has_day(day(0)) and archive.has_day(day(1))
+    assert archive.append(whole) == 840
+    assert archive.has_day(day(0))
+    ds = archive.query(day(0), day(2))
+    assert len(ds.time) == 2 * 1440
+    np.testing.assert_allclose(ds.TAIR[:1440], whole.TAIR, atol=0.006)
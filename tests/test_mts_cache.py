@@ -0,0 +1,78 @@
+'''
+MTSCache against the local stand-in: hits, misses, ETag revalidation,
+shared objects, and LRU eviction
+'''
+import os
+import time
+from datetime import datetime, timedelta
+from urllib.parse import urlsplit
+import pytest
+from mts_cache import MTSCache, mts_url
+
+
+def path(station, date):
+    return urlsplit(mts_url(station, date)).path
+
+
+@pytest.fixture
+def cache(tmp_path, session):
+    return MTSCache(str(tmp_path / 'mts'), session=session)
+
+
+def test_past_day_hit_and_miss(stand_in, cache):
+    day = datetime(2021, 6, 1)
+    stand_in.files[path('nwcm', day)] = b'day one'
+    assert cache.get('nwcm', day) == b'day one'
+    assert len(stand_in.log) == 1
+    # complete day: served from disk without asking the server
+    stand_in.files[path('nwcm', day)] = b'changed on server'
+    assert cache.get('nwcm', day) == b'day one'
+    assert len(stand_in.log) == 1
+
+
+def test_current_day_revalidated(stand_in, cache):
+    today = datetime.utcnow()
+    p = path('nwcm', today)
+    stand_in.files[p] = b'first rows\n'
+    assert cache.get('nwcm', today) == b'first rows\n'
+    old_sha = cache._read_ref('nwcm', today)['sha256']
+    # unchanged: conditional request answered 304, content from disk
+    assert cache.get('nwcm', today) == b'first rows\n'
+    req_headers, status = stand_in.log[-1][1:]
+    assert status == 304 and 'If-None-Match' in req_headers
+    # changed: downloaded again, previous object dropped
+    stand_in.files[p] = b'first rows\nmore rows\n'
+    assert cache.get('nwcm', today) == b'first rows\nmore rows\n'
+    assert stand_in.log[-1][2] == 200
+    assert not os.path.exists(cache._obj_path(old_sha))
+
+
+def test_shared_object_kept(stand_in, cache):
+    today = datetime.utcnow()
+    day = datetime(2021, 6, 1)
+    stand_in.files[path('nwcm', today)] = b'same bytes'
+    stand_in.files[path('nrmn', day)] = b'same bytes'
+    cache.get('nwcm', today)
+    cache.get('nrmn', day)
+    sha = cache._read_ref('nrmn', day)['sha256']
+    stand_in.files[path('nwcm', today)] = b'new bytes'
+    cache.get('nwcm', today)
+    # the other key still points at the object
+    assert os.path.exists(cache._obj_path(sha))
+    assert cache.get('nrmn', day) == b'same bytes'
+
+
+def test_lru_eviction(stand_in, tmp_path, session):
+    cache = MTSCache(str(tmp_path / 'mts'), max_bytes=250, session=session)
+    days = [datetime(2021, 6, 1) + timedelta(days=i) for i in range(3)]
+    for i, day in enumerate(days):
+        stand_in.files[path('nwcm', day)] = bytes([65 + i]) * 100
+    # access times are file mtimes: space out the accesses
+    for i in (0, 1, 0, 2):
+        # using day 0 again leaves day 1 least recently used
+        cache.get('nwcm', days[i])
+        time.sleep(0.05)
+    assert cache._read_ref('nwcm', days[1]) is None
+    assert cache._read_ref('nwcm', days[0]) is not None
+    assert cache._read_ref('nwcm', days[2]) is not None
+    assert cache.size() == 200
@@ -0,0 +1,85 @@
+'''
+MercTransform against Basemap(projection="merc") reference coordinates,
+and the OKGrid .npz cache round trip
+'''
+import numpy as np
+import pytest
+from matplotlib.path import Path
+from ok_grid import MercTransform, OKGrid, _map_key
+
+# Basemap(projection='merc', llcrnrlat=33.5, urcrnrlat=37.2,
+#         llcrnrlon=-103.2, urcrnrlon=-94.0) on basemap 2.0
+LON = [-103.2, -94.0, -97.5, -100., -95.3]
+LAT = [33.5, 37.2, 35.2, 36.5, 34.1]
+X = [0.0, 1022992.8434190672, 633810.783422683, 355823.5977109801,
+     878439.506848982]
+Y = [3.259629011154175e-09, 504595.27438413864, 228976.83763525402,
+     407323.80390423676, 80287.30395069672]
+INVERSE = [[-102.3006779706052, -97.80406782363116],
+           [34.986777160784456, 36.084483913131095]]
+MAKEGRID_LAT = [33.49999999999998, 35.371198145869705, 37.2000000491827]
+MAP_KEY = ((('R', '6370997.0'), ('lat_ts', '0.0'), ('lon_0', '-98.6'),
+            ('proj', 'merc'), ('units', 'm'), ('x_0', '-0.0'),
+            ('y_0', '-3957425.1164197633')), -103.2, 33.5, -94.0, 37.2)
+
+
+def test_merc_matches_basemap():
+    m = MercTransform()
+    x, y = m(LON, LAT)
+    np.testing.assert_allclose(x, X, rtol=1e-12, atol=1e-6)
+    np.testing.assert_allclose(y, Y, rtol=1e-12, atol=1e-6)
+    assert (m.urcrnrx, m.urcrnry) == pytest.approx((X[1], Y[1]), rel=1e-12)
+    lon, lat = m([1e5, 6e5], [2e5, 3.5e5], inverse=True)
+    np.testing.assert_allclose([lon, lat], INVERSE, rtol=1e-12)
+    lons, lats = m.makegrid(4, 3)
+    np.testing.assert_allclose(lats[:, 0], MAKEGRID_LAT, rtol=1e-12)
+    np.testing.assert_allclose(lons[0], [-103.2, -100.13333, -97.066666,
+                                         -94.], rtol=1e-6)
+    # same cache keys as the Basemap it stands in for
+    assert _map_key(m) == MAP_KEY
+
+
+@pytest.fixture(params=[True, False], ids=['separable', 'curvilinear'])
+def computed(request, monkeypatch):
+    '''
+    OKGrid._compute on a synthetic border, counting calls; lon/lat are
+    stored as 1-D axes when separable, else as 2-D arrays
+    '''
+    calls = []
+
+    def compute(self):
+        calls.append(self)
+        lon, lat, xplot, yplot = self.m.makegrid(30, 20, returnxy=True)
+        if not request.param:
+            lat = lat + 0.01 * np.sin(lon)
+        border = np.column_stack(self.m([-103., -94.6, -94.6, -100.],
+                                        [37., 37., 33.7, 34.5]))
+        mask = ~Path(border).contains_points(
+            np.column_stack((xplot.ravel(), yplot.ravel())))
+        return {'border': border, 'xnew': np.arange(30.), 'ynew':
+                np.arange(20.), 'lon': lon, 'lat': lat, 'xplot': xplot,
+                'yplot': yplot, 'mask': mask.reshape(xplot.shape)}
+    monkeypatch.setattr(OKGrid, '_compute', compute)
+    return calls
+
+
+def test_okgrid_cache_round_trip(tmp_path, computed):
+    def grid():
+        return OKGrid(MercTransform(), str(tmp_path / 'states'), 0.05,
+                      cache_dir=str(tmp_path / 'cache'))
+    first = grid()
+    data = {k: getattr(first, k) for k in ('border', 'xnew', 'ynew', 'lon',
+                                           'lat', 'xplot', 'yplot', 'mask')}
+    assert 'compute' in first.timings and len(computed) == 1
+    second = grid()
+    assert second.path == first.path
+    for k, v in data.items():
+        got = getattr(second, k)
+        assert got.shape == v.shape
+        np.testing.assert_array_equal(got, v)
+    assert second.mask.dtype == bool and second.mask.any()
+    assert 'cache load' in second.timings and len(computed) == 1
+    # another spacing is another file
+    other = OKGrid(MercTransform(), str(tmp_path / 'states'), 0.1,
+                   cache_dir=str(tmp_path / 'cache'))
+    assert other.path != first.path
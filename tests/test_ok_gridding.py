@@ -0,0 +1,100 @@
+'''
+StationIndex against brute-force nearest searches; GridInterpolator
+matches griddata and locates the grid points only once
+'''
+from unittest import mock
+import numpy as np
+import pytest
+from scipy.interpolate import griddata
+from scipy.spatial import Delaunay
+
+from ok_gridding import GridInterpolator, StationIndex
+from bench_perimeter import perimeter_loop
+
+
+@pytest.fixture
+def index():
+    rng = np.random.default_rng(5)
+    xy = rng.uniform(0., 8e5, (120, 2))
+    points = rng.uniform(-1e5, 9e5, (300, 2))
+    return StationIndex(xy[:, 0], xy[:, 1]), xy, points
+
+
+def test_nearest(index):
+    si, xy, points = index
+    dist = np.hypot(*(points[:, None, :] - xy[None, :, :]).transpose(2, 0, 1))
+    np.testing.assert_array_equal(si.nearest(points), dist.argmin(axis=1))
+    assert len(si) == len(xy)
+
+
+def test_knearest(index):
+    si, xy, points = index
+    dist = np.hypot(*(points[:, None, :] - xy[None, :, :]).transpose(2, 0, 1))
+    order = np.argsort(dist, axis=1)[:, :4]
+    d, i = si.knearest(points, 4)
+    np.testing.assert_array_equal(i, order)
+    np.testing.assert_allclose(d, np.take_along_axis(dist, order, axis=1))
+    # one neighbor keeps the 2-D shape
+    d, i = si.knearest(points, 1)
+    assert i.shape == (len(points), 1)
+    np.testing.assert_array_equal(i[:, 0], order[:, 0])
+    # neighbors beyond max_dist are missing
+    d, i = si.knearest(points, 4, max_dist=1e5)
+    far = np.take_along_axis(dist, order, axis=1) >= 1e5
+    assert far.any() and (~far).any()
+    assert np.isinf(d[far]).all() and (i[far] == len(si)).all()
+    np.testing.assert_array_equal(i[~far], order[~far])
+
+
+def test_extend_to_border(index):
+    si, xy, border = index
+    rng = np.random.default_rng(6)
+    values = rng.normal(size=len(xy))
+    points, v2 = si.extend_to_border(values, border)
+    expect_points, expect_v2 = perimeter_loop(xy[:, 0], xy[:, 1], values,
+                                              border)
+    np.testing.assert_array_equal(points, expect_points)
+    np.testing.assert_array_equal(v2, expect_v2)
+    # several variables at once
+    V = np.column_stack((values, 2. * values))
+    _, V2 = si.extend_to_border(V, border)
+    np.testing.assert_array_equal(V2[:, 0], expect_v2)
+    np.testing.assert_array_equal(V2[:, 1], 2. * expect_v2)
+
+
+@pytest.fixture
+def stations():
+    rng = np.random.default_rng(3)
+    points = rng.uniform(0., 10., (60, 2))
+    values = np.column_stack((np.sin(points[:, 0]) * points[:, 1],
+                              rng.normal(size=60)))
+    xg, yg = np.meshgrid(np.linspace(-1., 11., 50), np.linspace(-1., 11., 40))
+    return points, values, xg, yg
+
+
+@pytest.mark.parametrize('method', ['cubic', 'linear'])
+def test_matches_griddata(stations, method):
+    points, values, xg, yg = stations
+    gi = GridInterpolator(points, xg, yg)
+    out = gi(values, method)
+    assert out.shape == xg.shape + (2,)
+    for k in range(2):
+        ref = griddata(points, values[:, k], (xg, yg), method)
+        np.testing.assert_allclose(out[..., k], ref, atol=1e-12)
+        np.testing.assert_array_equal(np.isnan(out[..., k]), np.isnan(ref))
+    # 1-D values give a grid-shaped field
+    np.testing.assert_allclose(gi(values[:, 0], method), out[..., 0],
+                               atol=1e-12)
+
+
+def test_second_call_does_not_locate(stations):
+    points, values, xg, yg = stations
+    gi = GridInterpolator(points, xg, yg)
+    first = gi(values[:, 0])
+    with mock.patch.object(Delaunay, 'find_simplex',
+                           side_effect=AssertionError('located again')):
+        again = gi(values[:, 1])
+        linear = gi(values[:, 1], 'linear')
+    np.testing.assert_allclose(
+        again, griddata(points, values[:, 1], (xg, yg), 'cubic'), atol=1e-12)
+    assert np.isnan(first).any() and np.isnan(linear).any()
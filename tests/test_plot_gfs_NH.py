@@ -0,0 +1,96 @@
+'''
+plot_gfs_NH frames drawn with the pre-projected background, serially and
+in worker processes, are the same PNGs as the original loop that adds the
+cartopy features to every frame; the opt-in rasterized background is within
+its documented tolerance. Natural Earth shapefiles are written locally so
+the test needs no download.
+'''
+import os
+from collections import OrderedDict
+from functools import partial
+import numpy as np
+import pytest
+
+cartopy = pytest.importorskip('cartopy')
+shapefile = pytest.importorskip('shapefile')
+pytest.importorskip('cmocean')
+pytest.importorskip('xarray')
+import map_background
+import plot_gfs_NH as P
+from bench_gfs_render import compare, draw_reference, synthetic_files
+
+# (category, name, shape type) of the features in plot_gfs_NH.BACKGROUND
+FEATURES = [('physical', 'coastline', shapefile.POLYLINE),
+            ('cultural', 'admin_0_boundary_lines_land', shapefile.POLYLINE),
+            ('cultural', 'admin_1_states_provinces_lakes', shapefile.POLYGON)]
+
+
+def write_natural_earth(root):
+    '''
+    Write small stand-in Natural Earth shapefiles at every scale
+    '''
+    lon = np.linspace(-180., 180., 73)
+    for category, name, shape in FEATURES:
+        d = os.path.join(root, 'shapefiles', 'natural_earth', category)
+        os.makedirs(d, exist_ok=True)
+        for scale in ('10m', '50m', '110m'):
+            w = shapefile.Writer(os.path.join(d, f'ne_{scale}_{name}'),
+                                 shapeType=shape)
+            w.field('name', 'C')
+            if shape == shapefile.POLYGON:
+                for lon0 in range(-120, 180, 60):
+                    w.poly([[(lon0, 30.), (lon0, 45.), (lon0 + 20., 45.),
+                             (lon0 + 20., 30.), (lon0, 30.)]])
+                    w.record(f'{lon0}')
+            else:
+                for lat in (20., 40., 60.):
+                    w.line([[(x, lat + 5.*np.sin(np.radians(3*x)))
+                             for x in lon]])
+                    w.record(f'{lat}')
+            w.close()
+
+
+@pytest.fixture
+def natural_earth(tmp_path, monkeypatch):
+    root = str(tmp_path / 'cartopy')
+    write_natural_earth(root)
+    # spawn workers import cartopy again and read the environment
+    monkeypatch.setenv('CARTOPY_DATA_DIR', root)
+    monkeypatch.setitem(cartopy.config, 'pre_existing_data_dir', root)
+    monkeypatch.setitem(cartopy.config, 'data_dir', root)
+    # raster layers are cached per feature names, not their data: keep them
+    # out of the user's cache, here and in the workers
+    monkeypatch.setenv('HOME', str(tmp_path))
+    monkeypatch.setattr(map_background, '_layers', OrderedDict())
+    monkeypatch.setattr(P, 'add_static_layer', partial(
+        map_background.add_static_layer, cache_dir=str(tmp_path / 'layers')))
+    return root
+
+
+def test_frames_match_per_frame_features(natural_earth, tmp_path):
+    sources = [('file', f) for f in synthetic_files(2, str(tmp_path))]
+    dirs = {}
+    for mode in ('reference', 'default', 'vector', 'parallel', 'raster'):
+        dirs[mode] = str(tmp_path / mode) + os.sep
+        os.mkdir(dirs[mode])
+    layers = P.project_background(cache_dir=str(tmp_path / 'cache'))
+    for src in sources:
+        frame = P.read_frame(src)
+        P.save_frame(*draw_reference(frame), dirs['reference'])
+        P.save_frame(*P.draw_frame(frame), dirs['default'])
+        P.save_frame(*P.draw_frame(frame, layers), dirs['vector'])
+        P.save_frame(*P.draw_frame(frame, layers, raster=True),
+                     dirs['raster'])
+    P.render_all(sources, dirs['parallel'], 2, layers)
+    names = sorted(os.listdir(dirs['reference']))
+    assert len(names) == 2
+    for mode in dirs:
+        assert sorted(os.listdir(dirs[mode])) == names
+    for mode in ('default', 'vector', 'parallel'):
+        for name in names:
+            with open(dirs['reference'] + name, 'rb') as a, \
+                    open(dirs[mode] + name, 'rb') as b:
+                assert a.read() == b.read(), f'{mode} {name} differs'
+    # antialiased edge pixels of the raster layer differ slightly
+    ndiff, dmax = compare(dirs['reference'], dirs['raster'])
+    assert dmax <= 10
@@ -0,0 +1,17 @@
+'''
+Import-time budget of the wx.py entry point, measured with
+python -X importtime in a subprocess as benchmarks/bench_import.py does
+'''
+from bench_import import HEAVY, importtime
+
+BUDGET = 0.5
+
+
+def test_help_import_budget():
+    # first run may compile .pyc files: keep the fastest
+    runs = [importtime(['--help']) for _ in range(3)]
+    _, top, names = min(runs, key=lambda r: sum(r[1].values()))
+    total = sum(top.values())
+    assert total <= BUDGET, f'imports took {total:.3f} s'
+    heavy = [n for n in names if n.split('.')[0] in HEAVY]
+    assert not heavy, f'imported {", ".join(sorted(heavy))}'
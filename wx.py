@@ -0,0 +1,91 @@
+#!/Users/briangreene/anaconda3/bin/python
+'''
+Single command line entry point for the scripts in this directory:
+
+    python wx.py nwc                  # daily NWC meteogram (auto_NWC_mesonet)
+    python wx.py nwc batch -ds 20260101 -de 20260131
+    python wx.py gfs fetch -ds 20261001 -de 20261002 -s GFS --netCDF
+    python wx.py meso grid -i snapshots/20261018/*.csv -o okmeso.nc
+
+Each subcommand runs the main() of one module with the remaining arguments,
+so `python wx.py gfs fetch -h` shows get_gfs.py's options. Only the module
+of the subcommand being run is imported, so heavy dependencies (xarray,
+matplotlib, cartopy, netCDF4) are never loaded by commands that do not use
+them. To call it as `wx`, link it onto your PATH:
+
+    ln -s $PWD/wx.py ~/bin/wx
+
+Author: Brian R. Greene, University of Oklahoma
+Updated: 18 October 2026
+'''
+# Python Packages
+import os
+import sys
+import importlib
+
+# group -> {command: (module, description)}
+COMMANDS = {
+    "nwc": {
+        "daily": ("auto_NWC_mesonet", "Plot, archive, and upload one day"),
+        "batch": ("NWCmesonet", "Plot a range of days in parallel"),
+        "live": ("NWClive", "Live meteogram of the current day")
+    },
+    "gfs": {
+        "fetch": ("get_gfs", "Download and convert GFS analyses"),
+        "store": ("gfs_store", "Consolidate converted files into one store"),
+        "plot": ("plot_gfs_NH", "Plot Northern Hemisphere maps")
+    },
+    "meso": {
+        "grid": ("mesonet_grid", "Grid current.csv snapshots to netCDF"),
+        "poll": ("mesonet_poll", "Poll and archive current.csv")
+    }
+}
+# command run when a group is given without one
+DEFAULT = {"nwc": "daily"}
+
+
+def usage(prog, groups=COMMANDS):
+    """
+    Return str listing of commands in groups
+    """
+    lines = [f"usage: {prog} <group> <command> [options]", "", "commands:"]
+    for group in groups:
+        for cmd, (module, desc) in COMMANDS[group].items():
+            default = " (default)" if DEFAULT.get(group) == cmd else ""
+            name = f"{group} {cmd}"
+            lines.append(f"  {name:<11} {desc}{default} [{module}.py]")
+    return "\n".join(lines)
+
+
+def main(argv=None):
+    """
+    Run the command named by argv
+    input argv: list of str arguments, default=sys.argv[1:]
+    Return int exit status
+    """
+    prog = os.path.basename(sys.argv[0])
+    argv = sys.argv[1:] if argv is None else list(argv)
+    if len(argv) == 0 or argv[0] not in COMMANDS:
+        help_ = len(argv) > 0 and argv[0] in ("-h", "--help")
+        print(usage(prog), file=sys.stdout if help_ else sys.stderr)
+        return 0 if help_ else 2
+    group, rest = argv[0], argv[1:]
+    if len(rest) > 0 and rest[0] in COMMANDS[group]:
+        cmd = rest.pop(0)
+    elif group in DEFAULT and not (len(rest) > 0 and
+                                   rest[0] in ("-h", "--help")):
+        cmd = DEFAULT[group]
+    else:
+        help_ = len(rest) > 0 and rest[0] in ("-h", "--help")
+        print(usage(prog, [group]), file=sys.stdout if help_ else sys.stderr)
+        return 0 if help_ else 2
+    module = COMMANDS[group][cmd][0]
+    # the module's parser reads sys.argv and names itself after argv[0]
+    sys.argv = [f"{prog} {group} {cmd}"] + rest
+    status = importlib.import_module(module).main()
+    return 0 if status is None else status
+
+
+# worker processes re-import the main script, so only dispatch when run
+if __name__ == "__main__":
+    raise SystemExit(main())